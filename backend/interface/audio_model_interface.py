@@ -35,8 +35,13 @@ class AudioModelInterface(ABC):
         raise NotImplementedError
 
     @abstractmethod
-    def transcribe_file(self, audio_path: str, language: str):
-        """Transcribe audio to a subtitle file representation."""
+    def transcribe_samples(self, audio, language: str, join_segments: bool = False) -> str:
+        """Transcribe 16 kHz mono float32 samples held in memory to a single text line (all segments joined if join_segments)."""
+        raise NotImplementedError
+
+    @abstractmethod
+    def transcribe_file(self, audio_path: str, language: str, on_progress=None, content_hash: str | None = None):
+        """Transcribe audio to a subtitle file representation, calling on_progress(done_seconds, total_seconds) as it goes if given; content_hash identifies the source for caching."""
         raise NotImplementedError
 
     @abstractmethod
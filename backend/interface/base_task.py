@@ -4,6 +4,12 @@ from typing import Any, Optional
 class BaseTask(ABC):
     """Abstract base class for all orchestrator tasks."""
 
+    # Which model the task's running time depends on ("llm", "audio" or "search"); keys its throughput samples.
+    MODEL_KIND = "llm"
+    # Set by run_task when the result came from a cache without running the model (e.g. a reused batch plan), so the
+    # orchestrator keeps the near-zero run time out of the throughput model.
+    served_from_cache = False
+
     def __init__(self, data: Optional[dict[str, Any]] = None):
         """Initialize the task with an optional pre-seeded data dict."""
         if data is None:
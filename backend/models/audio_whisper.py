@@ -95,7 +95,12 @@ class AudioWhisper(AudioModelInterface):
         result = model.transcribe(audio_path, language=language)
         return result["text"]
 
-    def transcribe_file(self, audio_path: str, language: str) -> pysubs2.SSAFile:
+    def transcribe_samples(self, audio, language: str, join_segments: bool = False) -> str:
+        model = self._model or self._build_model()
+        result = model.transcribe(audio, language=language)
+        return result["text"]
+
+    def transcribe_file(self, audio_path: str, language: str, on_progress=None, content_hash=None) -> pysubs2.SSAFile:
         if not os.path.isfile(audio_path):
             return "File not detected. Did you put the right path?"
         model = self._model or self._build_model()
@@ -1,13 +1,19 @@
-import gc
 import json
 import logging
 import os
+import queue
+import threading
 import warnings
+from typing import Callable, Iterator
 
+import numpy as np
 import pysubs2
 import whisperx
 
 from interface import AudioModelInterface
+from utils.audio_cache import DecodedAudioWriter, audio_cache_key, file_sha256, load_cached_audio
+from utils.audio_stream import SAMPLE_RATE, iter_array_chunks, iter_audio_chunks, probe_duration
+from utils.model_cache import LRUModelCache, estimate_model_bytes
 
 # Suppress verbose output from whisperx and its dependencies
 warnings.filterwarnings("ignore", category=UserWarning, module="pyannote")
@@ -20,6 +26,8 @@ class AudioWhisperX(AudioModelInterface):
     """Audio transcription backend using WhisperX for word-aligned subtitle generation."""
 
     CONFIG_FILE = "audio_whisperx.json"
+    # Decoded chunks buffered ahead of inference in transcribe_file (each ~5 minutes, ~19 MB)
+    DECODE_AHEAD_CHUNKS = 2
 
     def __init__(self):
         """Load saved config from disk or write defaults; sets up model name, device, compute type, and batch size."""
@@ -27,6 +35,8 @@ class AudioWhisperX(AudioModelInterface):
         self._device = "cpu"
         self._compute_type = "float32"
         self._batch_size = 16
+        self._align_cache_memory_mb = 4096
+        self._align_cache_idle_minutes = 30
         self._model = None
         self._running = False
         self._status = "not_loaded"
@@ -39,12 +49,20 @@ class AudioWhisperX(AudioModelInterface):
             self._device = _cfg.get("device", self._device)
             self._compute_type = _cfg.get("compute_type", self._compute_type)
             self._batch_size = _cfg.get("batch_size", self._batch_size)
+            self._align_cache_memory_mb = _cfg.get("align_cache_memory_mb", self._align_cache_memory_mb)
+            self._align_cache_idle_minutes = _cfg.get("align_cache_idle_minutes", self._align_cache_idle_minutes)
         else:
             os.makedirs(os.path.dirname(_data_path), exist_ok=True)
             self._save_config()
+        # Alignment models keyed by (language, device), kept warm between files
+        self._align_cache = LRUModelCache(
+            memory_budget_mb=self._align_cache_memory_mb,
+            idle_seconds=self._align_cache_idle_minutes * 60,
+            name="WhisperX align model",
+        )
 
     def _save_config(self):
-        """Persist the current model_name, device, compute_type, and batch_size to the config JSON file."""
+        """Persist the current model_name, device, compute_type, batch_size and alignment cache bounds to the config JSON file."""
         _data_path = self._get_config_path(self.CONFIG_FILE)
         os.makedirs(os.path.dirname(_data_path), exist_ok=True)
         with open(_data_path, "w", encoding="utf-8") as _f:
@@ -52,11 +70,13 @@ class AudioWhisperX(AudioModelInterface):
                 "model_name": self._model_name,
                 "device": self._device,
                 "compute_type": self._compute_type,
-                "batch_size": self._batch_size
+                "batch_size": self._batch_size,
+                "align_cache_memory_mb": self._align_cache_memory_mb,
+                "align_cache_idle_minutes": self._align_cache_idle_minutes,
             }, _f, indent=2)
 
     def configure(self, settings: dict):
-        """Apply model_name, device, compute_type, and/or batch_size from settings and persist to the config file."""
+        """Apply model_name, device, compute_type, batch_size and/or alignment cache bounds from settings and persist to the config file."""
         if not settings:
             return
         if "model_name" in settings:
@@ -67,6 +87,12 @@ class AudioWhisperX(AudioModelInterface):
             self._compute_type = settings["compute_type"]
         if "batch_size" in settings:
             self._batch_size = int(settings["batch_size"])
+        if "align_cache_memory_mb" in settings:
+            self._align_cache_memory_mb = float(settings["align_cache_memory_mb"])
+            self._align_cache.memory_budget_mb = self._align_cache_memory_mb
+        if "align_cache_idle_minutes" in settings:
+            self._align_cache_idle_minutes = float(settings["align_cache_idle_minutes"])
+            self._align_cache.idle_seconds = self._align_cache_idle_minutes * 60
         self._save_config()
 
     def get_settings_schema(self) -> dict:
@@ -121,6 +147,24 @@ class AudioWhisperX(AudioModelInterface):
                     "max": 32,
                     "step": 1,
                     "help": "Reduce if running out of memory"
+                },
+                {
+                    "key": "align_cache_memory_mb",
+                    "label": "Alignment Cache (MB)",
+                    "type": "number",
+                    "default": self._align_cache_memory_mb,
+                    "min": 0,
+                    "step": 256,
+                    "help": "Memory kept for per-language alignment models between files; 0 = unlimited"
+                },
+                {
+                    "key": "align_cache_idle_minutes",
+                    "label": "Alignment Cache Idle (min)",
+                    "type": "number",
+                    "default": self._align_cache_idle_minutes,
+                    "min": 0,
+                    "step": 5,
+                    "help": "Unload alignment models unused for this long; 0 = never"
                 }
             ]
         }
@@ -144,37 +188,54 @@ class AudioWhisperX(AudioModelInterface):
         """Transcribe the first segment of an audio file to a plain text string."""
         if not os.path.isfile(audio_path):
             return "File not detected. Did you put the right path?"
+        return self.transcribe_samples(whisperx.load_audio(audio_path), language)
+
+    def transcribe_samples(self, audio: np.ndarray, language: str, join_segments: bool = False) -> str:
+        """Transcribe 16 kHz mono float32 samples already in memory to the text of their first segment, or of all segments with join_segments."""
         model = self._model or self._build_model()
-        audio = whisperx.load_audio(audio_path)
         result = model.transcribe(audio, language=language, batch_size=self._batch_size)
 
         segments = result.get("segments", [])
         if not segments:
             return ""
+        if join_segments:
+            return " ".join(seg["text"].strip() for seg in segments).strip()
         return segments[0]["text"].strip()
 
-    def transcribe_file(self, audio_path: str, language: str) -> pysubs2.SSAFile:
-        """Transcribe an audio file into a pysubs2.SSAFile with word-aligned timestamps via WhisperX alignment."""
+    def transcribe_file(
+        self,
+        audio_path: str,
+        language: str,
+        on_progress: Callable[[float, float], None] | None = None,
+        content_hash: str | None = None,
+    ) -> pysubs2.SSAFile:
+        """Transcribe an audio file into a pysubs2.SSAFile with word-aligned timestamps, chunk by chunk; on_progress(done_seconds, total_seconds) is called after each chunk and content_hash (default: the file's SHA-256) keys the decoded-audio cache."""
         if not os.path.isfile(audio_path):
             return "File not detected. Did you put the right path?"
         model = self._model or self._build_model()
 
         device = "cuda" if self._device.startswith("cuda") else self._device
-        audio = whisperx.load_audio(audio_path)
-        result = model.transcribe(audio, language=language, batch_size=self._batch_size, chunk_size=10)
-
-        # Align for accurate word-level timestamps
-        model_a, metadata = whisperx.load_align_model(language_code=language, device=device)
-        result = whisperx.align(result["segments"], model_a, metadata, audio, device)
+        model_a, metadata = self._get_align_model(language, device)
 
-        del model_a
-        gc.collect()
-        try:
-            import torch
-            if torch.cuda.is_available():
-                torch.cuda.empty_cache()
-        except Exception:
-            pass
+        cache_key = audio_cache_key(content_hash or file_sha256(audio_path))
+        cached = load_cached_audio(cache_key)
+        if cached is not None:
+            total_seconds = len(cached) / SAMPLE_RATE
+            chunks = iter_array_chunks(cached)
+        else:
+            total_seconds = probe_duration(audio_path)
+            chunks = self._decode_ahead(audio_path, cache_key)
+
+        segments = []
+        for offset, audio in chunks:
+            result = model.transcribe(audio, language=language, batch_size=self._batch_size, chunk_size=10)
+            # Align for accurate word-level timestamps
+            if result["segments"]:
+                result = whisperx.align(result["segments"], model_a, metadata, audio, device)
+            segments.extend(self._shift_segment(seg, offset) for seg in result["segments"])
+            done_seconds = offset + len(audio) / SAMPLE_RATE
+            if on_progress is not None:
+                on_progress(done_seconds, max(total_seconds, done_seconds))
 
         subs = pysubs2.SSAFile()
         style = subs.styles["Default"]
@@ -182,7 +243,7 @@ class AudioWhisperX(AudioModelInterface):
         style.fontname = "Arial"
         subs.styles["Default"] = style
 
-        for seg in result["segments"]:
+        for seg in segments:
             words = seg.get("words", [])
             first_word = next((w for w in words if "start" in w), None)
             last_word = next((w for w in reversed(words) if "end" in w), None)
@@ -200,9 +261,66 @@ class AudioWhisperX(AudioModelInterface):
 
         return subs
 
+    def _decode_ahead(self, audio_path: str, cache_key: str) -> Iterator[tuple[float, np.ndarray]]:
+        """Yield (offset_seconds, samples) chunks while a background thread decodes up to DECODE_AHEAD_CHUNKS ahead, so decoding overlaps inference and memory stays bounded; the full decode is also written to the audio cache."""
+        chunks: queue.Queue = queue.Queue(maxsize=self.DECODE_AHEAD_CHUNKS)
+        stop = threading.Event()
+        done = object()
+
+        def put(item) -> bool:
+            """Queue item unless the consumer has stopped; returns False once it has."""
+            while not stop.is_set():
+                try:
+                    chunks.put(item, timeout=0.5)
+                    return True
+                except queue.Full:
+                    continue
+            return False
+
+        def decode():
+            writer = None
+            try:
+                writer = DecodedAudioWriter(cache_key)
+                for chunk in iter_audio_chunks(audio_path):
+                    writer.write(chunk[1])
+                    if not put(chunk):
+                        writer.discard()
+                        return
+                writer.commit()
+                put(done)
+            except Exception as exc:
+                if writer is not None:
+                    writer.discard()
+                put(exc)
+
+        decoder = threading.Thread(target=decode, daemon=True)
+        decoder.start()
+        try:
+            while True:
+                item = chunks.get()
+                if item is done:
+                    return
+                if isinstance(item, Exception):
+                    raise item
+                yield item
+        finally:
+            stop.set()
+
+    @staticmethod
+    def _shift_segment(seg: dict, offset: float) -> dict:
+        """Return a copy of an aligned segment with its own and its words' timestamps moved by offset seconds."""
+        shifted = {**seg, "start": seg["start"] + offset, "end": seg["end"] + offset}
+        if "words" in seg:
+            shifted["words"] = [
+                {**w, **{k: w[k] + offset for k in ("start", "end") if k in w}}
+                for w in seg["words"]
+            ]
+        return shifted
+
     def shutdown(self):
-        """Release the model reference and reset status to 'not_loaded'."""
+        """Release the model and cached alignment models and reset status to 'not_loaded'."""
         self._model = None
+        self._align_cache.clear()
         self._status = "not_loaded"
 
     def get_status(self) -> str:
@@ -242,6 +360,14 @@ class AudioWhisperX(AudioModelInterface):
             {"key": "compute_type", "label": "Compute Type", "value": self._compute_type},
         ]
 
+    def _get_align_model(self, language: str, device: str):
+        """Return (align_model, metadata) for the language and device, loading it only on an alignment cache miss."""
+        return self._align_cache.get(
+            (language, device),
+            lambda: whisperx.load_align_model(language_code=language, device=device),
+            size_of=lambda loaded: estimate_model_bytes(loaded[0]),
+        )
+
     def _build_model(self):
         """Load and return a WhisperX model instance for the configured model name, device, and compute type."""
         try:
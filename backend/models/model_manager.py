@@ -49,9 +49,13 @@ class ModelManager:
         return self._audio_client
 
     def get_search_client(self) -> Optional[SearchTavily]:
-        """Return the current Tavily search client, or None if not yet loaded."""
+        """Return the current search client (SearchTavily unless replaced via set_search_client), or None if not yet loaded."""
         return self._search_client
 
+    def set_search_client(self, client) -> None:
+        """Replace the search client with any object implementing SearchTavily's interface (e.g. SearchLocal for offline runs); call load_search_model() afterwards."""
+        self._search_client = client
+
     def is_llm_running(self) -> bool:
         """Return True if the LLM client is currently executing an inference call."""
         return bool(self._llm_client and self._llm_client.is_running())
@@ -69,7 +73,7 @@ class ModelManager:
         return bool(self._audio_client and self._audio_client.get_status() == "loaded")
 
     def is_search_ready(self) -> bool:
-        """Return True if the Tavily search client is loaded and ready."""
+        """Return True if the search client is loaded and ready."""
         return bool(self._search_client and self._search_client.get_status() == "loaded")
 
     def load_audio_model(self) -> bool:
@@ -120,7 +124,7 @@ class ModelManager:
             self._llm_client.configure(settings)
 
     def load_search_model(self) -> bool:
-        """Initialize the Tavily search client; returns True on success, False if already loading or on error."""
+        """Initialize the search client, creating a SearchTavily if none was set; returns True on success, False if already loading or on error."""
         if self.loading_search_model:
             return False
         try:
@@ -129,7 +133,7 @@ class ModelManager:
                 self._search_client = SearchTavily()
             self._search_client.initialize()
             self.search_loading_error = None
-            logger.info("Search model loaded: provider=Tavily")
+            logger.info("Search model loaded: provider=%s", type(self._search_client).__name__)
             return True
         except Exception as exc:
             self.search_loading_error = str(exc)
@@ -173,12 +177,18 @@ class ModelManager:
             raise RuntimeError("Audio client not initialized.")
         return self._audio_client.transcribe_line(file_path, language)
 
-    def audio_transcribe_file(self, file_path: str, language: str, original_filename: str):
-        """Transcribe a full audio file to an ASS subtitle file saved under outputs/transcribe-sub-files/; raises RuntimeError if audio client is not initialized."""
+    def audio_transcribe_samples(self, audio, language: str, join_segments: bool = False) -> str:
+        """Transcribe an in-memory 16 kHz mono clip to text; raises RuntimeError if audio client is not initialized."""
+        if self._audio_client is None:
+            raise RuntimeError("Audio client not initialized.")
+        return self._audio_client.transcribe_samples(audio, language, join_segments=join_segments)
+
+    def audio_transcribe_file(self, file_path: str, language: str, original_filename: str, on_progress=None, content_hash: str | None = None):
+        """Transcribe a full audio file to an ASS subtitle file saved under outputs/transcribe-sub-files/, forwarding on_progress(done_seconds, total_seconds) and the source content hash; raises RuntimeError if audio client is not initialized."""
         if self._audio_client is None:
             raise RuntimeError("Audio client not initialized.")
 
-        subs = self._audio_client.transcribe_file(file_path, language)
+        subs = self._audio_client.transcribe_file(file_path, language, on_progress=on_progress, content_hash=content_hash)
         safe_original_name = os.path.basename(original_filename)
         base_name = safe_original_name.split(".")[0]
         safe_lang = "".join(char for char in language if char.isalnum() or char in ("-", "_")) or "lang"
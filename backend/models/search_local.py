@@ -0,0 +1,84 @@
+import json
+import os
+
+from utils.logger import setup_logger
+
+logger = setup_logger("translator-helper")
+
+DATA_DIR = os.path.join(os.path.dirname(os.path.dirname(__file__)), "data")
+CONFIG_FILE = os.path.join(DATA_DIR, "search_local.json")
+
+
+class SearchLocal:
+    """Offline stand-in for SearchTavily that answers queries from a JSON fixture file; same interface, no network."""
+
+    def __init__(self, fixture_file: str = ""):
+        """Remember the fixture path (default: the path saved in data/search_local.json)."""
+        self._fixture_file = fixture_file
+        self._status = "not_loaded"
+        self._results: dict[str, list[str]] = {}
+        if not self._fixture_file and os.path.isfile(CONFIG_FILE):
+            with open(CONFIG_FILE, "r", encoding="utf-8") as f:
+                self._fixture_file = json.load(f).get("fixture_file", "")
+
+    def configure(self, settings: dict) -> None:
+        """Apply the fixture_file from settings and persist it to the config file."""
+        if not settings:
+            return
+        if "fixture_file" in settings:
+            self._fixture_file = settings["fixture_file"]
+        os.makedirs(DATA_DIR, exist_ok=True)
+        with open(CONFIG_FILE, "w", encoding="utf-8") as f:
+            json.dump({"fixture_file": self._fixture_file}, f, indent=2)
+
+    def initialize(self) -> None:
+        """Load the fixture, a JSON object mapping query text to a list of snippets; sets status to 'loaded' or 'error'."""
+        try:
+            with open(self._fixture_file, "r", encoding="utf-8") as f:
+                fixture = json.load(f)
+            self._results = {self._normalize(query): [str(s) for s in snippets] for query, snippets in fixture.items()}
+            self._status = "loaded"
+            logger.info("Local search fixture loaded: %s (%d queries)", self._fixture_file, len(self._results))
+        except Exception as exc:
+            self._status = "error"
+            logger.error("Local search load failed: %s", exc, exc_info=True)
+            raise
+
+    def search(self, query: str, max_results: int = 5) -> list[str]:
+        """Return the fixture snippets for query, or those of every fixture query contained in it; empty if nothing matches."""
+        if self._status != "loaded":
+            raise RuntimeError("Local search not initialized.")
+        normalized = self._normalize(query)
+        if normalized in self._results:
+            return self._results[normalized][:max_results]
+        snippets = [snippet for key, values in self._results.items() if key and key in normalized for snippet in values]
+        return snippets[:max_results]
+
+    def get_status(self) -> str:
+        """Return the current load status: 'not_loaded', 'loaded', or 'error'."""
+        return self._status
+
+    def get_settings_schema(self) -> dict:
+        """Return the settings schema describing the fixture file field for the settings UI."""
+        return {
+            "provider": "search_local",
+            "title": "Local Search Fixture",
+            "fields": [
+                {
+                    "key": "fixture_file",
+                    "label": "Fixture File",
+                    "type": "text",
+                    "placeholder": "path/to/search-fixture.json",
+                    "required": True,
+                }
+            ],
+        }
+
+    def get_server_variables(self) -> list[dict]:
+        """Return the current status as a key-value pair for the server-variables status endpoint."""
+        return [{"key": "search_local_status", "label": "Status", "value": self._status}]
+
+    @staticmethod
+    def _normalize(query: str) -> str:
+        """Return query lowercased with whitespace collapsed."""
+        return " ".join(query.lower().split())
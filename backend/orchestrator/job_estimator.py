@@ -0,0 +1,459 @@
+"""
+Dry-run estimator for the translate-file and review-file chains.
+
+Predicts LLM calls, input/output tokens, per-provider cost and wall-clock time for a job without
+calling the LLM. Prompt sizes come from the real prompt builders; timings and batch-shape ratios are
+calibrated from past runs recorded in the shared log file and the per-run log directories.
+"""
+
+import copy
+import json
+import math
+import re
+from pathlib import Path
+
+from orchestrator.review_file.task_retranslate_reviewed_lines import CONTEXT_LINES, RETRANSLATION_GROUP_SIZE
+from prompts.library_context import select_library_context_prompt
+from prompts.review_file import generate_batch_retranslation_prompt, generate_batch_review_prompt
+from prompts.translate_file import (
+    generate_batch_plan_prompt,
+    generate_split_batch_plan_prompt,
+    generate_translate_batch_prompt,
+)
+from utils.config import BACKEND_DIR, OUTPUTS_DIR
+from utils.event_filter import filter_event_indices, resolve_event_filter, to_file_batches
+from utils.library_context import format_characters, format_glossary
+from utils.library_index import build_library_index, match_library_index
+from utils.logger import SHARED_LOG_FILENAME
+from utils.plan_cache import load_cached_plan, plan_cache_key
+from utils.review_prescreen import screen_batches
+from utils.subtitle_document import SubtitleDocument
+from utils.tokens import estimate_tokens
+
+PRICING_FILE = BACKEND_DIR / "data" / "llm_pricing.json"
+
+# USD per million tokens, used until a pricing table is saved to PRICING_FILE with save_pricing().
+DEFAULT_PRICING = {
+    "claude": {"model": "claude-sonnet-4-6", "input_per_million": 3.0, "output_per_million": 15.0},
+    "chatgpt": {"model": "gpt-4o", "input_per_million": 2.5, "output_per_million": 10.0},
+    "deepseek": {"model": "deepseek-v4-flash", "input_per_million": 0.27, "output_per_million": 1.1},
+    "llamacpp": {"model": "local GGUF", "input_per_million": 0.0, "output_per_million": 0.0},
+}
+
+# Seconds per LLM call used when no past run of a task type has been logged yet.
+DEFAULT_SECONDS_PER_CALL = {
+    "TaskPlanTranslationBatches": 30.0,
+    "TaskSplitOversizedBatches": 15.0,
+    "TaskSelectLibraryContext": 10.0,
+    "TaskTranslateFile": 20.0,
+    "TaskPlanTranslationReviewBatches": 30.0,
+    "TaskSelectLibraryContextForReview": 10.0,
+    "TaskReviewTranslatedBatches": 15.0,
+    "TaskRetranslateReviewedLines": 12.0,
+}
+DEFAULT_PLANNED_BATCH_SIZE = 25.0
+DEFAULT_CORRECTION_RATE = 0.1
+TRANSLATION_OUTPUT_RATIO = 0.8
+PLAN_TOKENS_PER_BATCH = 30
+CORRECTION_TOKENS = 40
+
+FINISHED_LINE_PATTERN = re.compile(
+    r"task=(?P<task_type>\S+).* FINISHED status=complete elapsed=(?P<elapsed>[\d.]+)s(?: log_dir=(?P<log_dir>.+))?$"
+)
+
+
+def load_pricing() -> dict:
+    """Return the per-provider pricing table from data/llm_pricing.json, or the defaults if none has been saved; never writes."""
+    if PRICING_FILE.is_file():
+        with open(PRICING_FILE, "r", encoding="utf-8") as f:
+            return json.load(f)
+    return copy.deepcopy(DEFAULT_PRICING)
+
+
+def save_pricing(pricing: dict) -> dict:
+    """Validate and write the per-provider pricing table to data/llm_pricing.json; raises ValueError on a malformed entry."""
+    for provider, entry in pricing.items():
+        if not isinstance(entry, dict):
+            raise ValueError(f"Pricing for '{provider}' must be an object")
+        for field in ("input_per_million", "output_per_million"):
+            value = entry.get(field)
+            if isinstance(value, bool) or not isinstance(value, (int, float)) or value < 0:
+                raise ValueError(f"Pricing for '{provider}' needs a non-negative number for {field}")
+    PRICING_FILE.parent.mkdir(parents=True, exist_ok=True)
+    with open(PRICING_FILE, "w", encoding="utf-8") as f:
+        json.dump(pricing, f, indent=2)
+    return pricing
+
+
+def load_calibration(log_path: Path | None = None) -> dict:
+    """Derive seconds-per-call, planned batch size and correction rate from FINISHED entries in the shared log and their run logs."""
+    log_path = log_path or OUTPUTS_DIR / SHARED_LOG_FILENAME
+    elapsed_by_task: dict[str, float] = {}
+    calls_by_task: dict[str, int] = {}
+    planned_lines = planned_batches = 0
+    reviewed_lines = corrected_lines = 0
+    runs = 0
+
+    if log_path.is_file():
+        last_log_dir = ""
+        with open(log_path, "r", encoding="utf-8", errors="replace") as f:
+            for raw_line in f:
+                match = FINISHED_LINE_PATTERN.search(raw_line.rstrip())
+                if not match:
+                    continue
+                task_type = match.group("task_type")
+                # Final chain tasks return no log_dir, so they inherit the one logged by the previous task of the run.
+                log_dir = match.group("log_dir") or last_log_dir
+                last_log_dir = log_dir
+                calls = _count_logged_calls(task_type, Path(log_dir)) if log_dir else None
+                if not calls:
+                    continue
+                elapsed_by_task[task_type] = elapsed_by_task.get(task_type, 0.0) + float(match.group("elapsed"))
+                calls_by_task[task_type] = calls_by_task.get(task_type, 0) + calls
+                if task_type == "TaskPlanTranslationBatches":
+                    runs += 1
+                    plan = _read_json(Path(log_dir) / "01-plan-translation-batches.json")
+                    planned_lines += int(plan.get("included_lines", plan.get("total_lines", 0)))
+                    planned_batches += int(plan.get("batch_count", 0))
+                elif task_type == "TaskRetranslateReviewedLines":
+                    review = _read_json(Path(log_dir) / "03-review-translated-batches.json")
+                    plan = _read_json(Path(log_dir) / "01-plan-translation-batches.json")
+                    reviewed_lines += int(plan.get("included_lines", plan.get("total_lines", 0)))
+                    corrected_lines += int(review.get("correction_count", 0))
+
+    seconds_per_call = dict(DEFAULT_SECONDS_PER_CALL)
+    for task_type, calls in calls_by_task.items():
+        seconds_per_call[task_type] = elapsed_by_task[task_type] / calls
+    return {
+        "runs": runs,
+        "source": "logs" if calls_by_task else "defaults",
+        "seconds_per_call": seconds_per_call,
+        "planned_batch_size": planned_lines / planned_batches if planned_batches else DEFAULT_PLANNED_BATCH_SIZE,
+        "correction_rate": corrected_lines / reviewed_lines if reviewed_lines else DEFAULT_CORRECTION_RATE,
+    }
+
+
+def estimate_job(
+    file_path: str,
+    mode: str = "translate",
+    translated_file_path: str = "",
+    input_lang: str = "ja",
+    output_lang: str = "en",
+    batch_size: int = 3,
+    series: dict | None = None,
+    event_filter: dict | None = None,
+    concurrency: int = 1,
+    library_context_mode: str = "hybrid",
+    review_mode: str = "flagged",
+) -> dict:
+    """Return a per-stage and total estimate of LLM calls, tokens, cost and wall-clock seconds for a translate or review job.
+
+    In review mode with review_mode 'flagged', the review stage only counts the batches the local pre-screen would
+    flag; without a translated file the pre-screen cannot run, so every batch is counted and the figure is an upper bound.
+    """
+    if mode not in ("translate", "review"):
+        raise ValueError("Estimate mode must be 'translate' or 'review'.")
+    if review_mode not in ("flagged", "full"):
+        raise ValueError("review_mode must be 'flagged' or 'full'")
+    batch_size = max(1, int(batch_size))
+    concurrency = max(1, int(concurrency))
+    calibration = load_calibration()
+    pricing = load_pricing()
+
+    subs = SubtitleDocument.load(file_path)
+    included_indices = filter_event_indices(subs, event_filter)
+    if not included_indices:
+        raise ValueError("No subtitle lines are left to translate after applying the event filter.")
+    plain_texts = {index: subs.plain_text(index) for index in included_indices}
+    planner_lines = [
+        f"{number}. {(subs[index].name or 'Unknown').strip()}: {plain_texts[index] or '[EMPTY]'}"
+        for number, index in enumerate(included_indices, start=1)
+    ]
+    source_tokens = sum(estimate_tokens(text) for text in plain_texts.values() if text)
+    transcript_tokens = estimate_tokens("\n".join(planner_lines))
+
+    translated_subs = None
+    if mode == "review" and translated_file_path:
+        translated_subs = SubtitleDocument.load(translated_file_path)
+        translated_tokens = sum(
+            estimate_tokens(translated_subs.plain_text(index))
+            for index in included_indices
+            if index < len(translated_subs)
+        )
+    else:
+        translated_tokens = math.ceil(source_tokens * TRANSLATION_OUTPUT_RATIO)
+
+    context = _estimate_library_context(series or {})
+    included_count = len(included_indices)
+    cached_plan = load_cached_plan(plan_cache_key(
+        subs.content_hash,
+        {"input_lang": input_lang, "output_lang": output_lang, "event_filter": resolve_event_filter(event_filter), "context": {}},
+    ))
+    if cached_plan:
+        planned_batch_count = len(cached_plan)
+    else:
+        planned_batch_count = max(1, math.ceil(included_count / max(1.0, calibration["planned_batch_size"])))
+    # Only the translate chain splits planned batches down to batch_size; the review chain reviews the plan as is.
+    if mode == "translate":
+        final_batch_count = max(planned_batch_count, math.ceil(included_count / batch_size))
+    else:
+        final_batch_count = planned_batch_count
+    split_calls = planned_batch_count if calibration["planned_batch_size"] > batch_size else 0
+
+    stages: list[dict] = []
+    plan_task = "TaskPlanTranslationBatches" if mode == "translate" else "TaskPlanTranslationReviewBatches"
+    stages.append(_stage(
+        plan_task,
+        calls=0 if cached_plan else 1,
+        input_tokens=0 if cached_plan else estimate_tokens(generate_batch_plan_prompt(None, input_lang, output_lang)) + transcript_tokens,
+        output_tokens=0 if cached_plan else planned_batch_count * PLAN_TOKENS_PER_BATCH,
+        calibration=calibration,
+        concurrency=1,
+    ))
+
+    if mode == "translate":
+        split_prompt_tokens = estimate_tokens(generate_split_batch_plan_prompt(None, input_lang, output_lang, batch_size, ""))
+        stages.append(_stage(
+            "TaskSplitOversizedBatches",
+            calls=split_calls,
+            input_tokens=split_calls * split_prompt_tokens + (transcript_tokens if split_calls else 0),
+            output_tokens=final_batch_count * PLAN_TOKENS_PER_BATCH if split_calls else 0,
+            calibration=calibration,
+            concurrency=concurrency,
+        ))
+
+    select_task = "TaskSelectLibraryContext" if mode == "translate" else "TaskSelectLibraryContextForReview"
+    selection = _estimate_library_selection(series or {}, planner_lines, library_context_mode)
+    if context["library_tokens"] and selection["candidate_ids"]:
+        selection_prompt = select_library_context_prompt(
+            series_name=str((series or {}).get("name", "")),
+            input_lang=input_lang,
+            output_lang=output_lang,
+            character_ids=selection["candidate_ids"],
+            character_names=selection["candidate_names"],
+            glossary_ids=[],
+            glossary_terms=[],
+            excerpt=library_context_mode == "hybrid",
+        )
+        stages.append(_stage(
+            select_task,
+            calls=1,
+            input_tokens=estimate_tokens(selection_prompt) + estimate_tokens("\n".join(selection["prompt_lines"])),
+            output_tokens=len(selection["candidate_ids"]) * 5,
+            calibration=calibration,
+            concurrency=1,
+        ))
+    else:
+        stages.append(_stage(select_task, 0, 0, 0, calibration, 1))
+
+    if mode == "translate":
+        system_tokens = estimate_tokens(generate_translate_batch_prompt(context["context"], input_lang, output_lang))
+        # Batch lines repeat the speaker and duration label on top of the transcript text.
+        stages.append(_stage(
+            "TaskTranslateFile",
+            calls=final_batch_count,
+            input_tokens=final_batch_count * system_tokens + transcript_tokens + included_count * 4,
+            output_tokens=translated_tokens,
+            calibration=calibration,
+            concurrency=concurrency,
+        ))
+    else:
+        prescreen = _estimate_review_prescreen(
+            subs, translated_subs, included_indices, cached_plan, final_batch_count, input_lang, output_lang, series or {}
+        )
+        screened = review_mode != "full" and prescreen["applied"]
+        review_share = prescreen["flagged_line_ratio"] if screened else 1.0
+        review_calls = math.ceil(final_batch_count * prescreen["flagged_batches"] / prescreen["batches"]) if screened else final_batch_count
+        system_tokens = estimate_tokens(generate_batch_review_prompt(context["context"], input_lang, output_lang))
+        corrections = math.ceil(included_count * calibration["correction_rate"])
+        stages.append(_stage(
+            "TaskReviewTranslatedBatches",
+            calls=review_calls,
+            input_tokens=review_calls * system_tokens + math.ceil((transcript_tokens + translated_tokens) * review_share),
+            output_tokens=corrections * CORRECTION_TOKENS + review_calls * 10,
+            calibration=calibration,
+            concurrency=concurrency,
+        ))
+        retranslation_tokens = estimate_tokens(generate_batch_retranslation_prompt(context["context"], input_lang, output_lang))
+        average_line_tokens = (source_tokens + translated_tokens) / included_count
+        retranslation_calls = math.ceil(corrections / RETRANSLATION_GROUP_SIZE)
+        stages.append(_stage(
+            "TaskRetranslateReviewedLines",
+            calls=retranslation_calls,
+            input_tokens=math.ceil(
+                retranslation_calls * (retranslation_tokens + 2 * CONTEXT_LINES * average_line_tokens)
+                + corrections * (average_line_tokens + CORRECTION_TOKENS)
+            ),
+            output_tokens=math.ceil(corrections * translated_tokens / included_count),
+            calibration=calibration,
+            concurrency=concurrency,
+        ))
+
+    input_tokens = sum(stage["input_tokens"] for stage in stages)
+    output_tokens = sum(stage["output_tokens"] for stage in stages)
+    estimate = {
+        "mode": mode,
+        "total_lines": len(subs),
+        "included_lines": included_count,
+        "batch_size": batch_size,
+        "concurrency": concurrency,
+        "plan_cached": bool(cached_plan),
+        "stages": stages,
+        "llm_calls": sum(stage["llm_calls"] for stage in stages),
+        "input_tokens": input_tokens,
+        "output_tokens": output_tokens,
+        "cost_usd": {
+            provider: round(
+                input_tokens / 1_000_000 * float(rates.get("input_per_million", 0.0))
+                + output_tokens / 1_000_000 * float(rates.get("output_per_million", 0.0)),
+                4,
+            )
+            for provider, rates in pricing.items()
+        },
+        "estimated_seconds": round(sum(stage["seconds"] for stage in stages), 1),
+        "calibration": {
+            "source": calibration["source"],
+            "runs": calibration["runs"],
+            "planned_batch_size": round(calibration["planned_batch_size"], 2),
+            "correction_rate": round(calibration["correction_rate"], 3),
+        },
+    }
+    if mode == "review":
+        estimate["review_mode"] = review_mode
+        estimate["review_prescreen"] = prescreen
+        estimate["upper_bound"] = review_mode != "full" and not prescreen["applied"]
+    return estimate
+
+
+def _stage(task_type: str, calls: int, input_tokens: int, output_tokens: int, calibration: dict, concurrency: int) -> dict:
+    """Build one stage entry; wall-clock time assumes calls run in waves of `concurrency`."""
+    seconds_per_call = calibration["seconds_per_call"].get(task_type, 0.0)
+    return {
+        "task_type": task_type,
+        "llm_calls": calls,
+        "input_tokens": int(input_tokens),
+        "output_tokens": int(output_tokens),
+        "seconds": round(math.ceil(calls / max(1, concurrency)) * seconds_per_call, 1),
+    }
+
+
+def _estimate_review_prescreen(
+    subs: SubtitleDocument,
+    translated_subs: SubtitleDocument | None,
+    included_indices: list[int],
+    cached_plan: list[dict] | None,
+    batch_count: int,
+    input_lang: str,
+    output_lang: str,
+    series: dict,
+) -> dict:
+    """Run the review pre-screen over the cached plan (or evenly sized batches) and return how many batches and lines it would send to the reviewer."""
+    if translated_subs is None or len(translated_subs) != len(subs):
+        return {"applied": False, "batches": batch_count, "flagged_batches": batch_count, "flagged_line_ratio": 1.0}
+    if cached_plan:
+        compact_batches = cached_plan
+    else:
+        size = math.ceil(len(included_indices) / batch_count)
+        compact_batches = [
+            {"start_index": start, "end_index": min(start + size - 1, len(included_indices))}
+            for start in range(1, len(included_indices) + 1, size)
+        ]
+    file_batches = to_file_batches(compact_batches, included_indices, len(subs))
+    screening = screen_batches(
+        [subs.plain_text(index) for index in range(len(subs))],
+        [translated_subs.plain_text(index) for index in range(len(translated_subs))],
+        file_batches,
+        included_indices,
+        input_lang=input_lang,
+        output_lang=output_lang,
+        glossary=series.get("glossary") or [],
+    )
+    flagged_lines = sum(
+        int(batch["end_index"]) - int(batch["start_index"]) + 1
+        for batch, screen in zip(compact_batches, screening)
+        if screen["flagged"]
+    )
+    return {
+        "applied": True,
+        "batches": len(screening),
+        "flagged_batches": sum(1 for screen in screening if screen["flagged"]),
+        "flagged_line_ratio": round(flagged_lines / len(included_indices), 3),
+    }
+
+
+def _estimate_library_context(series: dict) -> dict:
+    """Format the whole series library the way TaskSelectLibraryContext does; the selected subset can only be smaller."""
+    characters = series.get("characters") or []
+    glossary = series.get("glossary") or []
+    context: dict = {}
+    if characters:
+        context["characters"] = format_characters(characters)
+    if glossary:
+        context["glossary"] = format_glossary(glossary)
+    return {
+        "context": context,
+        "library_tokens": sum(estimate_tokens(value) for value in context.values()),
+        "character_ids": [c["id"] for c in characters],
+        "character_names": [c["name"] for c in characters],
+        "glossary_ids": [t["id"] for t in glossary],
+        "glossary_terms": [t["term"] for t in glossary],
+    }
+
+
+def _estimate_library_selection(series: dict, planner_lines: list[str], library_context_mode: str) -> dict:
+    """Run the local library match the way TaskSelectLibraryContext does and return the entries and lines it would send to the LLM."""
+    characters = series.get("characters") or []
+    glossary = series.get("glossary") or []
+    entries = [(c["id"], c["name"]) for c in characters] + [(t["id"], t["term"]) for t in glossary]
+    if not entries or library_context_mode == "fast":
+        return {"candidate_ids": [], "candidate_names": [], "prompt_lines": []}
+    if library_context_mode == "llm":
+        return {"candidate_ids": [e[0] for e in entries], "candidate_names": [e[1] for e in entries], "prompt_lines": planner_lines}
+
+    matches = match_library_index(build_library_index(characters, glossary), [line.split(". ", 1)[-1] for line in planner_lines])
+    uncertain = {
+        entry_id: match
+        for group in ("characters", "glossary")
+        for entry_id, match in matches[group].items()
+        if match["match"] in ("partial", "fuzzy")
+    }
+    names = dict(entries)
+    lines = sorted({line for match in uncertain.values() for line in match["lines"]})
+    return {
+        "candidate_ids": list(uncertain),
+        "candidate_names": [names[entry_id] for entry_id in uncertain],
+        "prompt_lines": [planner_lines[line] for line in lines],
+    }
+
+
+def _count_logged_calls(task_type: str, log_dir: Path) -> int:
+    """Return the number of LLM calls a finished task made, read from its run log; 0 if it cannot be determined."""
+    if task_type in ("TaskPlanTranslationBatches", "TaskPlanTranslationReviewBatches"):
+        plan_log = _read_json(log_dir / "01-plan-translation-batches.json")
+        return 1 if plan_log and plan_log.get("plan_source", "llm") == "llm" else 0
+    if task_type == "TaskSplitOversizedBatches":
+        return int(_read_json(log_dir / "02-split-oversized-batches.json").get("oversized_batch_count", 0))
+    if task_type in ("TaskSelectLibraryContext", "TaskSelectLibraryContextForReview"):
+        log_name = "03-select-library-context.json" if task_type == "TaskSelectLibraryContext" else "02-select-library-context.json"
+        if not (log_dir / log_name).is_file():
+            return 0
+        return int(_read_json(log_dir / log_name).get("llm_call_count", 1))
+    if task_type == "TaskTranslateFile":
+        split_log = _read_json(log_dir / "02-split-oversized-batches.json")
+        return int(split_log.get("final_batch_count", 0))
+    if task_type == "TaskReviewTranslatedBatches":
+        return int(_read_json(log_dir / "03-review-translated-batches.json").get("batch_count", 0))
+    if task_type == "TaskRetranslateReviewedLines":
+        retranslation_log = _read_json(log_dir / "04-retranslate-reviewed-lines.json")
+        return int(retranslation_log.get("llm_call_count", retranslation_log.get("corrected_count", 0)))
+    return 0
+
+
+def _read_json(path: Path) -> dict:
+    """Read a JSON object from path, returning {} if it is missing or unreadable."""
+    try:
+        with open(path, "r", encoding="utf-8") as f:
+            parsed = json.load(f)
+        return parsed if isinstance(parsed, dict) else {}
+    except (OSError, ValueError):
+        return {}
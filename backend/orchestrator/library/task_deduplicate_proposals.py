@@ -1,4 +1,5 @@
 import json
+from concurrent.futures import ThreadPoolExecutor, as_completed
 from pathlib import Path
 
 from interface.base_task import BaseTask
@@ -7,9 +8,27 @@ from orchestrator.progress_handler import ProgressHandler
 from orchestrator.result_handler import ResultHandler
 from prompts.library import deduplicate_proposals_prompt
 from utils.logger import setup_logger
+from utils.text_similarity import jaccard, qualifiers_differ, token_set
 
 logger = setup_logger("translator-helper")
 
+# Token-set similarity at or above which a proposal is dropped locally as a duplicate of an existing entry or an earlier proposal,
+# unless the differing tokens include a negator or qualifier.
+LOCAL_DUPLICATE_SIMILARITY = 0.85
+DEFAULT_DEDUP_CONCURRENCY = 4
+PROPOSAL_CATEGORIES = ("new_characters", "updated_characters", "new_glossary", "updated_glossary")
+
+
+def assign_proposal_ids(proposals: dict) -> dict:
+    """Return a copy of the proposals with a stable proposal_id ("<category>-<n>") on every entry, so accepted ones can be applied in bulk."""
+    labelled = dict(proposals)
+    for category in PROPOSAL_CATEGORIES:
+        labelled[category] = [
+            {**proposal, "proposal_id": f"{category}-{number}"}
+            for number, proposal in enumerate(proposals.get(category, []), start=1)
+        ]
+    return labelled
+
 
 class TaskDeduplicateProposals(BaseTask):
     """Library update chain task (slot 06/final): filter updated_character proposals to remove entries already in the library."""
@@ -22,7 +41,7 @@ class TaskDeduplicateProposals(BaseTask):
         return self.TASK_TYPE
 
     def run_task(self) -> dict:
-        """Group updated_characters by field and character, call the LLM per group to filter duplicates, store the final proposals."""
+        """Group updated_characters by field and character, drop obvious duplicates locally, ask the LLM about the remaining groups concurrently, store the final proposals."""
         model_manager = ModelManager.get_instance()
         result_handler = ResultHandler.get_instance()
         progress_handler = ProgressHandler.get_instance()
@@ -38,9 +57,10 @@ class TaskDeduplicateProposals(BaseTask):
         log_dir = data.get("log_dir")
         updated = proposals.get("updated_characters", [])
         if not updated:
-            result_handler.set_complete(self.task_type, {"proposals": proposals})
+            proposals = assign_proposal_ids(proposals)
+            result_handler.set_complete(self.task_type, {"series_id": data.get("series_id"), "proposals": proposals})
             self._write_log(log_dir, proposals, proposals)
-            return data
+            return {**data, "proposals": proposals}
 
         result_handler.set_processing(self.task_type)
 
@@ -65,59 +85,85 @@ class TaskDeduplicateProposals(BaseTask):
                 relationship_groups.setdefault(rel_char, []).append(u)
 
         char_map = {c["id"]: c for c in series.get("characters", [])}
-        kept: list[dict] = []
         # Stores existing library data per group key for the audit log
         existing_by_group: dict[str, list[str]] = {}
-
-        total_calls = len(personality_groups) + len(history_groups) + len(relationship_groups)
-        completed = 0
-        progress_handler.set(self.task_type, {"current": 0, "total": total_calls, "status": "Deduplicating proposals", "eta_seconds": 0})
-
+        # (field label, existing entries, proposals, progress label) per group, in the order results are merged
+        groups: list[tuple[str, list, list, str]] = []
+        for char_id, proposals_list in personality_groups.items():
+            char = char_map.get(char_id, {})
+            existing = char.get("personality", [])
+            existing_by_group[f"{char_id} | personality"] = existing
+            groups.append(("personality", existing, proposals_list, f"personality for {char.get('name', char_id)}"))
+        for char_id, proposals_list in history_groups.items():
+            char = char_map.get(char_id, {})
+            existing = char.get("history", [])
+            existing_by_group[f"{char_id} | history"] = existing
+            groups.append(("history", existing, proposals_list, f"history for {char.get('name', char_id)}"))
+        for rel_char, proposals_list in relationship_groups.items():
+            existing = []
+            for char in series.get("characters", []):
+                existing.extend(char.get("relationships", {}).get(rel_char, []))
+            existing_by_group[f"relationships | {rel_char}"] = existing
+            groups.append((f"relationships[{rel_char}]", existing, proposals_list, f"relationship: {rel_char}"))
+
+        # Local pass: drop exact and near-identical duplicates; only groups with something left to judge reach the LLM.
+        candidates_by_group = [self._local_dedup(existing, proposals_list) for _, existing, proposals_list, _ in groups]
+        llm_groups = [
+            number
+            for number, (candidates, (_, existing, _, _)) in enumerate(zip(candidates_by_group, groups))
+            if candidates and (existing or len(candidates) > 1)
+        ]
+        concurrency = max(1, int(data.get("concurrency", DEFAULT_DEDUP_CONCURRENCY)))
+        total_calls = len(llm_groups)
+        progress_handler.set(self.task_type, {"current": 0, "total": total_calls, "status": f"Deduplicating proposals ({len(groups) - total_calls} groups settled locally)", "eta_seconds": 0})
+
+        kept_by_group: dict[int, list[int]] = {number: candidates for number, candidates in enumerate(candidates_by_group)}
         try:
             llm_client.set_running(True)
-
-            # Personality — one call per character
-            for char_id, proposals_list in personality_groups.items():
-                char = char_map.get(char_id, {})
-                existing = char.get("personality", [])
-                existing_by_group[f"{char_id} | personality"] = existing
-                kept_indices = self._dedup_call(model_manager, "personality", existing, proposals_list, label_key="append")
-                kept.extend(proposals_list[i] for i in kept_indices)
-                completed += 1
-                progress_handler.set(self.task_type, {"current": completed, "total": total_calls, "status": f"Checked personality for {char.get('name', char_id)}", "eta_seconds": 0})
-
-            # History — one call per character
-            for char_id, proposals_list in history_groups.items():
-                char = char_map.get(char_id, {})
-                existing = char.get("history", [])
-                existing_by_group[f"{char_id} | history"] = existing
-                kept_indices = self._dedup_call(model_manager, "history", existing, proposals_list, label_key="append")
-                kept.extend(proposals_list[i] for i in kept_indices)
-                completed += 1
-                progress_handler.set(self.task_type, {"current": completed, "total": total_calls, "status": f"Checked history for {char.get('name', char_id)}", "eta_seconds": 0})
-
-            # Relationships — one call per relationship character name
-            for rel_char, proposals_list in relationship_groups.items():
-                existing = []
-                for char in series.get("characters", []):
-                    facts = char.get("relationships", {}).get(rel_char, [])
-                    existing.extend(facts)
-                existing_by_group[f"relationships | {rel_char}"] = existing
-                kept_indices = self._dedup_call(model_manager, f"relationships[{rel_char}]", existing, proposals_list, label_key="append")
-                kept.extend(proposals_list[i] for i in kept_indices)
-                completed += 1
-                progress_handler.set(self.task_type, {"current": completed, "total": total_calls, "status": f"Checked relationship: {rel_char}", "eta_seconds": 0})
-
+            if llm_groups:
+                with ThreadPoolExecutor(max_workers=min(concurrency, len(llm_groups))) as executor:
+                    futures = {}
+                    for number in llm_groups:
+                        field, existing, proposals_list, _ = groups[number]
+                        candidates = candidates_by_group[number]
+                        future = executor.submit(self._dedup_call, model_manager, field, existing, [proposals_list[i] for i in candidates], "append")
+                        futures[future] = number
+                    completed = 0
+                    for future in as_completed(futures):
+                        number = futures[future]
+                        candidates = candidates_by_group[number]
+                        kept_by_group[number] = [candidates[i] for i in future.result()]
+                        completed += 1
+                        progress_handler.set(self.task_type, {"current": completed, "total": total_calls, "status": f"Checked {groups[number][3]}", "eta_seconds": 0})
         finally:
             llm_client.set_running(False)
 
-        deduped_proposals = {**proposals, "updated_characters": kept}
+        kept: list[dict] = []
+        for number, (_, _, proposals_list, _) in enumerate(groups):
+            kept.extend(proposals_list[i] for i in kept_by_group[number])
+
+        deduped_proposals = assign_proposal_ids({**proposals, "updated_characters": kept})
         progress_handler.set(self.task_type, {"current": total_calls, "total": total_calls, "status": f"Kept {len(kept)}/{len(updated)} updated_characters proposals", "eta_seconds": 0})
-        result_handler.set_complete(self.task_type, {"proposals": deduped_proposals})
-        self._write_log(log_dir, proposals, deduped_proposals, existing_by_group)
+        result_handler.set_complete(self.task_type, {"series_id": data.get("series_id"), "proposals": deduped_proposals})
+        self._write_log(log_dir, proposals, deduped_proposals, existing_by_group, llm_call_count=total_calls)
         return {**data, "proposals": deduped_proposals}
 
-    def _write_log(self, log_dir, original_proposals: dict, deduped_proposals: dict, existing_by_group: dict):
+    def _local_dedup(self, existing: list, proposals_list: list) -> list[int]:
+        """Return the indices of proposals that are not (near-)identical to an existing entry or to an earlier proposal in the group; a negation or qualifier difference keeps both."""
+        seen = [token_set(entry) for entry in existing]
+        kept_indices = []
+        for i, proposal in enumerate(proposals_list):
+            tokens = token_set(proposal.get("append", ""))
+            if not tokens or any(
+                jaccard(tokens, other) >= LOCAL_DUPLICATE_SIMILARITY and not qualifiers_differ(tokens, other)
+                for other in seen
+            ):
+                continue
+            seen.append(tokens)
+            kept_indices.append(i)
+        return kept_indices
+
+    def _write_log(self, log_dir, original_proposals: dict, deduped_proposals: dict, existing_by_group: dict | None = None, llm_call_count: int = 0):
         """Write a per-group audit log showing existing library data, proposed additions, kept, and excluded entries."""
         if not log_dir:
             return
@@ -132,7 +178,7 @@ class TaskDeduplicateProposals(BaseTask):
             if key not in groups:
                 existing_key = f"{u.get('id')} | {u.get('field')}" if "character" not in u else f"relationships | {u['character']}"
                 groups[key] = {
-                    "existing_in_library": existing_by_group.get(existing_key, []),
+                    "existing_in_library": (existing_by_group or {}).get(existing_key, []),
                     "proposed": [],
                     "kept": [],
                     "excluded": [],
@@ -142,6 +188,7 @@ class TaskDeduplicateProposals(BaseTask):
             groups[key][bucket].append(u.get("append", ""))
 
         log_path.write_text(json.dumps({
+            "llm_call_count": llm_call_count,
             "updated_characters_dedup": groups,
             "new_characters": deduped_proposals.get("new_characters", []),
             "new_glossary": deduped_proposals.get("new_glossary", []),
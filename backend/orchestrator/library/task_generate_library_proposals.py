@@ -6,7 +6,15 @@ from models.model_manager import ModelManager
 from orchestrator.progress_handler import ProgressHandler
 from orchestrator.result_handler import ResultHandler
 from prompts.library import generate_library_proposals_prompt
-from utils.utils import load_sub_data
+from utils.library_index import KeywordAutomaton, normalize_text
+from utils.subtitle_document import episode_transcripts
+from utils.tokens import estimate_tokens
+
+# Transcript tokens sent in the single proposals call; longer transcripts (typically a season) are cut down to the
+# lines that mention a scanned character or term, with the scan's episode-tagged events alongside.
+PROPOSAL_TRANSCRIPT_TOKENS = 12000
+# Most lines kept per scanned name or term in each episode, so the main cast does not crowd out minor names.
+PROPOSAL_LINES_PER_MENTION = 8
 
 
 class TaskGenerateLibraryProposals(BaseTask):
@@ -30,7 +38,6 @@ class TaskGenerateLibraryProposals(BaseTask):
             raise RuntimeError("LLM model not initialized")
 
         data = self.get_data()
-        file_path = str(data.get("file_path", ""))
         series = data.get("series", {})
         series_name = series.get("name", "Unknown Series")
         input_lang = series.get("input_lang", "ja")
@@ -44,10 +51,10 @@ class TaskGenerateLibraryProposals(BaseTask):
 
         try:
             llm_client.set_running(True)
-            transcript = "\n".join(load_sub_data(file_path, include_speaker=True))
+            transcript_section = self._transcript_section(episode_transcripts(data), data.get("findings") or {})
 
             prompt_parts = [
-                f"=== SUBTITLE FILE ===\n{transcript}",
+                transcript_section,
                 f"\n=== EXISTING LIBRARY ===\n{json.dumps({'characters': series.get('characters', []), 'glossary': series.get('glossary', [])}, ensure_ascii=False, indent=2)}",
                 f"\n=== ALREADY KNOWN (do not re-add) ===\n{json.dumps(known, ensure_ascii=False)}",
             ]
@@ -75,6 +82,57 @@ class TaskGenerateLibraryProposals(BaseTask):
         finally:
             llm_client.set_running(False)
 
+    def _transcript_section(self, episodes: list[tuple[str, list[str]]], findings: dict) -> str:
+        """Return the prompt's transcript section: every line when it fits PROPOSAL_TRANSCRIPT_TOKENS, else the lines mentioning scanned names and terms plus the scan's events."""
+        total_tokens = sum(estimate_tokens(line) + 1 for _, lines in episodes for line in lines)
+        if total_tokens <= PROPOSAL_TRANSCRIPT_TOKENS:
+            if len(episodes) == 1:
+                return "=== SUBTITLE FILE ===\n" + "\n".join(episodes[0][1])
+            # Season update: one labelled transcript per episode file
+            return "=== SUBTITLE FILES ===\n" + "\n\n".join(f"--- {label} ---\n" + "\n".join(lines) for label, lines in episodes)
+
+        keys = {normalize_text(value).strip() for value in findings.get("characters", []) + findings.get("terms", [])}
+        automaton = KeywordAutomaton({key: {("finding", key)} for key in keys if key})
+        mentions = [
+            [(label, line, automaton.find(normalize_text(line))) for line in lines]
+            for label, lines in episodes
+        ]
+        # Halve the per-episode cap until the excerpt fits, then fall back to one line per mention across the whole
+        # input; anything still over budget is dropped from the end.
+        caps = [PROPOSAL_LINES_PER_MENTION >> shift for shift in range(PROPOSAL_LINES_PER_MENTION.bit_length())]
+        for cap, per_episode in [(cap, True) for cap in caps] + [(1, False)]:
+            excerpt = self._select_mention_lines(mentions, cap, per_episode)
+            if sum(estimate_tokens(line) + 1 for _, line in excerpt) <= PROPOSAL_TRANSCRIPT_TOKENS:
+                break
+
+        sections: dict[str, list[str]] = {}
+        used_tokens = 0
+        for label, line in excerpt:
+            used_tokens += estimate_tokens(line) + 1
+            if used_tokens > PROPOSAL_TRANSCRIPT_TOKENS:
+                break
+            sections.setdefault(label, []).append(line)
+        parts = ["=== SUBTITLE EXCERPTS (lines mentioning the scanned characters and terms) ==="]
+        parts.extend(f"--- {label} ---\n" + "\n".join(lines) for label, lines in sections.items())
+        if findings.get("events"):
+            parts.append("=== SCANNED EVENTS ===\n" + "\n".join(f"- {event}" for event in findings["events"]))
+        return "\n\n".join(parts)
+
+    def _select_mention_lines(self, mentions: list[list[tuple[str, str, set]]], cap: int, per_episode: bool) -> list[tuple[str, str]]:
+        """Return (episode label, line) in transcript order for lines that mention a name or term still under cap lines, counted per episode or across all."""
+        selected = []
+        counts: dict[tuple[str, str], int] = {}
+        for episode in mentions:
+            if per_episode:
+                counts = {}
+            for label, line, found in episode:
+                if not any(counts.get(payload, 0) < cap for payload in found):
+                    continue
+                for payload in found:
+                    counts[payload] = counts.get(payload, 0) + 1
+                selected.append((label, line))
+        return selected
+
     def _parse_proposals(self, raw: str) -> dict:
         """Parse the LLM's proposals JSON and filter updated_characters to only valid field names; raises ValueError on malformed output."""
         text = raw.strip()
@@ -1,12 +1,26 @@
 import json
 import os
+import time
+from concurrent.futures import ThreadPoolExecutor, as_completed
 
 from interface.base_task import BaseTask
 from models.model_manager import ModelManager
 from orchestrator.progress_handler import ProgressHandler
 from orchestrator.result_handler import ResultHandler
 from prompts.library import scan_subtitle_file_prompt
-from utils.utils import load_sub_data
+from utils.library_index import normalize_text
+from utils.logger import setup_logger
+from utils.subtitle_document import episode_transcripts
+from utils.tokens import estimate_tokens
+
+logger = setup_logger()
+
+# Transcript tokens per scan call; longer files are split into chunks scanned concurrently and merged locally.
+SCAN_CHUNK_TOKENS = 6000
+# Lines repeated from the end of the previous chunk so names introduced at a boundary keep their context.
+SCAN_CHUNK_OVERLAP_LINES = 5
+DEFAULT_SCAN_CONCURRENCY = 4
+SCAN_CHUNK_ATTEMPTS = 2
 
 
 class TaskScanSubtitleFile(BaseTask):
@@ -20,7 +34,7 @@ class TaskScanSubtitleFile(BaseTask):
         return self.TASK_TYPE
 
     def run_task(self) -> dict:
-        """Send the subtitle transcript to the LLM to extract characters, terms, and events, then pass findings forward."""
+        """Split the transcript of every episode into chunks, scan them all concurrently for characters, terms and events, merge the findings across episodes, and pass them forward."""
         model_manager = ModelManager.get_instance()
         result_handler = ResultHandler.get_instance()
         progress_handler = ProgressHandler.get_instance()
@@ -30,7 +44,6 @@ class TaskScanSubtitleFile(BaseTask):
             raise RuntimeError("LLM model not initialized")
 
         data = self.get_data()
-        file_path = str(data.get("file_path", ""))
         series = data.get("series", {})
         series_name = series.get("name", "Unknown Series")
         input_lang = series.get("input_lang", "ja")
@@ -38,24 +51,76 @@ class TaskScanSubtitleFile(BaseTask):
         known_names = data.get("known_names", [])
         known_terms = data.get("known_terms", [])
         log_dir = data.get("log_dir", "")
+        concurrency = max(1, int(data.get("concurrency", DEFAULT_SCAN_CONCURRENCY)))
 
         result_handler.set_processing(self.task_type)
-        progress_handler.set(self.task_type, {"current": 0, "total": 1, "status": "Scanning subtitle file for characters and terms", "eta_seconds": 0})
 
         try:
             llm_client.set_running(True)
-            transcript = "\n".join(load_sub_data(file_path, include_speaker=True))
-            raw = model_manager.llm_infer(
-                prompt=transcript,
-                system_prompt=scan_subtitle_file_prompt(series_name, input_lang, output_lang, known_names, known_terms),
-                temperature=0.1,
-            )
-            findings = self._parse_findings(raw)
+            episodes = episode_transcripts(data)
+            # (episode label, chunk number within the episode, chunk count of the episode, lines) for every chunk of the job
+            chunks = [
+                (label, number, len(episode_chunks), lines)
+                for label, transcript in episodes
+                for episode_chunks in [self._chunk_transcript(transcript)]
+                for number, lines in enumerate(episode_chunks, start=1)
+            ]
+            scope = f"{len(episodes)} episodes" if len(episodes) > 1 else "the subtitle file"
+            progress_handler.set(self.task_type, {"current": 0, "total": len(chunks), "status": f"Scanning {len(chunks)} transcript chunk(s) of {scope} for characters and terms", "eta_seconds": 0})
+
+            chunk_results: dict[int, dict] = {}
+            start_time = time.time()
+            with ThreadPoolExecutor(max_workers=min(concurrency, len(chunks))) as executor:
+                futures = [
+                    executor.submit(
+                        self._scan_chunk,
+                        model_manager,
+                        scan_subtitle_file_prompt(
+                            series_name,
+                            input_lang,
+                            output_lang,
+                            known_names,
+                            known_terms,
+                            chunk=(episode_chunk, episode_chunk_count) if episode_chunk_count > 1 else None,
+                        ),
+                        chunk_number,
+                        lines,
+                    )
+                    for chunk_number, (_, episode_chunk, episode_chunk_count, lines) in enumerate(chunks, start=1)
+                ]
+                for future in as_completed(futures):
+                    chunk_number, result = future.result()
+                    result["episode"] = chunks[chunk_number - 1][0]
+                    if result["findings"] is not None and len(episodes) > 1:
+                        # Events are tagged with their episode so proposals built from a whole season stay traceable.
+                        result["findings"]["events"] = [f"[{result['episode']}] {event}" for event in result["findings"]["events"]]
+                    chunk_results[chunk_number] = result
+                    done = len(chunk_results)
+                    elapsed = time.time() - start_time
+                    progress_handler.set(
+                        self.task_type,
+                        {
+                            "current": done,
+                            "total": len(chunks),
+                            "status": f"Scanned chunk {done}/{len(chunks)}",
+                            "eta_seconds": elapsed / done * (len(chunks) - done),
+                        },
+                    )
+
+            ordered = [chunk_results[number] for number in sorted(chunk_results)]
+            scanned = [result["findings"] for result in ordered if result["findings"] is not None]
+            if not scanned:
+                raise ValueError(f"TaskScanSubtitleFile: every transcript chunk failed. Last error: {ordered[-1]['error']}")
+            findings = self._merge_findings(scanned)
 
             if log_dir:
-                self._write_log(log_dir, raw, findings)
+                self._write_log(log_dir, ordered, findings)
 
-            progress_handler.set(self.task_type, {"current": 1, "total": 1, "status": f"Found {len(findings['characters'])} characters, {len(findings['terms'])} terms", "eta_seconds": 0})
+            failed = len(ordered) - len(scanned)
+            status = f"Found {len(findings['characters'])} characters, {len(findings['terms'])} terms"
+            if failed:
+                status += f" ({failed} of {len(ordered)} chunks failed)"
+            progress_handler.set(self.task_type, {"current": len(chunks), "total": len(chunks), "status": status, "eta_seconds": 0})
             result_handler.set_complete(self.task_type)
             return {**data, "findings": findings}
         except Exception as exc:
@@ -64,6 +129,55 @@ class TaskScanSubtitleFile(BaseTask):
         finally:
             llm_client.set_running(False)
 
+    def _chunk_transcript(self, lines: list[str]) -> list[list[str]]:
+        """Split transcript lines into chunks of about SCAN_CHUNK_TOKENS tokens, each starting with the last SCAN_CHUNK_OVERLAP_LINES lines of the previous one."""
+        if not lines:
+            raise ValueError("Subtitle file does not contain any subtitle lines.")
+        chunks: list[list[str]] = []
+        current: list[str] = []
+        current_tokens = 0
+        fresh_lines = 0
+        for line in lines:
+            line_tokens = estimate_tokens(line) + 1
+            if fresh_lines and current_tokens + line_tokens > SCAN_CHUNK_TOKENS:
+                chunks.append(current)
+                current = current[-SCAN_CHUNK_OVERLAP_LINES:]
+                current_tokens = sum(estimate_tokens(overlap) + 1 for overlap in current)
+                fresh_lines = 0
+            current.append(line)
+            current_tokens += line_tokens
+            fresh_lines += 1
+        chunks.append(current)
+        return chunks
+
+    def _scan_chunk(self, model_manager, system_prompt: str, chunk_number: int, lines: list[str]) -> tuple[int, dict]:
+        """Scan one chunk, retrying malformed output; returns (chunk_number, {"findings", "raw_output", "error", "line_count"}) with findings None on failure."""
+        result = {"line_count": len(lines), "findings": None, "raw_output": "", "error": ""}
+        for attempt in range(1, SCAN_CHUNK_ATTEMPTS + 1):
+            try:
+                raw = model_manager.llm_infer(prompt="\n".join(lines), system_prompt=system_prompt, temperature=0.1)
+                result["raw_output"] = raw
+                result["findings"] = self._parse_findings(raw)
+                result["error"] = ""
+                break
+            except Exception as exc:
+                result["error"] = str(exc)
+                logger.warning("Scan chunk %s failed (attempt %s/%s): %s", chunk_number, attempt, SCAN_CHUNK_ATTEMPTS, exc)
+        return chunk_number, result
+
+    def _merge_findings(self, chunk_findings: list[dict]) -> dict:
+        """Merge per-chunk findings in chunk order, keeping the first spelling of names, terms and events that normalize alike."""
+        merged: dict[str, list[str]] = {"characters": [], "terms": [], "events": []}
+        for field, values in merged.items():
+            seen: set[str] = set()
+            for findings in chunk_findings:
+                for value in findings.get(field, []):
+                    key = " ".join(normalize_text(value).split())
+                    if key and key not in seen:
+                        seen.add(key)
+                        values.append(value.strip())
+        return merged
+
     def _parse_findings(self, raw: str) -> dict:
         """Parse the LLM's JSON findings into {characters, terms, events} lists; raises ValueError on malformed output."""
         text = raw.strip()
@@ -81,8 +195,17 @@ class TaskScanSubtitleFile(BaseTask):
         except Exception as exc:
             raise ValueError(f"TaskScanSubtitleFile: failed to parse LLM output as JSON. Raw output:\n{raw}") from exc
 
-    def _write_log(self, log_dir: str, raw: str, findings: dict) -> None:
-        """Write raw LLM output and parsed findings to 01-scan-subtitle-file.json in the run's log directory."""
+    def _write_log(self, log_dir: str, chunk_results: list[dict], findings: dict) -> None:
+        """Write each chunk's raw LLM output and the merged findings to 01-scan-subtitle-file.json in the run's log directory."""
         path = os.path.join(log_dir, "01-scan-subtitle-file.json")
+        payload = {
+            "chunk_count": len(chunk_results),
+            "failed_chunk_count": sum(1 for result in chunk_results if result["findings"] is None),
+            "chunks": [
+                {"chunk_number": number, "episode": result.get("episode", ""), "line_count": result["line_count"], "raw_output": result["raw_output"], "error": result["error"]}
+                for number, result in enumerate(chunk_results, start=1)
+            ],
+            "findings": findings,
+        }
         with open(path, "w", encoding="utf-8") as f:
-            json.dump({"raw_output": raw, "findings": findings}, f, ensure_ascii=False, indent=2)
+            json.dump(payload, f, ensure_ascii=False, indent=2)
@@ -1,19 +1,29 @@
 import json
 import os
+import time
+from concurrent.futures import ThreadPoolExecutor, as_completed
 
 from interface.base_task import BaseTask
 from models.model_manager import ModelManager
 from orchestrator.progress_handler import ProgressHandler
 from orchestrator.result_handler import ResultHandler
 from utils.logger import setup_logger
+from utils.search_cache import load_cached_results, save_cached_results, search_cache_key
 
 logger = setup_logger("translator-helper")
 
+SEARCH_MAX_RESULTS = 5
+DEFAULT_SEARCH_CONCURRENCY = 4
+SEARCH_ATTEMPTS = 3
+SEARCH_RETRY_DELAY_SECONDS = 1.0
+DEFAULT_SEARCH_CACHE_TTL_HOURS = 24 * 7
+
 
 class TaskWebSearch(BaseTask):
-    """Library update chain task (slot 04): execute each generated search query via Tavily and collect result snippets."""
+    """Library update chain task (slot 04): execute each generated search query via the loaded search client (Tavily, or SearchLocal offline) and collect result snippets."""
 
     TASK_TYPE = "TaskWebSearch"
+    MODEL_KIND = "search"
 
     @property
     def task_type(self) -> str:
@@ -21,7 +31,7 @@ class TaskWebSearch(BaseTask):
         return self.TASK_TYPE
 
     def run_task(self) -> dict:
-        """Run all search queries; skips if no queries or if search is not loaded; raises on search failure."""
+        """Run all search queries concurrently through the disk cache; skips if no queries, raises if search is not loaded or every query fails."""
         model_manager = ModelManager.get_instance()
         result_handler = ResultHandler.get_instance()
         progress_handler = ProgressHandler.get_instance()
@@ -41,35 +51,60 @@ class TaskWebSearch(BaseTask):
 
         search_client = model_manager.get_search_client()
         if search_client is None:
-            msg = "Tavily search not loaded. Please load the search model in Settings first."
+            msg = "Web search not loaded. Please load the search model in Settings first."
             result_handler.set_error(self.task_type, msg)
             raise RuntimeError(msg)
         if not model_manager.is_search_ready():
             status = search_client.get_status()
             load_error = model_manager.search_loading_error or "unknown error"
-            msg = f"Tavily search is in '{status}' state. Load error: {load_error}. Please reload the search model in Settings."
+            msg = f"Web search ({type(search_client).__name__}) is in '{status}' state. Load error: {load_error}. Please reload the search model in Settings."
             result_handler.set_error(self.task_type, msg)
             raise RuntimeError(msg)
 
+        concurrency = max(1, int(data.get("concurrency", DEFAULT_SEARCH_CONCURRENCY)))
+        ttl_seconds = float(data.get("search_cache_ttl_hours", DEFAULT_SEARCH_CACHE_TTL_HOURS)) * 3600
+        provider = type(search_client).__name__
+
         progress_handler.set(self.task_type, {"current": 0, "total": len(queries), "status": "Running web searches", "eta_seconds": 0})
 
         try:
-            search_results = []
-            for i, q in enumerate(queries):
-                subject = q.get("subject", "")
-                query = q.get("query", "")
-                try:
-                    snippets = search_client.search(query, max_results=5)
-                    search_results.append({"subject": subject, "results": snippets})
-                    logger.info("Web search completed: subject=%s query=%s results=%d", subject, query, len(snippets))
-                except Exception as exc:
-                    logger.error("Web search failed: subject=%s error=%s", subject, exc)
-                    result_handler.set_error(self.task_type, f"Web search failed for '{subject}': {exc}")
-                    raise
-                progress_handler.set(self.task_type, {"current": i + 1, "total": len(queries), "status": f"Searched {i + 1}/{len(queries)}", "eta_seconds": 0})
+            outcomes: dict[int, dict] = {}
+            start_time = time.time()
+            with ThreadPoolExecutor(max_workers=min(concurrency, len(queries))) as executor:
+                futures = {
+                    executor.submit(self._run_query, search_client, provider, str(q.get("query", "")), ttl_seconds): i
+                    for i, q in enumerate(queries)
+                }
+                for future in as_completed(futures):
+                    i = futures[future]
+                    outcomes[i] = future.result()
+                    subject = queries[i].get("subject", "")
+                    if outcomes[i]["error"]:
+                        logger.error("Web search failed: subject=%s error=%s", subject, outcomes[i]["error"])
+                    else:
+                        logger.info("Web search completed: subject=%s query=%s results=%d cached=%s", subject, queries[i].get("query", ""), len(outcomes[i]["results"]), outcomes[i]["cached"])
+                    done = len(outcomes)
+                    elapsed = time.time() - start_time
+                    progress_handler.set(self.task_type, {"current": done, "total": len(queries), "status": f"Searched {done}/{len(queries)}", "eta_seconds": elapsed / done * (len(queries) - done)})
+
+            failed = [i for i, outcome in outcomes.items() if outcome["error"]]
+            if len(failed) == len(queries):
+                raise RuntimeError(f"Web search failed for every query. Last error: {outcomes[failed[-1]]['error']}")
+
+            # Results stay in query order; failed queries are left out so later tasks only see real snippets.
+            search_results = [
+                {"subject": queries[i].get("subject", ""), "results": outcomes[i]["results"]}
+                for i in range(len(queries))
+                if not outcomes[i]["error"]
+            ]
 
             if log_dir:
-                self._write_log(log_dir, search_results)
+                self._write_log(
+                    log_dir,
+                    search_results,
+                    cached_count=sum(1 for outcome in outcomes.values() if outcome["cached"]),
+                    failed=[{"subject": queries[i].get("subject", ""), "query": queries[i].get("query", ""), "error": outcomes[i]["error"]} for i in failed],
+                )
 
             result_handler.set_complete(self.task_type)
             return {**data, "search_results": search_results}
@@ -77,8 +112,26 @@ class TaskWebSearch(BaseTask):
             result_handler.set_error(self.task_type, str(exc))
             raise
 
-    def _write_log(self, log_dir: str, search_results: list) -> None:
-        """Write search results to 04-web-search.json in the run's log directory."""
+    def _run_query(self, search_client, provider: str, query: str, ttl_seconds: float) -> dict:
+        """Return {"results", "cached", "error"} for one query: from the disk cache when fresh, else searched with retries and cached."""
+        key = search_cache_key(provider, query, SEARCH_MAX_RESULTS)
+        cached = load_cached_results(key, ttl_seconds)
+        if cached is not None:
+            return {"results": cached, "cached": True, "error": ""}
+        error = ""
+        for attempt in range(1, SEARCH_ATTEMPTS + 1):
+            try:
+                results = search_client.search(query, max_results=SEARCH_MAX_RESULTS)
+                save_cached_results(key, query, results)
+                return {"results": results, "cached": False, "error": ""}
+            except Exception as exc:
+                error = str(exc)
+                if attempt < SEARCH_ATTEMPTS:
+                    time.sleep(SEARCH_RETRY_DELAY_SECONDS * attempt)
+        return {"results": [], "cached": False, "error": error}
+
+    def _write_log(self, log_dir: str, search_results: list, cached_count: int = 0, failed: list | None = None) -> None:
+        """Write search results, the cache hit count and failed queries to 04-web-search.json in the run's log directory."""
         path = os.path.join(log_dir, "04-web-search.json")
         with open(path, "w", encoding="utf-8") as f:
-            json.dump({"search_results": search_results}, f, ensure_ascii=False, indent=2)
+            json.dump({"cached_count": cached_count, "failed": failed or [], "search_results": search_results}, f, ensure_ascii=False, indent=2)
@@ -1,4 +1,5 @@
 import threading
+import time
 from typing import Any, Optional
 
 
@@ -13,6 +14,9 @@ class ProgressHandler:
             raise RuntimeError("Use ProgressHandler.get_instance()")
         self._lock = threading.Lock()
         self._records: dict[str, dict[str, Any]] = {}
+        self._chain: list[str] = []
+        self._predicted_seconds: dict[str, float] = {}
+        self._started_at: dict[str, float] = {}
 
     @staticmethod
     def get_instance() -> "ProgressHandler":
@@ -21,15 +25,38 @@ class ProgressHandler:
             ProgressHandler._instance = ProgressHandler()
         return ProgressHandler._instance
 
+    def begin_chain(self, task_types: list[str], predicted_seconds: dict[str, float]):
+        """Register the task types of the chain about to run and the throughput model's predicted seconds for each."""
+        with self._lock:
+            self._chain = list(task_types)
+            self._predicted_seconds = dict(predicted_seconds)
+            self._started_at = {}
+
+    def start_task(self, task_type: str):
+        """Mark the moment a task of the chain starts, used to age its predicted duration."""
+        with self._lock:
+            self._started_at[task_type] = time.monotonic()
+
+    def end_chain(self):
+        """Forget the chain registered by begin_chain()."""
+        with self._lock:
+            self._chain = []
+            self._predicted_seconds = {}
+            self._started_at = {}
+
     def set(self, task_type: str, progress: dict[str, Any]):
-        """Store a progress snapshot for the given task type (keys: current, total, status, eta_seconds)."""
+        """Store a progress snapshot for the given task type (keys: current, total, status, eta_seconds); eta_seconds is stored chain-wide."""
         with self._lock:
+            current = int(progress.get("current", 0))
+            total = int(progress.get("total", 0))
+            task_eta = self._estimate_task_eta(task_type, current, total, float(progress.get("eta_seconds", 0.0)))
             self._records[task_type] = {
                 "task_type": task_type,
-                "current": int(progress.get("current", 0)),
-                "total": int(progress.get("total", 0)),
+                "current": current,
+                "total": total,
                 "status": str(progress.get("status", "")),
-                "eta_seconds": float(progress.get("eta_seconds", 0.0)),
+                "eta_seconds": task_eta + self._remaining_chain_seconds(task_type),
+                "task_eta_seconds": task_eta,
             }
 
     def get(self, task_type: str) -> Optional[dict[str, Any]]:
@@ -42,3 +69,28 @@ class ProgressHandler:
         """Remove the stored progress record for the given task type."""
         with self._lock:
             self._records.pop(task_type, None)
+
+    def _estimate_task_eta(self, task_type: str, current: int, total: int, reported_eta: float) -> float:
+        """Blend the task's own ETA (or one extrapolated from its elapsed time) with the predicted duration, trusting live progress more as it grows; caller must hold the lock."""
+        if total > 0 and current >= total:
+            return 0.0
+        started = self._started_at.get(task_type)
+        elapsed = time.monotonic() - started if started is not None else 0.0
+        predicted_left = max(self._predicted_seconds.get(task_type, 0.0) - elapsed, 0.0)
+
+        live_eta = reported_eta
+        if live_eta <= 0 and current > 0 and total > 0 and elapsed > 0:
+            live_eta = elapsed / current * (total - current)
+        if live_eta <= 0:
+            return predicted_left
+        if predicted_left <= 0:
+            return live_eta
+        weight = current / total if total > 0 else 0.5
+        return weight * live_eta + (1 - weight) * predicted_left
+
+    def _remaining_chain_seconds(self, task_type: str) -> float:
+        """Return the predicted seconds of the chain tasks queued after task_type; caller must hold the lock."""
+        if task_type not in self._chain:
+            return 0.0
+        position = self._chain.index(task_type)
+        return sum(self._predicted_seconds.get(later, 0.0) for later in self._chain[position + 1:])
@@ -1,18 +1,24 @@
 import json
 import os
+import re
 from pathlib import Path
 
-import pysubs2
-
 from interface.base_task import BaseTask
 from models.model_manager import ModelManager
 from orchestrator.progress_handler import ProgressHandler
 from orchestrator.result_handler import ResultHandler
-from prompts.review_file import generate_line_retranslation_prompt
+from prompts.review_file import generate_batch_retranslation_prompt, generate_line_retranslation_prompt
+from utils.ass_text import restore_ass_text
+from utils.subtitle_document import SubtitleDocument, get_document
+
+# Flagged lines at most NEIGHBORHOOD_GAP apart share one call, up to GROUP_SIZE lines per call.
+RETRANSLATION_GROUP_SIZE = 8
+NEIGHBORHOOD_GAP = 5
+CONTEXT_LINES = 2
 
 
 class TaskRetranslateReviewedLines(BaseTask):
-    """Review chain task (slot 04/final): retranslate each flagged line using its review reason, save the corrected file."""
+    """Review chain task (slot 04/final): retranslate flagged lines in neighbourhood groups using their review reasons, save the corrected file."""
 
     TASK_TYPE = "TaskRetranslateReviewedLines"
 
@@ -22,7 +28,7 @@ class TaskRetranslateReviewedLines(BaseTask):
         return self.TASK_TYPE
 
     def run_task(self) -> dict:
-        """Iterate over corrections, retranslate each flagged line, save the corrected ASS file, and mark the chain complete."""
+        """Retranslate corrections one neighbourhood group per call (per-line fallback for indices missing from the reply), save the corrected ASS file, and mark the chain complete."""
         model_manager = ModelManager.get_instance()
         result_handler = ResultHandler.get_instance()
         progress_handler = ProgressHandler.get_instance()
@@ -47,8 +53,8 @@ class TaskRetranslateReviewedLines(BaseTask):
                 raise ValueError(
                     "Translation review could not continue because the upstream review stage did not provide subtitle file paths."
                 )
-            original_subs = pysubs2.load(file_path)
-            translated_subs = pysubs2.load(translated_file_path)
+            original_subs = get_document(data)
+            translated_subs = get_document(data, "translated_file_path", "translated_document").copy()
             if len(original_subs) != len(translated_subs):
                 raise ValueError(
                     "Original and translated subtitle files must contain the same number of subtitle lines."
@@ -64,42 +70,68 @@ class TaskRetranslateReviewedLines(BaseTask):
                 },
             )
 
-            llm_client.set_running(True)
-            correction_logs = []
-            for correction_number, correction in enumerate(corrections, start=1):
+            for correction in corrections:
                 index = int(correction["index"])
-                reason = str(correction["reason"]).strip()
                 if index < 1 or index > len(original_subs):
                     raise ValueError(f"Correction index {index} is outside the subtitle file.")
 
-                original_line = original_subs[index - 1]
-                translated_line = translated_subs[index - 1]
-                corrected_text = model_manager.llm_infer(
-                    prompt=self._build_retranslation_prompt(index, original_line, translated_line, reason),
-                    system_prompt=generate_line_retranslation_prompt(
-                        context=context if context else None,
-                        input_lang=input_lang,
-                        output_lang=output_lang,
-                    ),
-                    temperature=llm_client.get_temperature(),
-                ).strip()
-                previous_text = translated_line.text
-                translated_line.text = corrected_text.replace("\\N", " ").strip()
-                correction_logs.append(
-                    {
-                        "index": index,
-                        "reason": reason,
-                        "original_text": original_line.text,
-                        "previous_translation": previous_text,
-                        "corrected_translation": translated_line.text,
-                    }
-                )
+            llm_client.set_running(True)
+            batch_system_prompt = generate_batch_retranslation_prompt(
+                context=context if context else None,
+                input_lang=input_lang,
+                output_lang=output_lang,
+            )
+            line_system_prompt = generate_line_retranslation_prompt(
+                context=context if context else None,
+                input_lang=input_lang,
+                output_lang=output_lang,
+            )
+            temperature = llm_client.get_temperature()
+            correction_logs = []
+            llm_call_count = 0
+            for group in self._group_corrections(corrections):
+                fixes = self._retranslate_group(model_manager, group, original_subs, translated_subs, batch_system_prompt, temperature)
+                llm_call_count += 1
+                for correction in group:
+                    index = int(correction["index"])
+                    reason = str(correction["reason"]).strip()
+                    mode = "batch"
+                    corrected_text = fixes.get(index)
+                    if corrected_text is None:
+                        # The group response skipped or garbled this index; fall back to the single-line prompt.
+                        mode = "line"
+                        corrected_text = model_manager.llm_infer(
+                            prompt=self._build_retranslation_prompt(index, original_subs, translated_subs, reason),
+                            system_prompt=line_system_prompt,
+                            temperature=temperature,
+                        ).strip()
+                        llm_call_count += 1
+
+                    original_line = original_subs[index - 1]
+                    translated_line = translated_subs[index - 1]
+                    previous_text = translated_line.text
+                    translated_plain, translated_markup = translated_subs.split(index - 1)
+                    translated_line.text = restore_ass_text(
+                        corrected_text.replace("\\N", " ").strip(),
+                        translated_plain,
+                        translated_markup,
+                    )
+                    correction_logs.append(
+                        {
+                            "index": index,
+                            "reason": reason,
+                            "mode": mode,
+                            "original_text": original_line.text,
+                            "previous_translation": previous_text,
+                            "corrected_translation": translated_line.text,
+                        }
+                    )
                 progress_handler.set(
                     self.task_type,
                     {
-                        "current": correction_number,
+                        "current": len(correction_logs),
                         "total": max(1, len(corrections)),
-                        "status": f"Retranslated line {correction_number}/{len(corrections)}",
+                        "status": f"Retranslated line {len(correction_logs)}/{len(corrections)}",
                         "eta_seconds": 0.0,
                     },
                 )
@@ -109,11 +141,13 @@ class TaskRetranslateReviewedLines(BaseTask):
                 log_dir=log_dir,
                 output_path=output_path,
                 correction_logs=correction_logs,
+                llm_call_count=llm_call_count,
             )
 
             payload = {
                 "corrected_count": len(corrections),
                 "output_filename": Path(output_path).name,
+                "unreviewed_batch_count": int(data.get("unreviewed_batch_count", 0)),
             }
             result_handler.set_complete(self.task_type, payload)
             return payload
@@ -123,18 +157,121 @@ class TaskRetranslateReviewedLines(BaseTask):
         finally:
             llm_client.set_running(False)
 
-    def _build_retranslation_prompt(self, index: int, original_line, translated_line, reason: str) -> str:
+    def _group_corrections(self, corrections: list[dict]) -> list[list[dict]]:
+        """Split corrections (sorted by index) into neighbourhood groups of nearby flagged lines."""
+        groups: list[list[dict]] = []
+        for correction in sorted(corrections, key=lambda entry: int(entry["index"])):
+            index = int(correction["index"])
+            if (
+                groups
+                and len(groups[-1]) < RETRANSLATION_GROUP_SIZE
+                and index - int(groups[-1][-1]["index"]) <= NEIGHBORHOOD_GAP
+            ):
+                groups[-1].append(correction)
+            else:
+                groups.append([correction])
+        return groups
+
+    def _retranslate_group(
+        self,
+        model_manager: ModelManager,
+        group: list[dict],
+        original_subs: SubtitleDocument,
+        translated_subs: SubtitleDocument,
+        system_prompt: str,
+        temperature: float | None,
+    ) -> dict[int, str]:
+        """Retranslate a group of flagged lines in one call and return {index: corrected text} for the indices that came back valid."""
+        raw_output = model_manager.llm_infer(
+            prompt=self._build_group_retranslation_prompt(group, original_subs, translated_subs),
+            system_prompt=system_prompt,
+            temperature=temperature,
+        )
+        expected = {int(correction["index"]) for correction in group}
+        try:
+            parsed = json.loads(self._extract_json_payload(raw_output))
+        except ValueError:
+            return {}
+        entries = parsed.get("corrections") if isinstance(parsed, dict) else None
+        fixes: dict[int, str] = {}
+        for entry in entries if isinstance(entries, list) else []:
+            if not isinstance(entry, dict):
+                continue
+            index = entry.get("index")
+            text = entry.get("text")
+            if isinstance(index, int) and index in expected and isinstance(text, str) and text.strip():
+                fixes.setdefault(index, text.strip())
+        return fixes
+
+    def _build_group_retranslation_prompt(
+        self,
+        group: list[dict],
+        original_subs: SubtitleDocument,
+        translated_subs: SubtitleDocument,
+    ) -> str:
+        """Build the user-turn prompt listing the group's surrounding lines and each flagged line with its index and review reason."""
+        flagged = {int(correction["index"]) for correction in group}
+        first_index = max(1, min(flagged) - CONTEXT_LINES)
+        last_index = min(len(original_subs), max(flagged) + CONTEXT_LINES)
+        context_lines = []
+        for index in range(first_index, last_index + 1):
+            if index in flagged:
+                continue
+            speaker = original_subs[index - 1].name.strip() or "Unknown"
+            context_lines.append(
+                f"{index}. {speaker}: {original_subs.plain_text(index - 1)} => {translated_subs.plain_text(index - 1)}"
+            )
+        flagged_blocks = [
+            self._build_retranslation_prompt(
+                int(correction["index"]),
+                original_subs,
+                translated_subs,
+                str(correction["reason"]).strip(),
+            )
+            for correction in group
+        ]
+        return f"""
+        <CONTEXT_LINES>
+        {chr(10).join(context_lines) or "None"}
+        </CONTEXT_LINES>
+
+        <FLAGGED_LINES>
+        {(chr(10) + chr(10)).join(flagged_blocks)}
+        </FLAGGED_LINES>
+        """.strip()
+
+    def _extract_json_payload(self, raw_output: str) -> str:
+        """Extract the first JSON object from the LLM's raw output, stripping any markdown code fences."""
+        cleaned = raw_output.strip()
+        fenced_match = re.search(r"```(?:json)?\s*(\{.*\})\s*```", cleaned, re.DOTALL)
+        if fenced_match:
+            return fenced_match.group(1).strip()
+        start = cleaned.find("{")
+        end = cleaned.rfind("}")
+        if start == -1 or end == -1 or end < start:
+            raise ValueError("Retranslation did not return a JSON object.")
+        return cleaned[start:end + 1].strip()
+
+    def _build_retranslation_prompt(
+        self,
+        index: int,
+        original_subs: SubtitleDocument,
+        translated_subs: SubtitleDocument,
+        reason: str,
+    ) -> str:
         """Build the user-turn prompt containing the line index, original, current translation, and review reason."""
+        original_line = original_subs[index - 1]
+        translated_line = translated_subs[index - 1]
         original_speaker = original_line.name.strip() if original_line.name else "Unknown"
         translated_speaker = translated_line.name.strip() if translated_line.name else "Unknown"
         return f"""
         <LINE_INDEX>{index}</LINE_INDEX>
-        <ORIGINAL_LINE>{original_speaker}: {original_line.text}</ORIGINAL_LINE>
-        <CURRENT_TRANSLATED_LINE>{translated_speaker}: {translated_line.text}</CURRENT_TRANSLATED_LINE>
+        <ORIGINAL_LINE>{original_speaker}: {original_subs.plain_text(index - 1)}</ORIGINAL_LINE>
+        <CURRENT_TRANSLATED_LINE>{translated_speaker}: {translated_subs.plain_text(index - 1)}</CURRENT_TRANSLATED_LINE>
         <REVIEW_REASON>{reason}</REVIEW_REASON>
         """.strip()
 
-    def _save_corrected_file(self, translated_subs, translated_filename: str) -> str:
+    def _save_corrected_file(self, translated_subs: SubtitleDocument, translated_filename: str) -> str:
         """Save the corrected subtitle file as <original_stem>.corrected.ass under outputs/sub-files/reviewed/ and return the path."""
         safe_name = os.path.basename(translated_filename) or "translated.ass"
         path = Path(safe_name)
@@ -152,6 +289,7 @@ class TaskRetranslateReviewedLines(BaseTask):
         log_dir: str,
         output_path: str,
         correction_logs: list[dict],
+        llm_call_count: int = 0,
     ):
         """Write the per-line correction audit as 04-retranslate-reviewed-lines.json in the run's log directory."""
         if not log_dir:
@@ -163,6 +301,7 @@ class TaskRetranslateReviewedLines(BaseTask):
             "task_type": self.task_type,
             "output_filename": Path(output_path).name,
             "corrected_count": len(correction_logs),
+            "llm_call_count": llm_call_count,
             "corrections": correction_logs,
         }
         with open(output_dir / "04-retranslate-reviewed-lines.json", "w", encoding="utf-8") as file_handle:
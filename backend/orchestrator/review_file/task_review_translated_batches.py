@@ -1,14 +1,45 @@
 import json
+import random
 import re
+import time
+from concurrent.futures import ThreadPoolExecutor, as_completed
 from pathlib import Path
 
-import pysubs2
+from anthropic import APIConnectionError as AnthropicConnectionError
+from anthropic import InternalServerError as AnthropicInternalServerError
+from anthropic import RateLimitError as AnthropicRateLimitError
+from openai import APIConnectionError as OpenAIConnectionError
+from openai import InternalServerError as OpenAIInternalServerError
+from openai import RateLimitError as OpenAIRateLimitError
 
 from interface.base_task import BaseTask
 from models.model_manager import ModelManager
 from orchestrator.progress_handler import ProgressHandler
 from orchestrator.result_handler import ResultHandler
 from prompts.review_file import generate_batch_review_prompt
+from utils.event_filter import filter_event_indices
+from utils.logger import setup_logger
+from utils.review_prescreen import screen_batches
+from utils.subtitle_document import SubtitleDocument, get_document
+
+logger = setup_logger()
+
+DEFAULT_REVIEW_CONCURRENCY = 4
+# Attempts per batch for malformed output; rate-limit and transport errors have their own retry budget with backoff.
+REVIEW_BATCH_ATTEMPTS = 3
+REVIEW_TRANSIENT_RETRIES = 5
+REVIEW_BACKOFF_BASE_SECONDS = 2.0
+REVIEW_BACKOFF_MAX_SECONDS = 30.0
+TRANSIENT_LLM_ERRORS = (
+    OpenAIRateLimitError,
+    AnthropicRateLimitError,
+    OpenAIConnectionError,
+    AnthropicConnectionError,
+    OpenAIInternalServerError,
+    AnthropicInternalServerError,
+    ConnectionError,
+    TimeoutError,
+)
 
 
 class TaskReviewTranslatedBatches(BaseTask):
@@ -22,7 +53,7 @@ class TaskReviewTranslatedBatches(BaseTask):
         return self.TASK_TYPE
 
     def run_task(self) -> dict:
-        """Review each batch with the LLM, parse correction entries, and pass a merged corrections list forward."""
+        """Pre-screen batches locally, review the flagged ones (all of them when review_mode is 'full') concurrently with the LLM, merge corrections in batch order, and pass the list forward."""
         model_manager = ModelManager.get_instance()
         result_handler = ResultHandler.get_instance()
         progress_handler = ProgressHandler.get_instance()
@@ -33,23 +64,40 @@ class TaskReviewTranslatedBatches(BaseTask):
 
         data = self.get_data()
         batches = data.get("batches") or []
-        file_path = str(data.get("file_path", ""))
-        translated_file_path = str(data.get("translated_file_path", ""))
         context = data.get("context") or {}
         input_lang = str(data.get("input_lang", "ja"))
         output_lang = str(data.get("output_lang", "en"))
         log_dir = str(data.get("log_dir", ""))
+        concurrency = max(1, int(data.get("concurrency", DEFAULT_REVIEW_CONCURRENCY)))
+        review_mode = str(data.get("review_mode", "flagged"))
+        glossary = (data.get("series") or {}).get("glossary") or []
 
         result_handler.set_processing(self.task_type)
         try:
-            original_subs = pysubs2.load(file_path)
-            translated_subs = pysubs2.load(translated_file_path)
+            original_subs = get_document(data)
+            translated_subs = get_document(data, "translated_file_path", "translated_document")
             if len(original_subs) != len(translated_subs):
                 raise ValueError(
                     "Original and translated subtitle files must contain the same number of subtitle lines."
                 )
             if not batches:
                 raise ValueError("Review requires at least one planned batch.")
+            included_indices = filter_event_indices(original_subs, data.get("event_filter"))
+            included = set(included_indices)
+            screening = screen_batches(
+                [original_subs.plain_text(index) for index in range(len(original_subs))],
+                [translated_subs.plain_text(index) for index in range(len(translated_subs))],
+                batches,
+                included_indices,
+                input_lang=input_lang,
+                output_lang=output_lang,
+                glossary=glossary,
+            )
+            screened_out = {
+                batch_number
+                for batch_number, screen in enumerate(screening, start=1)
+                if review_mode != "full" and not screen["flagged"]
+            }
 
             progress_handler.set(
                 self.task_type,
@@ -62,44 +110,60 @@ class TaskReviewTranslatedBatches(BaseTask):
             )
 
             llm_client.set_running(True)
+            system_prompt = generate_batch_review_prompt(
+                context=context if context else None,
+                input_lang=input_lang,
+                output_lang=output_lang,
+            )
+            # Batches the local pre-screen found nothing suspicious in are accepted without an LLM call.
+            results: dict[int, tuple[list[dict[str, int | str]] | None, list[dict]]] = {
+                batch_number: ([], []) for batch_number in screened_out
+            }
+            with ThreadPoolExecutor(max_workers=concurrency) as executor:
+                futures = []
+                for batch_number, batch in enumerate(batches, start=1):
+                    if batch_number in screened_out:
+                        continue
+                    start_index = int(batch["start_index"])
+                    end_index = int(batch["end_index"])
+                    futures.append(
+                        executor.submit(
+                            self._review_batch,
+                            model_manager,
+                            system_prompt,
+                            batch_number,
+                            len(batches),
+                            batch,
+                            self._build_indexed_lines(original_subs, start_index, end_index, included),
+                            self._build_indexed_lines(translated_subs, start_index, end_index, included),
+                        )
+                    )
+                for completed, future in enumerate(as_completed(futures), start=len(screened_out) + 1):
+                    batch_number, batch_corrections, batch_failures = future.result()
+                    results[batch_number] = (batch_corrections, batch_failures)
+                    progress_handler.set(
+                        self.task_type,
+                        {
+                            "current": completed,
+                            "total": len(batches),
+                            "status": f"Reviewed batch {completed}/{len(batches)}",
+                            "eta_seconds": 0.0,
+                        },
+                    )
+
+            # Merge in batch order so the result does not depend on which batch finished first.
             corrections_by_index: dict[int, dict[str, int | str]] = {}
             batch_logs = []
             failure_logs: list[dict] = []
-
+            failed_batches: list[dict] = []
             for batch_number, batch in enumerate(batches, start=1):
-                start_index = int(batch["start_index"])
-                end_index = int(batch["end_index"])
-                original_lines = self._build_indexed_lines(original_subs, start_index, end_index)
-                translated_lines = self._build_indexed_lines(translated_subs, start_index, end_index)
-                raw_output = model_manager.llm_infer(
-                    prompt=self._build_review_prompt(original_lines, translated_lines),
-                    system_prompt=generate_batch_review_prompt(
-                        context=context if context else None,
-                        input_lang=input_lang,
-                        output_lang=output_lang,
-                    ),
-                    temperature=0.1,
-                )
-                try:
-                    batch_corrections = self._parse_corrections(raw_output, start_index, end_index)
-                except ValueError as exc:
-                    failure_logs.append(
-                        self._build_failure_log(
-                            batch_number=batch_number,
-                            total_batches=len(batches),
-                            start_index=start_index,
-                            end_index=end_index,
-                            original_lines=original_lines,
-                            translated_lines=translated_lines,
-                            raw_output=raw_output,
-                            failure=str(exc),
-                        )
-                    )
-                    self._write_failure_log(log_dir=log_dir, failure_logs=failure_logs)
-                    raise ValueError(
-                        "Generated review output is malformed JSON. "
-                        f"Batch {start_index}-{end_index} must return exactly one JSON object with a 'corrections' array."
-                    ) from exc
+                batch_corrections, batch_failures = results[batch_number]
+                failure_logs.extend(batch_failures)
+                prescreen = screening[batch_number - 1]
+                if batch_corrections is None:
+                    failed_batches.append(batch)
+                    batch_logs.append({"batch": batch, "corrections": [], "failed": True, "prescreen": prescreen})
+                    continue
                 for correction in batch_corrections:
                     index = int(correction["index"])
                     reason = str(correction["reason"]).strip()
@@ -109,31 +173,48 @@ class TaskReviewTranslatedBatches(BaseTask):
                             corrections_by_index[index]["reason"] = f"{existing_reason} {reason}".strip()
                     else:
                         corrections_by_index[index] = {"index": index, "reason": reason}
-
                 batch_logs.append(
                     {
                         "batch": batch,
                         "corrections": batch_corrections,
+                        "reviewed": batch_number not in screened_out,
+                        "prescreen": prescreen,
                     }
                 )
-                progress_handler.set(
-                    self.task_type,
-                    {
-                        "current": batch_number,
-                        "total": len(batches),
-                        "status": f"Reviewed batch {batch_number}/{len(batches)}",
-                        "eta_seconds": 0.0,
-                    },
+
+            self._write_failure_log(log_dir=log_dir, failure_logs=failure_logs)
+            if failed_batches and len(failed_batches) == len(batches) - len(screened_out):
+                raise ValueError(
+                    "Every review batch failed. "
+                    "Each batch must return exactly one JSON object with a 'corrections' array."
+                )
+            for batch in failed_batches:
+                logger.warning(
+                    "Review batch %s-%s failed after all retries; its lines are left unreviewed",
+                    batch["start_index"],
+                    batch["end_index"],
                 )
 
             corrections = [corrections_by_index[index] for index in sorted(corrections_by_index)]
             payload = dict(data)
             payload["corrections"] = corrections
+            payload["unreviewed_batch_count"] = len(failed_batches)
+
+            status = f"Reviewed {len(batches)} batches, {len(corrections)} lines flagged"
+            if failed_batches:
+                status += f" ({len(failed_batches)} batches left unreviewed after failed attempts)"
+            progress_handler.set(
+                self.task_type,
+                {"current": len(batches), "total": len(batches), "status": status, "eta_seconds": 0.0},
+            )
 
             self._write_review_log(
                 log_dir=log_dir,
                 batch_count=len(batches),
                 correction_count=len(corrections),
+                failed_batch_count=len(failed_batches),
+                review_mode=review_mode,
+                screened_out_count=len(screened_out),
                 batch_logs=batch_logs,
                 corrections=corrections,
                 original_subs=original_subs,
@@ -147,13 +228,73 @@ class TaskReviewTranslatedBatches(BaseTask):
         finally:
             llm_client.set_running(False)
 
-    def _build_indexed_lines(self, subs, start_index: int, end_index: int) -> list[str]:
-        """Return subtitle events in the given 1-based index range formatted as '1. Speaker: text'."""
+    def _review_batch(
+        self,
+        model_manager: ModelManager,
+        system_prompt: str,
+        batch_number: int,
+        total_batches: int,
+        batch: dict,
+        original_lines: list[str],
+        translated_lines: list[str],
+    ) -> tuple[int, list[dict[str, int | str]] | None, list[dict]]:
+        """Review one batch, retrying it alone on malformed output and with exponential backoff on rate-limit or transport errors; returns (batch_number, corrections or None if every attempt failed, failure logs)."""
+        if not original_lines:
+            return batch_number, [], []
+        start_index = int(batch["start_index"])
+        end_index = int(batch["end_index"])
+        failure_logs: list[dict] = []
+        output_attempts = 0
+        transient_retries = 0
+        while True:
+            raw_output = ""
+            try:
+                raw_output = model_manager.llm_infer(
+                    prompt=self._build_review_prompt(original_lines, translated_lines),
+                    system_prompt=system_prompt,
+                    temperature=0.1,
+                )
+                return batch_number, self._parse_corrections(raw_output, start_index, end_index), failure_logs
+            except Exception as exc:
+                failure_logs.append(
+                    self._build_failure_log(
+                        batch_number=batch_number,
+                        total_batches=total_batches,
+                        start_index=start_index,
+                        end_index=end_index,
+                        original_lines=original_lines,
+                        translated_lines=translated_lines,
+                        raw_output=raw_output,
+                        failure=str(exc),
+                    )
+                )
+                if isinstance(exc, TRANSIENT_LLM_ERRORS):
+                    transient_retries += 1
+                    if transient_retries > REVIEW_TRANSIENT_RETRIES:
+                        break
+                    delay = self._backoff_seconds(transient_retries)
+                    logger.warning("Review batch %s hit %s; retrying in %.1fs", batch_number, type(exc).__name__, delay)
+                    time.sleep(delay)
+                else:
+                    output_attempts += 1
+                    if output_attempts >= REVIEW_BATCH_ATTEMPTS:
+                        break
+        return batch_number, None, failure_logs
+
+    def _backoff_seconds(self, retry: int) -> float:
+        """Return the delay before the given 1-based transient retry: exponential from REVIEW_BACKOFF_BASE_SECONDS, capped, with jitter so concurrent workers spread out."""
+        delay = min(REVIEW_BACKOFF_MAX_SECONDS, REVIEW_BACKOFF_BASE_SECONDS * 2 ** (retry - 1))
+        return random.uniform(delay / 2, delay)
+
+    def _build_indexed_lines(self, subs: SubtitleDocument, start_index: int, end_index: int, included: set[int] | None = None) -> list[str]:
+        """Return subtitle events in the given 1-based index range formatted as '1. Speaker: text', skipping events outside `included` (0-based)."""
         lines = []
         for index in range(start_index, end_index + 1):
+            if included is not None and index - 1 not in included:
+                continue
             line = subs[index - 1]
             speaker = line.name.strip() if line.name else "Unknown"
-            text = line.text.strip() or "[EMPTY]"
+            text = subs.plain_text(index - 1) or "[EMPTY]"
             lines.append(f"{index}. {speaker}: {text}")
         return lines
 
@@ -223,6 +364,9 @@ class TaskReviewTranslatedBatches(BaseTask):
         correction_count: int,
         batch_logs: list[dict],
         corrections: list[dict[str, int | str]],
+        failed_batch_count: int = 0,
+        review_mode: str = "full",
+        screened_out_count: int = 0,
         original_subs=None,
         translated_subs=None,
     ):
@@ -247,6 +391,9 @@ class TaskReviewTranslatedBatches(BaseTask):
             "task_type": self.task_type,
             "batch_count": batch_count,
             "correction_count": correction_count,
+            "failed_batch_count": failed_batch_count,
+            "review_mode": review_mode,
+            "screened_out_batch_count": screened_out_count,
             "batches": batch_logs,
             "corrections": enriched_corrections,
         }
@@ -1,6 +1,9 @@
 import threading
 import time
 from interface.base_task import BaseTask
+from models.model_manager import ModelManager
+from orchestrator.progress_handler import ProgressHandler
+from orchestrator.throughput_model import ThroughputModel, measure_job
 from typing import Any, Optional
 from utils.logger import setup_logger
 
@@ -66,12 +69,25 @@ class TaskOrchestrator:
             self._is_doing_task = True
             tasks = list(self._task_list)
 
+        progress_handler = ProgressHandler.get_instance()
+        throughput_model = ThroughputModel.get_instance()
         try:
             output = initial_data or {}
+            job_size = measure_job(output)
+            batch_size = int(output.get("batch_size", 0) or 0)
+            profiles = {task.task_type: self._model_profile(task) for task in tasks}
+            progress_handler.begin_chain(
+                [task.task_type for task in tasks],
+                {
+                    task.task_type: throughput_model.predict(task.task_type, profiles[task.task_type], batch_size, job_size)
+                    for task in tasks
+                },
+            )
             for task in tasks:
                 with self._lock:
                     self._active_task_type = task.task_type
                 task.set_data(output)
+                progress_handler.start_task(task.task_type)
 
                 filename = self._extract_filename(output)
                 log_prefix = f"task={task.task_type}"
@@ -92,12 +108,35 @@ class TaskOrchestrator:
                     elapsed = time.perf_counter() - started
                     logger.error("%s FAILED elapsed=%.3fs", log_prefix, elapsed, exc_info=True)
                     raise
+                # A cache hit says nothing about model speed; a sample that cannot be stored must not fail a task that already completed.
+                if task.served_from_cache:
+                    continue
+                try:
+                    throughput_model.record(task.task_type, profiles[task.task_type], batch_size, job_size, elapsed)
+                except Exception:
+                    logger.warning("%s throughput sample not recorded", log_prefix, exc_info=True)
             return output
         finally:
+            progress_handler.end_chain()
             with self._lock:
                 self._is_doing_task = False
                 self._active_task_type = None
 
+    @staticmethod
+    def _model_profile(task: BaseTask) -> str:
+        """Return '<kind>:<provider>:<model>' for the model the task runs on, keying its throughput samples."""
+        model_manager = ModelManager.get_instance()
+        if task.MODEL_KIND == "audio":
+            client = model_manager.get_audio_client()
+        elif task.MODEL_KIND == "search":
+            client = model_manager.get_search_client()
+        else:
+            client = model_manager.get_llm_client()
+        if client is None:
+            return ""
+        model = client.get_model() if hasattr(client, "get_model") else ""
+        return f"{task.MODEL_KIND}:{type(client).__name__}:{model}"
+
     @staticmethod
     def _extract_filename(data: dict[str, Any]) -> str:
         """Return the first non-empty filename found in data (original_filename then translated_filename), for log prefixes."""
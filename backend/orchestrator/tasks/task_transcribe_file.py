@@ -1,14 +1,20 @@
+import hashlib
 import os
+import time
 
 from interface.base_task import BaseTask
 from models.model_manager import ModelManager
+from orchestrator.progress_handler import ProgressHandler
 from orchestrator.result_handler import ResultHandler
+from utils.audio_cache import file_sha256
+from utils.media_extract import extract_audio_track
 
 
 class TaskTranscribeFile(BaseTask):
     """Standalone task: transcribe a full audio file to an ASS subtitle file saved under outputs/transcribe-sub-files/."""
 
     TASK_TYPE = "TaskTranscribeFile"
+    MODEL_KIND = "audio"
 
     @property
     def task_type(self) -> str:
@@ -16,9 +22,10 @@ class TaskTranscribeFile(BaseTask):
         return self.TASK_TYPE
 
     def run_task(self) -> dict:
-        """Transcribe data['file_path'] to a subtitle file and store a complete result with no payload; cleans up the temp file after completion."""
+        """Transcribe data['file_path'] (an upload) or data['source_path'] (a server-side file) to a subtitle file chunk by chunk, demuxing the audio track of video containers first; reports audio-seconds progress with an ETA and cleans up temp files after completion."""
         model_manager = ModelManager.get_instance()
         result_handler = ResultHandler.get_instance()
+        progress_handler = ProgressHandler.get_instance()
         audio_client = model_manager.get_audio_client()
         if audio_client is None:
             result_handler.set_error(self.task_type, "Audio model not initialized")
@@ -26,13 +33,41 @@ class TaskTranscribeFile(BaseTask):
 
         data = self.get_data()
         file_path = str(data.get("file_path", ""))
+        source_path = str(data.get("source_path", "")) or file_path
         language = str(data.get("language", "ja"))
         original_filename = str(data.get("original_filename", "audio.wav"))
+        audio_track = data.get("audio_track")
 
         result_handler.set_processing(self.task_type)
+        extracted_path = ""
         try:
             audio_client.set_running(True)
-            model_manager.audio_transcribe_file(file_path, language, original_filename)
+            progress_handler.set(self.task_type, {"current": 0, "total": 0, "status": "Reading audio tracks", "eta_seconds": 0})
+            content_hash = str(data.get("content_hash", "")) or file_sha256(source_path)
+            audio_path = source_path
+            extracted = extract_audio_track(source_path, language, audio_track)
+            if extracted is not None:
+                extracted_path, stream = extracted
+                audio_path = extracted_path
+                # The demuxed file is not byte-stable across runs, so key the decoded-audio cache on source + track
+                content_hash = hashlib.sha256(f"{content_hash}:{stream['index']}".encode("utf-8")).hexdigest()
+                label = ", ".join(part for part in (stream["language"], stream["title"], stream["codec"]) if part)
+                progress_handler.set(self.task_type, {"current": 0, "total": 0, "status": f"Extracted audio track {stream['index']} ({label})", "eta_seconds": 0})
+
+            started = time.monotonic()
+
+            def on_progress(done_seconds: float, total_seconds: float):
+                """Publish seconds of audio transcribed so far and extrapolate the remaining time from the rate so far."""
+                elapsed = time.monotonic() - started
+                eta = elapsed / done_seconds * (total_seconds - done_seconds) if done_seconds > 0 else 0.0
+                progress_handler.set(self.task_type, {
+                    "current": int(done_seconds),
+                    "total": int(total_seconds),
+                    "status": f"Transcribed {self._format_clock(done_seconds)} / {self._format_clock(total_seconds)}",
+                    "eta_seconds": eta,
+                })
+
+            model_manager.audio_transcribe_file(audio_path, language, original_filename, on_progress=on_progress, content_hash=content_hash)
             result_handler.set_complete(self.task_type)
             return {}
         except Exception as exc:
@@ -40,8 +75,17 @@ class TaskTranscribeFile(BaseTask):
             raise
         finally:
             audio_client.set_running(False)
-            if file_path:
-                try:
-                    os.remove(file_path)
-                except Exception:
-                    pass
+            # source_path is a server-side file and is never deleted
+            for temp_path in (file_path, extracted_path):
+                if temp_path:
+                    try:
+                        os.remove(temp_path)
+                    except Exception:
+                        pass
+
+    @staticmethod
+    def _format_clock(seconds: float) -> str:
+        """Format seconds as H:MM:SS, or M:SS under an hour."""
+        minutes, secs = divmod(int(seconds), 60)
+        hours, minutes = divmod(minutes, 60)
+        return f"{hours}:{minutes:02d}:{secs:02d}" if hours else f"{minutes}:{secs:02d}"
@@ -9,6 +9,7 @@ class TaskTranscribeLine(BaseTask):
     """Standalone task: transcribe a single audio clip to text using the audio model."""
 
     TASK_TYPE = "TaskTranscribeLine"
+    MODEL_KIND = "audio"
 
     @property
     def task_type(self) -> str:
@@ -0,0 +1,137 @@
+"""
+Throughput model learned from finished task runs, used to predict how long each task of a chain will take.
+
+Every finished task records its wall-clock seconds against the size of the job it processed (subtitle lines
+and source tokens) under three keys of decreasing specificity:
+
+  <model kind>:<provider>:<model>|<task type>|batch=<batch size>
+  <model kind>:<provider>:<model>|<task type>
+  <task type>
+
+Predictions use the most specific key that has been observed. Sums are decayed on every new sample so the
+model follows changes in provider speed. The fitted state is stored in data/throughput_model.json.
+"""
+
+import json
+import threading
+from typing import Any, Optional
+
+from utils.config import BACKEND_DIR
+from utils.subtitle_document import get_document
+from utils.tokens import estimate_tokens
+
+MODEL_FILE = BACKEND_DIR / "data" / "throughput_model.json"
+SUBTITLE_SUFFIXES = (".ass", ".ssa", ".srt", ".vtt", ".sub")
+
+ENTRY_FIELDS = ("runs", "seconds", "line_seconds", "lines", "token_seconds", "tokens")
+
+# Weight kept by older samples each time a new one is recorded.
+DECAY = 0.8
+
+
+class ThroughputModel:
+    """Singleton that fits seconds-per-line and seconds-per-token rates per provider, model, task type and batch size."""
+
+    _instance: Optional["ThroughputModel"] = None
+
+    def __init__(self):
+        """Load the stored model state; use get_instance() instead of calling directly."""
+        if ThroughputModel._instance is not None:
+            raise RuntimeError("Use ThroughputModel.get_instance()")
+        self._lock = threading.Lock()
+        self._entries: dict[str, dict[str, float]] = {}
+        if MODEL_FILE.is_file():
+            try:
+                with open(MODEL_FILE, "r", encoding="utf-8") as f:
+                    self._entries = json.load(f).get("entries", {})
+            except (OSError, ValueError):
+                self._entries = {}
+
+    @staticmethod
+    def get_instance() -> "ThroughputModel":
+        """Return the singleton ThroughputModel, creating it on first call."""
+        if ThroughputModel._instance is None:
+            ThroughputModel._instance = ThroughputModel()
+        return ThroughputModel._instance
+
+    def record(self, task_type: str, profile: str, batch_size: int, job_size: dict[str, int], seconds: float):
+        """Fold one finished run (wall-clock seconds for a job of job_size lines/tokens) into every key it belongs to."""
+        if seconds <= 0:
+            return
+        lines = int(job_size.get("lines", 0))
+        tokens = int(job_size.get("tokens", 0))
+        with self._lock:
+            for key in self._keys(task_type, profile, batch_size):
+                entry = self._entries.setdefault(key, dict.fromkeys(ENTRY_FIELDS, 0.0))
+                for field in entry:
+                    entry[field] *= DECAY
+                entry["runs"] += 1
+                entry["seconds"] += seconds
+                if lines:
+                    entry["line_seconds"] += seconds
+                    entry["lines"] += lines
+                if tokens:
+                    entry["token_seconds"] += seconds
+                    entry["tokens"] += tokens
+            self._save()
+
+    def predict(self, task_type: str, profile: str, batch_size: int, job_size: dict[str, int]) -> float:
+        """Return the predicted wall-clock seconds for a task on a job of job_size, or 0.0 if nothing comparable has been recorded."""
+        lines = int(job_size.get("lines", 0))
+        tokens = int(job_size.get("tokens", 0))
+        with self._lock:
+            for key in self._keys(task_type, profile, batch_size):
+                entry = self._entries.get(key)
+                if not entry or entry["runs"] <= 0:
+                    continue
+                if tokens and entry["tokens"] > 0:
+                    return entry["token_seconds"] / entry["tokens"] * tokens
+                if lines and entry["lines"] > 0:
+                    return entry["line_seconds"] / entry["lines"] * lines
+                return entry["seconds"] / entry["runs"]
+        return 0.0
+
+    def get_rates(self) -> dict[str, dict[str, float]]:
+        """Return lines-per-second and tokens-per-second for every stored key, for diagnostics."""
+        with self._lock:
+            return {
+                key: {
+                    "runs": round(entry["runs"], 3),
+                    "lines_per_second": entry["lines"] / entry["line_seconds"] if entry["line_seconds"] else 0.0,
+                    "tokens_per_second": entry["tokens"] / entry["token_seconds"] if entry["token_seconds"] else 0.0,
+                    "seconds_per_run": entry["seconds"] / entry["runs"] if entry["runs"] else 0.0,
+                }
+                for key, entry in self._entries.items()
+            }
+
+    @staticmethod
+    def _keys(task_type: str, profile: str, batch_size: int) -> list[str]:
+        """Return the lookup keys for a task from most to least specific."""
+        keys = []
+        if profile:
+            if batch_size:
+                keys.append(f"{profile}|{task_type}|batch={batch_size}")
+            keys.append(f"{profile}|{task_type}")
+        keys.append(task_type)
+        return keys
+
+    def _save(self):
+        """Persist the model state; caller must hold the lock."""
+        MODEL_FILE.parent.mkdir(parents=True, exist_ok=True)
+        with open(MODEL_FILE, "w", encoding="utf-8") as f:
+            json.dump({"decay": DECAY, "entries": self._entries}, f, indent=2)
+
+
+def measure_job(data: dict[str, Any]) -> dict[str, int]:
+    """Return the subtitle line and source token counts of the job's file_path, or zeros if it is not a subtitle file; parses the job's shared document."""
+    file_path = str(data.get("file_path", ""))
+    if not file_path.lower().endswith(SUBTITLE_SUFFIXES):
+        return {"lines": 0, "tokens": 0}
+    try:
+        subs = get_document(data)
+    except Exception:
+        return {"lines": 0, "tokens": 0}
+    return {
+        "lines": len(subs),
+        "tokens": sum(estimate_tokens(subs.plain_text(index)) for index in range(len(subs))),
+    }
@@ -2,13 +2,14 @@ import json
 import re
 from pathlib import Path
 
-import pysubs2
-
 from interface.base_task import BaseTask
 from models.model_manager import ModelManager
 from orchestrator.progress_handler import ProgressHandler
 from orchestrator.result_handler import ResultHandler
 from prompts.translate_file import generate_batch_plan_prompt
+from utils.event_filter import filter_event_indices, resolve_event_filter, to_file_batches
+from utils.plan_cache import load_cached_plan, plan_cache_key, save_cached_plan
+from utils.subtitle_document import SubtitleDocument, get_document
 
 
 class TaskPlanTranslationBatches(BaseTask):
@@ -22,7 +23,7 @@ class TaskPlanTranslationBatches(BaseTask):
         return self.TASK_TYPE
 
     def run_task(self) -> dict:
-        """Load the subtitle file, call the LLM to plan batches, validate the result, and pass batches forward in the data dict."""
+        """Reuse a saved plan for this file and settings or call the LLM to plan batches, validate the result, and pass batches forward in the data dict."""
         model_manager = ModelManager.get_instance()
         result_handler = ResultHandler.get_instance()
         progress_handler = ProgressHandler.get_instance()
@@ -32,38 +33,59 @@ class TaskPlanTranslationBatches(BaseTask):
             raise RuntimeError("LLM model not initialized")
 
         data = self.get_data()
-        file_path = str(data.get("file_path", ""))
         original_filename = data.get("original_filename")
         context = data.get("context") or {}
         input_lang = str(data.get("input_lang", "ja"))
         output_lang = str(data.get("output_lang", "en"))
         batch_size = max(1, int(data.get("batch_size", 50)))
+        event_filter = data.get("event_filter")
+        reuse_plan = bool(data.get("reuse_plan", True))
         log_dir = str(data.get("log_dir", ""))
 
         result_handler.set_processing(self.task_type)
         try:
-            indexed_lines, total_lines = self._load_indexed_lines(file_path)
+            document = get_document(data)
+            indexed_lines, total_lines, included_indices = self._load_indexed_lines(document, event_filter)
+            cache_key = plan_cache_key(
+                document.content_hash,
+                {
+                    "input_lang": input_lang,
+                    "output_lang": output_lang,
+                    "event_filter": resolve_event_filter(event_filter),
+                    "context": context,
+                },
+            )
+            compact_batches = self._load_cached_batches(cache_key, len(indexed_lines)) if reuse_plan else None
+            plan_source = "cache" if compact_batches is not None else "llm"
+            self.served_from_cache = plan_source == "cache"
             progress_handler.set(
                 self.task_type,
                 {
                     "current": 0,
                     "total": 1,
-                    "status": f"Planning semantic translation batches for {total_lines} subtitle lines",
+                    "status": f"Planning semantic translation batches for {len(indexed_lines)} of {total_lines} subtitle lines",
                     "eta_seconds": 0.0,
                 },
             )
 
-            llm_client.set_running(True)
-            raw_output = model_manager.llm_infer(
-                prompt=self._build_lines_prompt(indexed_lines),
-                system_prompt=generate_batch_plan_prompt(
-                    context=context if context else None,
-                    input_lang=input_lang,
-                    output_lang=output_lang,
-                ),
-                temperature=0.1,
-            )
-            batches = self._parse_batches(raw_output, expected_start=1, expected_end=total_lines)
+            if compact_batches is None:
+                llm_client.set_running(True)
+                raw_output = model_manager.llm_infer(
+                    prompt=self._build_lines_prompt(indexed_lines),
+                    system_prompt=generate_batch_plan_prompt(
+                        context=context if context else None,
+                        input_lang=input_lang,
+                        output_lang=output_lang,
+                    ),
+                    temperature=0.1,
+                )
+                compact_batches = self._parse_batches(raw_output, expected_start=1, expected_end=len(indexed_lines))
+                save_cached_plan(
+                    cache_key,
+                    compact_batches,
+                    {"original_filename": str(original_filename or ""), "total_lines": total_lines, "included_lines": len(indexed_lines)},
+                )
+            batches = to_file_batches(compact_batches, included_indices, total_lines)
             payload = {**data, "batches": batches}
             self._write_plan_log(
                 log_dir=log_dir,
@@ -72,14 +94,16 @@ class TaskPlanTranslationBatches(BaseTask):
                 output_lang=output_lang,
                 batch_size=batch_size,
                 total_lines=total_lines,
+                included_lines=len(indexed_lines),
                 batches=batches,
+                plan_source=plan_source,
             )
             progress_handler.set(
                 self.task_type,
                 {
                     "current": 1,
                     "total": 1,
-                    "status": f"Planned {len(batches)} semantic batches",
+                    "status": f"Planned {len(batches)} semantic batches" if plan_source == "llm" else f"Reused a saved plan of {len(batches)} semantic batches",
                     "eta_seconds": 0.0,
                 },
             )
@@ -91,17 +115,30 @@ class TaskPlanTranslationBatches(BaseTask):
         finally:
             llm_client.set_running(False)
 
-    def _load_indexed_lines(self, file_path: str) -> tuple[list[str], int]:
-        """Load a subtitle file and return lines formatted as '1. Speaker: text' plus the total line count."""
-        subs = pysubs2.load(file_path)
+    def _load_indexed_lines(self, subs: SubtitleDocument, event_filter: dict | None = None) -> tuple[list[str], int, list[int]]:
+        """Return the events passing event_filter as '1. Speaker: text' (numbered compactly), the total event count, and the included 0-based indices."""
+        if not len(subs):
+            raise ValueError("Subtitle file does not contain any subtitle lines.")
+        included_indices = filter_event_indices(subs, event_filter)
         indexed_lines: list[str] = []
-        for index, line in enumerate(subs, start=1):
+        for number, index in enumerate(included_indices, start=1):
+            line = subs[index]
             speaker = line.name.strip() if line.name else "Unknown"
-            text = line.text.strip() or "[EMPTY]"
-            indexed_lines.append(f"{index}. {speaker}: {text}")
+            text = subs.plain_text(index) or "[EMPTY]"
+            indexed_lines.append(f"{number}. {speaker}: {text}")
         if not indexed_lines:
-            raise ValueError("Subtitle file does not contain any subtitle lines.")
-        return indexed_lines, len(indexed_lines)
+            raise ValueError("No subtitle lines are left to translate after applying the event filter.")
+        return indexed_lines, len(subs), included_indices
+
+    def _load_cached_batches(self, cache_key: str, included_lines: int) -> list[dict[str, int | str]] | None:
+        """Return the cached compact plan for cache_key if it still validates against the file's included lines, else None."""
+        cached = load_cached_plan(cache_key)
+        if cached is None:
+            return None
+        try:
+            return self._parse_batches(json.dumps({"batches": cached}), expected_start=1, expected_end=included_lines)
+        except ValueError:
+            return None
 
     def _write_plan_log(
         self,
@@ -111,7 +148,9 @@ class TaskPlanTranslationBatches(BaseTask):
         output_lang: str,
         batch_size: int,
         total_lines: int,
+        included_lines: int,
         batches: list[dict[str, int | str]],
+        plan_source: str = "llm",
     ):
         """Write the batch plan as 01-plan-translation-batches.json in the run's log directory."""
         if not log_dir:
@@ -126,7 +165,9 @@ class TaskPlanTranslationBatches(BaseTask):
             "output_lang": output_lang,
             "batch_size": batch_size,
             "total_lines": total_lines,
+            "included_lines": included_lines,
             "batch_count": len(batches),
+            "plan_source": plan_source,
             "batches": batches,
         }
         with open(output_dir / "01-plan-translation-batches.json", "w", encoding="utf-8") as file_handle:
@@ -1,13 +1,19 @@
 import json
 from pathlib import Path
 
-import pysubs2
-
 from interface.base_task import BaseTask
 from models.model_manager import ModelManager
 from orchestrator.progress_handler import ProgressHandler
 from orchestrator.result_handler import ResultHandler
 from prompts.library_context import select_library_context_prompt
+from utils.event_filter import filter_event_indices
+from utils.library_context import format_characters, format_glossary
+from utils.library_index import build_library_index, match_library_index
+from utils.subtitle_document import SubtitleDocument, get_document
+
+
+# hybrid: exact local matches are selected, partial/fuzzy ones go to the LLM; fast: local matches only; llm: the LLM selects from the whole library.
+SELECTION_MODES = ("hybrid", "fast", "llm")
 
 
 class TaskSelectLibraryContext(BaseTask):
@@ -21,17 +27,17 @@ class TaskSelectLibraryContext(BaseTask):
         return self.TASK_TYPE
 
     def run_task(self) -> dict:
-        """Read the subtitle file and series library, ask the LLM to select relevant entries, merge into context."""
+        """Match the series library against the subtitle file locally, let the LLM settle uncertain matches (mode permitting), and merge the selection into context."""
         model_manager = ModelManager.get_instance()
         result_handler = ResultHandler.get_instance()
         progress_handler = ProgressHandler.get_instance()
 
         data = self.get_data()
-        file_path = str(data.get("file_path", ""))
         series = data.get("series") or {}
         context = dict(data.get("context") or {})
         input_lang = str(data.get("input_lang", "ja"))
         output_lang = str(data.get("output_lang", "en"))
+        selection_mode = str(data.get("library_context_mode", "hybrid"))
         log_dir = str(data.get("log_dir", ""))
 
         result_handler.set_processing(self.task_type)
@@ -46,46 +52,71 @@ class TaskSelectLibraryContext(BaseTask):
             result_handler.set_complete(self.task_type)
             return {**data}
 
-        llm_client = model_manager.get_llm_client()
-        if llm_client is None:
-            result_handler.set_error(self.task_type, "LLM model not initialized")
-            raise RuntimeError("LLM model not initialized")
-
         progress_handler.set(self.task_type, {"current": 0, "total": 1, "status": "Selecting relevant library entries for this episode", "eta_seconds": 0})
 
+        llm_client = None
         try:
-            llm_client.set_running(True)
-            transcript = self._load_transcript(file_path)
-            character_ids = [c["id"] for c in characters]
-            character_names = [c["name"] for c in characters]
-            glossary_ids = [t["id"] for t in glossary]
-            glossary_terms = [t["term"] for t in glossary]
-
-            raw = model_manager.llm_infer(
-                prompt=transcript,
-                system_prompt=select_library_context_prompt(
-                    series_name=series_name,
-                    input_lang=input_lang,
-                    output_lang=output_lang,
-                    character_ids=character_ids,
-                    character_names=character_names,
-                    glossary_ids=glossary_ids,
-                    glossary_terms=glossary_terms,
-                ),
-                temperature=0.1,
+            if selection_mode not in SELECTION_MODES:
+                raise ValueError(f"library_context_mode must be one of: {', '.join(SELECTION_MODES)}")
+            numbered_lines = self._load_transcript_lines(get_document(data), data.get("event_filter"))
+            local_matches = match_library_index(
+                build_library_index(characters, glossary),
+                [line.split(". ", 1)[-1] for line in numbered_lines],
             )
-
-            selected_char_ids, selected_glossary_ids = self._parse_selection(raw)
-
-            char_lookup = {c["id"]: c for c in characters}
-            term_lookup = {t["id"]: t for t in glossary}
-            selected_characters = [char_lookup[cid] for cid in selected_char_ids if cid in char_lookup]
-            selected_glossary = [term_lookup[tid] for tid in selected_glossary_ids if tid in term_lookup]
+            candidate_characters, candidate_glossary = [], []
+            prompt_lines = numbered_lines
+            if selection_mode == "llm":
+                candidate_characters, candidate_glossary = characters, glossary
+                selected_char_ids, selected_glossary_ids = [], []
+            else:
+                certain = ("exact",) if selection_mode == "hybrid" else ("exact", "partial")
+                selected_char_ids = self._ids_with_match(local_matches["characters"], certain)
+                selected_glossary_ids = self._ids_with_match(local_matches["glossary"], certain)
+            if selection_mode == "hybrid":
+                uncertain_chars = self._ids_with_match(local_matches["characters"], ("partial", "fuzzy"))
+                uncertain_terms = self._ids_with_match(local_matches["glossary"], ("partial", "fuzzy"))
+                candidate_characters = [c for c in characters if c["id"] in uncertain_chars]
+                candidate_glossary = [t for t in glossary if t["id"] in uncertain_terms]
+                # The LLM only sees the lines where the uncertain entries matched.
+                candidate_lines = sorted(
+                    {line for cid in uncertain_chars for line in local_matches["characters"][cid]["lines"]}
+                    | {line for tid in uncertain_terms for line in local_matches["glossary"][tid]["lines"]}
+                )
+                prompt_lines = [numbered_lines[line] for line in candidate_lines]
+
+            raw = ""
+            if candidate_characters or candidate_glossary:
+                llm_client = model_manager.get_llm_client()
+                if llm_client is None:
+                    raise RuntimeError("LLM model not initialized")
+                llm_client.set_running(True)
+                raw = model_manager.llm_infer(
+                    prompt="\n".join(prompt_lines),
+                    system_prompt=select_library_context_prompt(
+                        series_name=series_name,
+                        input_lang=input_lang,
+                        output_lang=output_lang,
+                        character_ids=[c["id"] for c in candidate_characters],
+                        character_names=[self._display_name(c) for c in candidate_characters],
+                        glossary_ids=[t["id"] for t in candidate_glossary],
+                        glossary_terms=[t["term"] for t in candidate_glossary],
+                        excerpt=selection_mode == "hybrid",
+                    ),
+                    temperature=0.1,
+                )
+                llm_char_ids, llm_glossary_ids = self._parse_selection(raw)
+                selected_char_ids += [cid for cid in llm_char_ids if cid not in selected_char_ids]
+                selected_glossary_ids += [tid for tid in llm_glossary_ids if tid not in selected_glossary_ids]
+
+            selected_char_ids = set(selected_char_ids)
+            selected_glossary_ids = set(selected_glossary_ids)
+            selected_characters = [c for c in characters if c["id"] in selected_char_ids]
+            selected_glossary = [t for t in glossary if t["id"] in selected_glossary_ids]
 
             if selected_characters:
-                context["characters"] = self._format_characters(selected_characters)
+                context["characters"] = format_characters(selected_characters)
             if selected_glossary:
-                context["glossary"] = self._format_glossary(selected_glossary)
+                context["glossary"] = format_glossary(selected_glossary)
 
             library_context = {
                 "selected_characters": selected_characters,
@@ -93,7 +124,17 @@ class TaskSelectLibraryContext(BaseTask):
             }
 
             if log_dir:
-                self._write_log(log_dir, raw, series_name, len(characters), len(glossary), library_context)
+                self._write_log(
+                    log_dir,
+                    raw,
+                    series_name,
+                    len(characters),
+                    len(glossary),
+                    library_context,
+                    selection_mode=selection_mode,
+                    local_matches=local_matches,
+                    llm_candidate_count=len(candidate_characters) + len(candidate_glossary),
+                )
 
             progress_handler.set(
                 self.task_type,
@@ -111,17 +152,27 @@ class TaskSelectLibraryContext(BaseTask):
             result_handler.set_error(self.task_type, str(exc))
             raise
         finally:
-            llm_client.set_running(False)
+            if llm_client is not None:
+                llm_client.set_running(False)
 
-    def _load_transcript(self, file_path: str) -> str:
-        """Load subtitle lines as a numbered transcript string."""
-        subs = pysubs2.load(file_path)
+    def _load_transcript_lines(self, subs: SubtitleDocument, event_filter: dict | None = None) -> list[str]:
+        """Return the subtitle lines passing event_filter as numbered 'N. Speaker: text' strings."""
         lines = []
-        for index, line in enumerate(subs, start=1):
+        for index in filter_event_indices(subs, event_filter):
+            line = subs[index]
             speaker = line.name.strip() if line.name else "Unknown"
-            text = line.text.strip() or "[EMPTY]"
-            lines.append(f"{index}. {speaker}: {text}")
-        return "\n".join(lines)
+            text = subs.plain_text(index) or "[EMPTY]"
+            lines.append(f"{index + 1}. {speaker}: {text}")
+        return lines
+
+    def _ids_with_match(self, matches: dict[str, dict], strengths: tuple[str, ...]) -> list[str]:
+        """Return the entry ids whose local match strength is one of strengths."""
+        return [entry_id for entry_id, match in matches.items() if match["match"] in strengths]
+
+    def _display_name(self, character: dict) -> str:
+        """Return a character's name followed by its aliases, so the LLM can recognise partial mentions."""
+        aliases = character.get("aliases") or []
+        return f"{character['name']} ({', '.join(aliases)})" if aliases else character["name"]
 
     def _parse_selection(self, raw: str) -> tuple[list[str], list[str]]:
         """Parse the LLM JSON response into character and glossary ID lists."""
@@ -135,38 +186,6 @@ class TaskSelectLibraryContext(BaseTask):
         glossary_ids = [str(tid) for tid in parsed.get("glossary_ids", [])]
         return char_ids, glossary_ids
 
-    def _format_characters(self, characters: list[dict]) -> str:
-        """Format selected character entries as a readable text block."""
-        blocks = []
-        for char in characters:
-            lines = [f"{char['name']}"]
-            aliases = char.get("aliases") or []
-            if aliases:
-                lines.append(f"  Aliases: {', '.join(aliases)}")
-            personality = char.get("personality") or []
-            if personality:
-                lines.append(f"  Personality: {'; '.join(personality)}")
-            history = char.get("history") or []
-            if history:
-                lines.append(f"  History: {'; '.join(history)}")
-            relationships = char.get("relationships") or {}
-            for other, descs in relationships.items():
-                if descs:
-                    lines.append(f"  Relationship with {other}: {'; '.join(descs)}")
-            blocks.append("\n".join(lines))
-        return "\n\n".join(blocks)
-
-    def _format_glossary(self, glossary: list[dict]) -> str:
-        """Format selected glossary entries as a readable text block."""
-        lines = []
-        for term in glossary:
-            entry = f"{term['term']} → {term['translation']}"
-            notes = term.get("notes", "").strip()
-            if notes:
-                entry += f" ({notes})"
-            lines.append(entry)
-        return "\n".join(lines)
-
     def _write_log(
         self,
         log_dir: str,
@@ -175,6 +194,9 @@ class TaskSelectLibraryContext(BaseTask):
         total_characters: int,
         total_glossary: int,
         library_context: dict,
+        selection_mode: str = "llm",
+        local_matches: dict | None = None,
+        llm_candidate_count: int = 0,
     ) -> None:
         """Write the selection log to the per-run log directory."""
         output_dir = Path(log_dir)
@@ -188,6 +210,10 @@ class TaskSelectLibraryContext(BaseTask):
             "selected_glossary_count": len(library_context["selected_glossary"]),
             "selected_characters": library_context["selected_characters"],
             "selected_glossary": library_context["selected_glossary"],
+            "selection_mode": selection_mode,
+            "llm_candidate_count": llm_candidate_count,
+            "llm_call_count": 1 if raw else 0,
+            "local_matches": local_matches or {},
             "raw_output": raw,
         }
         with open(output_dir / self.LOG_FILENAME, "w", encoding="utf-8") as f:
@@ -3,13 +3,13 @@ import re
 import time
 from pathlib import Path
 
-import pysubs2
-
 from interface.base_task import BaseTask
 from models.model_manager import ModelManager
 from orchestrator.progress_handler import ProgressHandler
 from orchestrator.result_handler import ResultHandler
+from utils.event_filter import filter_event_indices, to_compact_batches, to_file_batches
 from utils.logger import setup_logger
+from utils.subtitle_document import SubtitleDocument, get_document
 from prompts.translate_file import generate_split_batch_plan_prompt
 
 logger = setup_logger()
@@ -37,18 +37,20 @@ class TaskSplitOversizedBatches(BaseTask):
 
         data = self.get_data()
         batches = data.get("batches") or []
-        file_path = str(data.get("file_path", ""))
         original_filename = data.get("original_filename")
         context = data.get("context") or {}
         input_lang = str(data.get("input_lang", "ja"))
         output_lang = str(data.get("output_lang", "en"))
         batch_size = max(1, int(data.get("batch_size", 50)))
+        event_filter = data.get("event_filter")
         log_dir = str(data.get("log_dir", ""))
 
         result_handler.set_processing(self.task_type)
         try:
-            indexed_lines, total_lines = self._load_indexed_lines(file_path)
-            oversized_batches = self._find_oversized_batches(batches, batch_size)
+            indexed_lines, total_lines, included_indices = self._load_indexed_lines(get_document(data), event_filter)
+            # Size limits apply to the events that will actually be translated, so work on compact numbering.
+            compact_batches = to_compact_batches(batches, included_indices)
+            oversized_batches = self._find_oversized_batches(compact_batches, batch_size)
             if oversized_batches:
                 progress_handler.set(
                     self.task_type,
@@ -63,7 +65,7 @@ class TaskSplitOversizedBatches(BaseTask):
             llm_client.set_running(True)
             repaired_batches = self._split_oversized_batches(
                 indexed_lines=indexed_lines,
-                batches=batches,
+                batches=compact_batches,
                 oversized_batches=oversized_batches,
                 max_batch_size=batch_size,
                 context=context,
@@ -72,8 +74,9 @@ class TaskSplitOversizedBatches(BaseTask):
                 model_manager=model_manager,
                 progress_handler=progress_handler,
             )
-            self._validate_final_batches(repaired_batches, total_lines, batch_size)
-            payload = {**data, "batches": repaired_batches}
+            self._validate_final_batches(repaired_batches, len(indexed_lines), batch_size)
+            file_batches = to_file_batches(repaired_batches, included_indices, total_lines)
+            payload = {**data, "batches": file_batches}
             self._write_split_log(
                 log_dir=log_dir,
                 original_filename=str(original_filename or ""),
@@ -83,7 +86,7 @@ class TaskSplitOversizedBatches(BaseTask):
                 total_lines=total_lines,
                 input_batch_count=len(batches),
                 oversized_batches=oversized_batches,
-                repaired_batches=repaired_batches,
+                repaired_batches=file_batches,
             )
             result_handler.set_complete(self.task_type)
             return payload
@@ -93,17 +96,20 @@ class TaskSplitOversizedBatches(BaseTask):
         finally:
             llm_client.set_running(False)
 
-    def _load_indexed_lines(self, file_path: str) -> tuple[list[str], int]:
-        """Load a subtitle file and return lines formatted as '1. Speaker: text' plus the total line count."""
-        subs = pysubs2.load(file_path)
+    def _load_indexed_lines(self, subs: SubtitleDocument, event_filter: dict | None = None) -> tuple[list[str], int, list[int]]:
+        """Return the events passing event_filter as '1. Speaker: text' (numbered compactly), the total event count, and the included 0-based indices."""
+        if not len(subs):
+            raise ValueError("Subtitle file does not contain any subtitle lines.")
+        included_indices = filter_event_indices(subs, event_filter)
         indexed_lines: list[str] = []
-        for index, line in enumerate(subs, start=1):
+        for number, index in enumerate(included_indices, start=1):
+            line = subs[index]
             speaker = line.name.strip() if line.name else "Unknown"
-            text = line.text.strip() or "[EMPTY]"
-            indexed_lines.append(f"{index}. {speaker}: {text}")
+            text = subs.plain_text(index) or "[EMPTY]"
+            indexed_lines.append(f"{number}. {speaker}: {text}")
         if not indexed_lines:
-            raise ValueError("Subtitle file does not contain any subtitle lines.")
-        return indexed_lines, len(indexed_lines)
+            raise ValueError("No subtitle lines are left to translate after applying the event filter.")
+        return indexed_lines, len(subs), included_indices
 
     def _write_split_log(
         self,
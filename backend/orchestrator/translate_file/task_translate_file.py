@@ -3,7 +3,6 @@ import os
 import time
 from pathlib import Path
 
-import pysubs2
 from anthropic import RateLimitError as AnthropicRateLimitError
 from openai import RateLimitError as OpenAIRateLimitError
 
@@ -13,7 +12,12 @@ from orchestrator.progress_handler import ProgressHandler
 from orchestrator.result_handler import ResultHandler
 from prompts.translate import generate_translate_sub_prompt
 from prompts.translate_file import generate_translate_batch_prompt
+from utils.ass_text import restore_ass_text
+from utils.event_filter import filter_event_indices
+from utils.library_context import format_characters, format_glossary
+from utils.library_index import LibraryMatcher
 from utils.logger import setup_logger
+from utils.subtitle_document import get_document
 
 logger = setup_logger()
 
@@ -46,6 +50,7 @@ class TaskTranslateFile(BaseTask):
         input_lang = str(data.get("input_lang", "ja"))
         output_lang = str(data.get("output_lang", "en"))
         batch_size = int(data.get("batch_size", 3))
+        event_filter = data.get("event_filter")
         log_dir = str(data.get("log_dir", ""))
 
         result_handler.set_processing(self.task_type)
@@ -67,7 +72,7 @@ class TaskTranslateFile(BaseTask):
 
         try:
             llm_client.set_running(True)
-            subs = pysubs2.load(file_path)
+            subs = get_document(data).copy()
             progress_handler.set(
                 self.task_type,
                 {
@@ -87,10 +92,11 @@ class TaskTranslateFile(BaseTask):
                 input_lang=input_lang,
                 target_lang=output_lang,
                 temperature=llm_client.get_temperature(),
+                included_indices=filter_event_indices(subs, event_filter),
+                library_context=data.get("library_context"),
                 log_dir=log_dir,
                 progress_callback=on_progress,
             )
-            self._normalize_translated_subtitles(translated_subs)
 
             safe_original_name = os.path.basename(original_filename)
             name_parts = safe_original_name.split(".")
@@ -149,31 +155,57 @@ class TaskTranslateFile(BaseTask):
         input_lang: str,
         target_lang: str,
         temperature: float | None,
+        included_indices: list[int] | None = None,
         log_dir: str = "",
         progress_callback=None,
+        library_context: dict | None = None,
     ):
-        """Translate subtitle lines in batches, splitting on format errors and falling back to per-line translation if needed."""
+        """Translate subtitle lines in batches with ASS markup stripped, splitting on format errors and falling back to per-line translation; filtered-out and tag/drawing-only events skip the LLM. Library entries in the context are narrowed to those each batch mentions."""
         processed = 0
         total_lines = len(subs)
         total_batches = len(batch_ranges)
         failure_logs: list[dict] = []
+        split_texts = [subs.split(index) for index in range(total_lines)]
+        included = set(range(total_lines) if included_indices is None else included_indices)
+        library_context = library_context or {}
+        selected_characters = library_context.get("selected_characters") or []
+        selected_glossary = library_context.get("selected_glossary") or []
+        matcher = LibraryMatcher(selected_characters, selected_glossary) if selected_characters or selected_glossary else None
 
         for batch_number, (start, end) in enumerate(batch_ranges, start=1):
+            translatable_indices = [
+                index for index in range(start, end)
+                if index in included and split_texts[index][0]
+            ]
+            skipped_count = (end - start) - len(translatable_indices)
+            if skipped_count:
+                processed += skipped_count
+                if progress_callback:
+                    progress_callback(processed, total_lines, batch_number, total_batches)
+
             pending_chunks = [{
-                "batch": subs[start:end],
-                "start_index": start + 1,
-                "end_index": end,
+                "indices": translatable_indices,
                 "allow_split_retry": True,
-            }]
-            context_dict = context.copy()
+            }] if translatable_indices else []
+            if matcher is None:
+                context_dict = context.copy()
+            else:
+                context_dict = self._build_batch_context(
+                    context,
+                    matcher,
+                    selected_characters,
+                    selected_glossary,
+                    [subs[index].name or "" for index in translatable_indices] + [split_texts[index][0] for index in translatable_indices],
+                )
 
             while pending_chunks:
                 chunk = pending_chunks.pop(0)
-                batch = chunk["batch"]
-                chunk_start_index = int(chunk["start_index"])
-                chunk_end_index = int(chunk["end_index"])
+                indices = chunk["indices"]
+                batch = [subs[index] for index in indices]
+                chunk_start_index = indices[0] + 1
+                chunk_end_index = indices[-1] + 1
                 allow_split_retry = bool(chunk["allow_split_retry"])
-                batch_lines = self._build_batch_lines(batch)
+                batch_lines = self._build_batch_lines(batch, [split_texts[index][0] for index in indices])
                 malformed_error: Exception | None = None
                 malformed_lines: list[str] | None = None
 
@@ -191,8 +223,8 @@ class TaskTranslateFile(BaseTask):
                         if len(translated_lines) != len(batch_lines):
                             raise ValueError("Batch translation output line count mismatch.")
 
-                        for line, translated in zip(batch, translated_lines):
-                            line.text = translated.replace("\\N", " ").strip()
+                        for index, translated in zip(indices, translated_lines):
+                            subs[index].text = self._restore_translated_text(translated, *split_texts[index])
                             processed += 1
                             if progress_callback:
                                 progress_callback(processed, total_lines, batch_number, total_batches)
@@ -234,15 +266,11 @@ class TaskTranslateFile(BaseTask):
                         str(malformed_error),
                     )
                     pending_chunks.insert(0, {
-                        "batch": batch[midpoint:],
-                        "start_index": chunk_start_index + midpoint,
-                        "end_index": chunk_end_index,
+                        "indices": indices[midpoint:],
                         "allow_split_retry": False,
                     })
                     pending_chunks.insert(0, {
-                        "batch": batch[:midpoint],
-                        "start_index": chunk_start_index,
-                        "end_index": chunk_start_index + midpoint - 1,
+                        "indices": indices[:midpoint],
                         "allow_split_retry": False,
                     })
                     continue
@@ -268,16 +296,17 @@ class TaskTranslateFile(BaseTask):
                     len(batch),
                     str(malformed_error),
                 )
-                for line in batch:
+                for index in indices:
+                    plain, markup = split_texts[index]
                     translated_text = self._translate_single_line(
                         llm=llm,
-                        line=line.text,
+                        line=plain,
                         context=context_dict,
                         input_lang=input_lang,
                         target_lang=target_lang,
                         temperature=temperature,
                     )
-                    line.text = translated_text.replace("\\N", " ").strip()
+                    subs[index].text = self._restore_translated_text(translated_text, plain, markup)
                     processed += 1
                     if progress_callback:
                         progress_callback(processed, total_lines, batch_number, total_batches)
@@ -285,6 +314,30 @@ class TaskTranslateFile(BaseTask):
         self._write_failure_log(log_dir=log_dir, failure_logs=failure_logs)
         return subs
 
+    def _build_batch_context(
+        self,
+        context: dict,
+        matcher: LibraryMatcher,
+        characters: list[dict],
+        glossary: list[dict],
+        texts: list[str],
+    ) -> dict:
+        """Return a copy of context whose characters/glossary blocks keep only the library entries mentioned in texts (speakers and lines)."""
+        character_ids, glossary_ids = matcher.match(texts)
+        batch_context = context.copy()
+        for key, entries, ids, format_entries in (
+            ("characters", characters, character_ids, format_characters),
+            ("glossary", glossary, glossary_ids, format_glossary),
+        ):
+            if key not in batch_context or not entries:
+                continue
+            mentioned = [entry for entry in entries if entry["id"] in ids]
+            if mentioned:
+                batch_context[key] = format_entries(mentioned)
+            else:
+                del batch_context[key]
+        return batch_context
+
     def _translate_batch(
         self,
         llm,
@@ -332,10 +385,10 @@ class TaskTranslateFile(BaseTask):
             max_tokens=max_tokens,
         ).strip()
 
-    def _build_batch_lines(self, batch) -> list[str]:
-        """Format subtitle events as numbered lines with speaker and duration for the LLM batch prompt."""
+    def _build_batch_lines(self, batch, texts: list[str]) -> list[str]:
+        """Format subtitle events as numbered lines with speaker and duration for the LLM batch prompt, using the tag-stripped texts."""
         batch_lines: list[str] = []
-        for i, line in enumerate(batch, start=1):
+        for i, (line, text) in enumerate(zip(batch, texts), start=1):
             speaker = line.name.strip() if line.name else "Line"
             length_seconds = None
             if hasattr(line, "start") and hasattr(line, "end"):
@@ -343,15 +396,20 @@ class TaskTranslateFile(BaseTask):
             elif hasattr(line, "length"):
                 length_seconds = max(0.0, float(line.length) / 1000.0)
             length_label = f"{length_seconds:.2f}s" if length_seconds is not None else "0.00s"
-            batch_lines.append(f"{i}. {speaker} ({length_label}): {line.text}")
+            batch_lines.append(f"{i}. {speaker} ({length_label}): {text}")
         return batch_lines
 
     def _is_rate_limit_error(self, exc: Exception) -> bool:
         """Return True if the exception is an OpenAI or Anthropic rate limit error (triggers a retry sleep)."""
         return isinstance(exc, (OpenAIRateLimitError, AnthropicRateLimitError))
 
-    def _normalize_translated_subtitles(self, subs):
-        """Strip matching outer quote/asterisk pairs from every subtitle line (LLMs sometimes wrap output in quotes)."""
+    def _restore_translated_text(self, translated: str, plain: str, markup: list[tuple[int, str]]) -> str:
+        """Normalize one translated line and reinsert the ASS markup that was stripped from its source event."""
+        text = self._normalize_translated_text(translated.replace("\\N", " "))
+        return restore_ass_text(text, plain, markup)
+
+    def _normalize_translated_text(self, text: str) -> str:
+        """Strip a matching outer quote/asterisk pair from a translated line (LLMs sometimes wrap output in quotes)."""
         quote_pairs = {
             '"': '"',
             "'": "'",
@@ -359,22 +417,16 @@ class TaskTranslateFile(BaseTask):
             "‘": "’",
             "*": "*",
         }
-        for line in subs:
-            if not isinstance(line.text, str):
-                continue
-
-            stripped = line.text.strip()
-            if len(stripped) < 2:
-                line.text = stripped
-                continue
-
-            opening = stripped[0]
-            closing = stripped[-1]
-            expected_closing = quote_pairs.get(opening)
-            if expected_closing and closing == expected_closing:
-                line.text = stripped[1:-1].strip()
-            else:
-                line.text = stripped
+        stripped = text.strip()
+        if len(stripped) < 2:
+            return stripped
+
+        opening = stripped[0]
+        closing = stripped[-1]
+        expected_closing = quote_pairs.get(opening)
+        if expected_closing and closing == expected_closing:
+            return stripped[1:-1].strip()
+        return stripped
 
     def _build_failure_log(
         self,
@@ -3,13 +3,21 @@ Prompts for library update chain tasks.
 """
 
 
-def scan_subtitle_file_prompt(series_name: str, input_lang: str, output_lang: str, known_names: list[str], known_terms: list[str]) -> str:
-    """Return the system prompt for extracting characters, terms, and events from a subtitle file."""
+def scan_subtitle_file_prompt(
+    series_name: str,
+    input_lang: str,
+    output_lang: str,
+    known_names: list[str],
+    known_terms: list[str],
+    chunk: tuple[int, int] | None = None,
+) -> str:
+    """Return the system prompt for extracting characters, terms, and events from a subtitle file; chunk=(number, count) when only one part of the file is sent."""
     known_names_str = ", ".join(known_names) if known_names else "none"
     known_terms_str = ", ".join(known_terms) if known_terms else "none"
+    scope = f"part {chunk[0]} of {chunk[1]} of the text" if chunk else "the full text"
     return f"""You are an expert at analyzing subtitle files for anime and other media.
 
-You will be given the full text of a subtitle file for the series "{series_name}" (source language: {input_lang}, translation language: {output_lang}).
+You will be given {scope} of a subtitle file for the series "{series_name}" (source language: {input_lang}, translation language: {output_lang}).
 
 The library already has entries for these characters: {known_names_str}
 The library already has entries for these terms: {known_terms_str}
@@ -88,7 +96,7 @@ def generate_library_proposals_prompt(series_name: str, input_lang: str, output_
     return f"""You are building a structured reference library for the series "{series_name}" (source language: {input_lang}, translation language: {output_lang}).
 
 You will be given:
-1. The full subtitle file text
+1. The subtitle text: the full file(s), or for long input (e.g. a whole season) the lines that mention the scanned characters and terms plus the scanned plot events
 2. The existing library data (known characters and glossary terms)
 3. Items already confirmed as known (do not re-add these)
 4. Web search results for unknown items found in the subtitle
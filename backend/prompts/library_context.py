@@ -11,14 +11,15 @@ def select_library_context_prompt(
     character_names: list[str],
     glossary_ids: list[str],
     glossary_terms: list[str],
+    excerpt: bool = False,
 ) -> str:
-    """Return a system prompt that asks the LLM to select relevant characters and glossary terms."""
+    """Return a system prompt that asks the LLM to select relevant characters and glossary terms; excerpt=True when only the lines mentioning the candidates are sent."""
     chars_list = "\n".join(f"- {cid}: {name}" for cid, name in zip(character_ids, character_names)) or "none"
     terms_list = "\n".join(f"- {tid}: {term}" for tid, term in zip(glossary_ids, glossary_terms)) or "none"
 
     return f"""You are a translation assistant helping to select the most relevant library entries for a subtitle translation task.
 
-You will be given the full subtitle transcript for one episode of "{series_name}" (source: {input_lang}, target: {output_lang}).
+You will be given {"the subtitle lines that appear to mention the entries below, taken from" if excerpt else "the full subtitle transcript for"} one episode of "{series_name}" (source: {input_lang}, target: {output_lang}).
 
 From the lists below, select ONLY the characters and glossary terms that actually appear in or are directly relevant to the content of the subtitle transcript. Do not include entries that have no connection to the episode content.
 
@@ -120,3 +120,55 @@ def generate_line_retranslation_prompt(
     Do not include labels.
     Do not include speaker names unless they are part of the spoken line.
     """.strip()
+
+
+def generate_batch_retranslation_prompt(
+    context: dict | None = None,
+    input_lang: str = "ja",
+    output_lang: str = "en",
+) -> str:
+    """Return the system prompt for correcting a group of neighbouring flagged subtitle lines in one call."""
+    context_text = _format_context(context)
+
+    return f"""
+    # Role
+
+    You are a subtitle translation correction assistant working from {input_lang} into {output_lang}.
+
+    ## Task
+
+    You will receive:
+    - surrounding subtitle lines (original and current translation) for context only
+    - a list of flagged lines, each with its stable 1-based index, original line, current translated line, and the review reason explaining what needs correction
+
+    Produce one corrected {output_lang} subtitle line for every flagged line.
+    Do not correct or return the context-only lines.
+    Preserve the intended meaning, tone, and speaker intent from each original line.
+    Use each line's review reason to fix the specific issue.
+    Treat the provided context as authoritative for character names, established term translations, romanization, and honorific handling.
+    If a review reason offers multiple possible name corrections but the context identifies the character, choose the exact context name that matches the original Japanese.
+    If the original Japanese uses only the given-name kanji plus an honorific, use the context's romanized given name plus that honorific.
+    Do not substitute a family name for a given name unless the original Japanese line uses the family-name kanji.
+    Preserve the original honorific relationship unless the context explicitly says to change it.
+    Preserve Japanese honorific form precisely when romanizing it.
+    For example, お姉さま should be rendered as oneesama, not oneesan; 先輩 should be senpai.
+    If a review reason fixes a name but misses the honorific nuance, still correct the honorific according to the original Japanese line.
+
+    ## Context
+
+    {context_text}
+
+    ## Output Format
+
+    Return JSON only.
+    Do not include markdown fences.
+    Do not include commentary.
+    Do not include speaker names in "text" unless they are part of the spoken line.
+    Return exactly one entry per flagged line, using its index:
+
+    {{
+        "corrections": [
+            {{"index": 12, "text": "The corrected translated subtitle line."}}
+        ]
+    }}
+    """.strip()
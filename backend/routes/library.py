@@ -2,17 +2,15 @@
 Library routes — CRUD for series, characters, glossary, and the library update chain.
 """
 
-import os
 import re
-import shutil
 from datetime import datetime
 from pathlib import Path
 
-from fastapi import APIRouter, BackgroundTasks, File, UploadFile
+from fastapi import APIRouter, BackgroundTasks, File, Form, UploadFile
 from pydantic import BaseModel
 
 from orchestrator.library.task_check_against_library import TaskCheckAgainstLibrary
-from orchestrator.library.task_deduplicate_proposals import TaskDeduplicateProposals
+from orchestrator.library.task_deduplicate_proposals import PROPOSAL_CATEGORIES, TaskDeduplicateProposals
 from orchestrator.library.task_generate_library_proposals import TaskGenerateLibraryProposals
 from orchestrator.library.task_generate_search_queries import TaskGenerateSearchQueries
 from orchestrator.library.task_scan_subtitle_file import TaskScanSubtitleFile
@@ -21,16 +19,24 @@ from utils.api_response import error_response, processing_response, success_resp
 from utils.library import (
     find_character,
     find_glossary_term,
-    get_library_dir,
-    get_series_dir,
+    get_character,
+    get_glossary_term,
+    insert_character,
+    insert_glossary_term,
     list_series_ids,
+    list_series_summaries,
     load_series,
+    remove_character,
+    remove_glossary_term,
+    remove_series,
+    replace_character,
+    replace_glossary_term,
     save_series,
     slugify,
     unique_slug,
 )
 
-from .shared import model_manager, save_upload_to_temp, task_orchestrator, result_handler
+from .shared import model_manager, remove_temp_files, save_upload_to_temp, task_orchestrator, result_handler
 
 router = APIRouter(prefix="/library")
 
@@ -85,26 +91,17 @@ class UpdateGlossaryTermRequest(BaseModel):
     notes: str | None = None
 
 
+class ApplyProposalsRequest(BaseModel):
+    """Request body for accepting library update proposals in bulk by their proposal_id."""
+    proposal_ids: list[str]
+
+
 # ── Series CRUD ────────────────────────────────────────────────────────────────
 
 @router.get("/")
 async def list_series():
     """Return a summary list of all series in the library."""
-    ids = list_series_ids()
-    result = []
-    for series_id in ids:
-        try:
-            s = load_series(series_id)
-            result.append({
-                "id": s["id"],
-                "name": s["name"],
-                "input_lang": s.get("input_lang", "ja"),
-                "output_lang": s.get("output_lang", "en"),
-                "character_count": len(s.get("characters", [])),
-                "glossary_count": len(s.get("glossary", [])),
-            })
-        except Exception:
-            continue
+    result = list_series_summaries()
     return success_response({"series": result})
 
 
@@ -151,11 +148,9 @@ async def update_series(series_id: str, request: UpdateSeriesRequest):
 
 @router.delete("/{series_id}")
 async def delete_series(series_id: str):
-    """Delete a series and all its associated files from the library."""
-    series_dir = get_series_dir(series_id)
-    if not series_dir.exists():
+    """Delete a series with its characters and glossary from the library."""
+    if not remove_series(series_id):
         return error_response(f"Series '{series_id}' not found")
-    shutil.rmtree(series_dir)
     return success_response()
 
 
@@ -164,27 +159,20 @@ async def delete_series(series_id: str):
 @router.post("/{series_id}/characters")
 async def add_character(series_id: str, request: CharacterRequest):
     """Add a new character to the series and return the updated series object."""
-    series = load_series(series_id)
-    existing_ids = {c["id"] for c in series.get("characters", [])}
-    char_id = unique_slug(request.name, existing_ids)
-    character = {
-        "id": char_id,
+    insert_character(series_id, {
         "name": request.name,
         "aliases": request.aliases,
         "personality": request.personality,
         "relationships": request.relationships,
         "history": request.history,
-    }
-    series.setdefault("characters", []).append(character)
-    save_series(series)
-    return success_response(series)
+    })
+    return success_response(load_series(series_id))
 
 
 @router.patch("/{series_id}/characters/{character_id}")
 async def update_character(series_id: str, character_id: str, request: UpdateCharacterRequest):
     """Patch a character's fields and return the updated series object."""
-    series = load_series(series_id)
-    char = find_character(series, character_id)
+    char = get_character(series_id, character_id)
     if char is None:
         return error_response(f"Character '{character_id}' not found")
     if request.name is not None:
@@ -197,20 +185,16 @@ async def update_character(series_id: str, character_id: str, request: UpdateCha
         char["relationships"] = request.relationships
     if request.history is not None:
         char["history"] = request.history
-    save_series(series)
-    return success_response(series)
+    replace_character(series_id, char)
+    return success_response(load_series(series_id))
 
 
 @router.delete("/{series_id}/characters/{character_id}")
 async def delete_character(series_id: str, character_id: str):
     """Remove a character from the series and return the updated series object."""
-    series = load_series(series_id)
-    original_len = len(series.get("characters", []))
-    series["characters"] = [c for c in series.get("characters", []) if c["id"] != character_id]
-    if len(series["characters"]) == original_len:
+    if not remove_character(series_id, character_id):
         return error_response(f"Character '{character_id}' not found")
-    save_series(series)
-    return success_response(series)
+    return success_response(load_series(series_id))
 
 
 # ── Glossary CRUD ──────────────────────────────────────────────────────────────
@@ -218,25 +202,18 @@ async def delete_character(series_id: str, character_id: str):
 @router.post("/{series_id}/glossary")
 async def add_glossary_term(series_id: str, request: GlossaryTermRequest):
     """Add a new glossary term to the series and return the updated series object."""
-    series = load_series(series_id)
-    existing_ids = {t["id"] for t in series.get("glossary", [])}
-    term_id = unique_slug(request.term, existing_ids)
-    term = {
-        "id": term_id,
+    insert_glossary_term(series_id, {
         "term": request.term,
         "translation": request.translation,
         "notes": request.notes,
-    }
-    series.setdefault("glossary", []).append(term)
-    save_series(series)
-    return success_response(series)
+    })
+    return success_response(load_series(series_id))
 
 
 @router.patch("/{series_id}/glossary/{term_id}")
 async def update_glossary_term(series_id: str, term_id: str, request: UpdateGlossaryTermRequest):
     """Patch a glossary term's fields and return the updated series object."""
-    series = load_series(series_id)
-    term = find_glossary_term(series, term_id)
+    term = get_glossary_term(series_id, term_id)
     if term is None:
         return error_response(f"Glossary term '{term_id}' not found")
     if request.term is not None:
@@ -245,26 +222,121 @@ async def update_glossary_term(series_id: str, term_id: str, request: UpdateGlos
         term["translation"] = request.translation
     if request.notes is not None:
         term["notes"] = request.notes
-    save_series(series)
-    return success_response(series)
+    replace_glossary_term(series_id, term)
+    return success_response(load_series(series_id))
 
 
 @router.delete("/{series_id}/glossary/{term_id}")
 async def delete_glossary_term(series_id: str, term_id: str):
     """Remove a glossary term from the series and return the updated series object."""
-    series = load_series(series_id)
-    original_len = len(series.get("glossary", []))
-    series["glossary"] = [t for t in series.get("glossary", []) if t["id"] != term_id]
-    if len(series["glossary"]) == original_len:
+    if not remove_glossary_term(series_id, term_id):
         return error_response(f"Glossary term '{term_id}' not found")
+    return success_response(load_series(series_id))
+
+
+# ── Bulk Proposal Apply ────────────────────────────────────────────────────────
+
+@router.post("/{series_id}/proposals/apply")
+async def apply_proposals(series_id: str, request: ApplyProposalsRequest):
+    """Apply the accepted proposals from the last library update in one load/validate/save cycle and return the updated series summary."""
+    record = result_handler.get(TaskDeduplicateProposals.TASK_TYPE)
+    result = (record or {}).get("result") or {}
+    if result.get("series_id") != series_id or not result.get("proposals"):
+        return error_response(f"No pending proposals for series '{series_id}'")
+    proposals = result["proposals"]
+    by_id = {
+        proposal["proposal_id"]: (category, proposal)
+        for category in PROPOSAL_CATEGORIES
+        for proposal in proposals.get(category, [])
+        if "proposal_id" in proposal
+    }
+    accepted = list(dict.fromkeys(request.proposal_ids))
+    unknown = [proposal_id for proposal_id in accepted if proposal_id not in by_id]
+    if unknown:
+        return error_response(f"Unknown proposal ids: {', '.join(unknown)}")
+
+    series = load_series(series_id)
+    errors = []
+    for proposal_id in accepted:
+        category, proposal = by_id[proposal_id]
+        error = _apply_proposal(series, category, proposal)
+        if error:
+            errors.append(f"{proposal_id}: {error}")
+    if errors:
+        return error_response("; ".join(errors))
     save_series(series)
-    return success_response(series)
+
+    applied = set(accepted)
+    remaining = {
+        **proposals,
+        **{category: [p for p in proposals.get(category, []) if p.get("proposal_id") not in applied] for category in PROPOSAL_CATEGORIES},
+    }
+    result_handler.set_complete(TaskDeduplicateProposals.TASK_TYPE, {**result, "proposals": remaining})
+
+    summary = {
+        "id": series["id"],
+        "name": series.get("name", series["id"]),
+        "input_lang": series.get("input_lang", "ja"),
+        "output_lang": series.get("output_lang", "en"),
+        "character_count": len(series.get("characters", [])),
+        "glossary_count": len(series.get("glossary", [])),
+    }
+    return success_response({"series": summary, "applied": accepted, "proposals": remaining})
+
+
+def _apply_proposal(series: dict, category: str, proposal: dict) -> str | None:
+    """Apply one proposal to the in-memory series using the same semantics as the single-item accept actions; return an error message if it cannot be applied."""
+    if category == "new_characters":
+        name = str(proposal.get("name", "")).strip()
+        if not name:
+            return "new character has no name"
+        existing_ids = {c["id"] for c in series.get("characters", [])}
+        series.setdefault("characters", []).append({
+            "id": unique_slug(name, existing_ids),
+            "name": name,
+            "aliases": list(proposal.get("aliases", [])),
+            "personality": list(proposal.get("personality", [])),
+            "relationships": dict(proposal.get("relationships", {})),
+            "history": list(proposal.get("history", [])),
+        })
+    elif category == "new_glossary":
+        term_text = str(proposal.get("term", "")).strip()
+        if not term_text:
+            return "new glossary term has no term"
+        existing_ids = {t["id"] for t in series.get("glossary", [])}
+        series.setdefault("glossary", []).append({
+            "id": unique_slug(term_text, existing_ids),
+            "term": term_text,
+            "translation": proposal.get("translation", ""),
+            "notes": proposal.get("notes", ""),
+        })
+    elif category == "updated_characters":
+        char = find_character(series, proposal.get("id", ""))
+        if char is None:
+            return f"character '{proposal.get('id')}' not found"
+        field = proposal.get("field")
+        append = proposal.get("append", "")
+        if field == "relationships":
+            char.setdefault("relationships", {}).setdefault(proposal.get("character", ""), []).append(append)
+        elif field in ("personality", "history"):
+            char.setdefault(field, []).append(append)
+        else:
+            return f"unsupported character field '{field}'"
+    elif category == "updated_glossary":
+        term = find_glossary_term(series, proposal.get("id", ""))
+        if term is None:
+            return f"glossary term '{proposal.get('id')}' not found"
+        field = proposal.get("field")
+        if field not in ("term", "translation", "notes"):
+            return f"unsupported glossary field '{field}'"
+        term[field] = proposal.get("value", "")
+    return None
 
 
 # ── Library Update Chain ───────────────────────────────────────────────────────
 
 def _run_library_update_chain(data: dict):
-    """Run the 6-task library update chain in a background thread; records errors to ResultHandler on failure."""
+    """Run the 6-task library update chain in a background thread; records errors to ResultHandler on failure and deletes the uploaded temp files."""
     try:
         task_orchestrator.clear_tasks()
         task_orchestrator.add_task(TaskScanSubtitleFile())
@@ -276,6 +348,8 @@ def _run_library_update_chain(data: dict):
         task_orchestrator.run_tasks(initial_data=data)
     except Exception as exc:
         result_handler.set_error(TaskDeduplicateProposals.TASK_TYPE, str(exc))
+    finally:
+        remove_temp_files([data.get("file_path", "")] + [episode["file_path"] for episode in data.get("episodes") or []])
 
 
 @router.post("/{series_id}/update")
@@ -283,6 +357,8 @@ async def start_library_update(
     series_id: str,
     background_tasks: BackgroundTasks,
     file: UploadFile = File(...),
+    concurrency: int = Form(4),
+    search_cache_ttl_hours: float = Form(168),
 ):
     """Upload a subtitle file and start the library update chain for the given series."""
     if not model_manager.is_llm_ready():
@@ -291,9 +367,61 @@ async def start_library_update(
         return error_response("A task is already running")
 
     result_handler.clear(TaskDeduplicateProposals.TASK_TYPE)
-    series = load_series(series_id)
-    tmp_path = await save_upload_to_temp(file)
+    tmp_path = ""
+    try:
+        series = load_series(series_id)
+        tmp_path = await save_upload_to_temp(file)
+        data = _build_update_data(series_id, series, concurrency, search_cache_ttl_hours)
+    except Exception as exc:
+        remove_temp_files([tmp_path])
+        return error_response(str(exc))
 
+    data["file_path"] = tmp_path
+    background_tasks.add_task(_run_library_update_chain, data)
+    return processing_response(
+        {"task_type": TaskGenerateLibraryProposals.TASK_TYPE},
+        "Library update started",
+    )
+
+
+@router.post("/{series_id}/update-season")
+async def start_season_library_update(
+    series_id: str,
+    background_tasks: BackgroundTasks,
+    files: list[UploadFile] = File(...),
+    concurrency: int = Form(4),
+    search_cache_ttl_hours: float = Form(168),
+):
+    """Upload several episode subtitle files and run one library update over all of them: episodes are scanned concurrently, findings merged, and each unknown searched and proposed once."""
+    if not model_manager.is_llm_ready():
+        return error_response("LLM not loaded")
+    if task_orchestrator.is_running():
+        return error_response("A task is already running")
+    if not files:
+        return error_response("At least one subtitle file is required")
+
+    result_handler.clear(TaskDeduplicateProposals.TASK_TYPE)
+    episodes = []
+    try:
+        series = load_series(series_id)
+        for number, episode_file in enumerate(files, start=1):
+            episodes.append({"file_path": await save_upload_to_temp(episode_file), "filename": episode_file.filename or f"episode {number}"})
+        data = _build_update_data(series_id, series, concurrency, search_cache_ttl_hours)
+    except Exception as exc:
+        # A later upload failing (e.g. over the size limit) must not leak the episodes already saved
+        remove_temp_files([episode["file_path"] for episode in episodes])
+        return error_response(str(exc))
+
+    data["episodes"] = episodes
+    background_tasks.add_task(_run_library_update_chain, data)
+    return processing_response(
+        {"task_type": TaskGenerateLibraryProposals.TASK_TYPE},
+        f"Library update started for {len(episodes)} episodes",
+    )
+
+
+def _build_update_data(series_id: str, series: dict, concurrency: int, search_cache_ttl_hours: float) -> dict:
+    """Create the run's log directory and return the library update chain's initial data dict (without the subtitle file fields)."""
     safe_name = re.sub(r"[^\w\-]", "_", series.get("name", series_id))[:40]
     log_dir = Path(__file__).parent.parent / "outputs" / "library-update-logs" / f"{datetime.now().strftime('%Y%m%d-%H%M%S')}-{safe_name}"
     log_dir.mkdir(parents=True, exist_ok=True)
@@ -304,16 +432,12 @@ async def start_library_update(
         known_names.extend(char.get("aliases", []))
     known_terms = [t["term"] for t in series.get("glossary", [])]
 
-    data = {
-        "file_path": tmp_path,
+    return {
         "series_id": series_id,
         "series": series,
         "log_dir": str(log_dir),
         "known_names": known_names,
         "known_terms": known_terms,
+        "concurrency": max(1, concurrency),
+        "search_cache_ttl_hours": max(0.0, search_cache_ttl_hours),
     }
-    background_tasks.add_task(_run_library_update_chain, data)
-    return processing_response(
-        {"task_type": TaskGenerateLibraryProposals.TASK_TYPE},
-        "Library update started",
-    )
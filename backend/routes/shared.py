@@ -5,11 +5,13 @@ Shared helpers and state for backend route modules.
 from pathlib import Path
 from typing import Any
 from datetime import datetime
+import hashlib
 import json
 import os
 import tempfile
 
 from fastapi import HTTPException, UploadFile
+from fastapi.concurrency import run_in_threadpool
 from pydantic import BaseModel
 
 from models.model_manager import ModelManager
@@ -34,6 +36,7 @@ from orchestrator.tasks.task_transcribe_line import TaskTranscribeLine
 from orchestrator.translate_file.task_translate_file import TaskTranslateFile
 from orchestrator.tasks.task_translate_line import TaskTranslateLine
 from utils.api_response import complete_response, error_response, idle_response, processing_response, task_result_data
+from utils.config import MAX_UPLOAD_BYTES
 
 model_manager = ModelManager.get_instance()
 task_orchestrator = TaskOrchestrator.get_instance()
@@ -126,12 +129,65 @@ def build_task_response(task_type: str) -> dict[str, Any]:
     return processing_response(task_result_data(task_type, progress=progress))
 
 
+UPLOAD_CHUNK_BYTES = 1 << 20
+
+
 async def save_upload_to_temp(file: UploadFile, default_suffix: str = "") -> str:
     """Save an uploaded file to a temp path and return the path."""
-    suffix = os.path.splitext(file.filename)[1] or default_suffix
+    tmp_path, _ = await save_upload_with_hash(file, default_suffix)
+    return tmp_path
+
+
+async def save_upload_with_hash(file: UploadFile, default_suffix: str = "", max_bytes: int = MAX_UPLOAD_BYTES) -> tuple[str, str]:
+    """Stream an upload to a temp file in fixed-size chunks, hashing as it goes; returns (path, SHA-256 hex) and raises ValueError past max_bytes.
+
+    The limit is enforced while copying the request body, after Starlette has already spooled it (to disk once it
+    passes 1 MB), so an oversized upload is rejected without being kept but not before it reaches disk.
+    """
+    suffix = os.path.splitext(file.filename or "")[1] or default_suffix
+    _check_upload_size(getattr(file, "size", None) or 0, max_bytes)
+    digest = hashlib.sha256()
+    size = 0
     with tempfile.NamedTemporaryFile(delete=False, suffix=suffix) as tmp_file:
-        tmp_file.write(await file.read())
-        return tmp_file.name
+        try:
+            while chunk := await file.read(UPLOAD_CHUNK_BYTES):
+                size += len(chunk)
+                _check_upload_size(size, max_bytes)
+                digest.update(chunk)
+                await run_in_threadpool(tmp_file.write, chunk)
+        except BaseException:
+            tmp_file.close()
+            os.remove(tmp_file.name)
+            raise
+        return tmp_file.name, digest.hexdigest()
+
+
+def remove_temp_files(paths: list[str]):
+    """Delete the given temp upload paths, ignoring empty entries and files that are already gone."""
+    for path in paths:
+        if path:
+            try:
+                os.remove(path)
+            except OSError:
+                pass
+
+
+async def read_upload(file: UploadFile, max_bytes: int) -> bytes:
+    """Read a small upload into memory in chunks, raising ValueError as soon as it passes max_bytes."""
+    _check_upload_size(getattr(file, "size", None) or 0, max_bytes)
+    chunks = []
+    size = 0
+    while chunk := await file.read(UPLOAD_CHUNK_BYTES):
+        size += len(chunk)
+        _check_upload_size(size, max_bytes)
+        chunks.append(chunk)
+    return b"".join(chunks)
+
+
+def _check_upload_size(size: int, max_bytes: int):
+    """Raise ValueError if an upload of size bytes is over the limit."""
+    if size > max_bytes:
+        raise ValueError(f"Upload exceeds the {max_bytes / 2**20:.0f} MB limit")
 
 
 def parse_json_form(value: str, fallback: dict | None = None) -> dict:
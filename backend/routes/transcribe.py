@@ -2,21 +2,42 @@
 Transcription routes.
 """
 
-from fastapi import APIRouter, BackgroundTasks, File, Form, UploadFile
+import asyncio
+import json
+import os
+import threading
+import time
+
+from fastapi import APIRouter, BackgroundTasks, File, Form, UploadFile, WebSocket, WebSocketDisconnect
+from fastapi.concurrency import run_in_threadpool
 
 from orchestrator.tasks.task_transcribe_file import TaskTranscribeFile
 from orchestrator.tasks.task_transcribe_line import TaskTranscribeLine
-from utils.api_response import error_response, processing_response
+from utils.api_response import error_response, processing_response, success_response
+from utils.audio_stream import SAMPLE_RATE, decode_audio_bytes
+from utils.media_extract import resolve_media_path
+from utils.streaming_transcriber import StreamingTranscriber
 
 from .shared import (
     model_manager,
+    read_upload,
     run_single_task,
     save_upload_to_temp,
+    save_upload_with_hash,
     task_orchestrator,
 )
 
 router = APIRouter(prefix="/transcribe")
 
+# Longest clip accepted by the synchronous transcribe-line path; longer audio should use transcribe-file.
+MAX_DIRECT_CLIP_SECONDS = 120
+MAX_DIRECT_CLIP_BYTES = 64 * 2**20
+AUDIO_ENCODINGS = ("auto", "pcm_s16le", "pcm_f32le")
+STREAM_ENCODINGS = ("pcm_s16le", "pcm_f32le")
+# Serializes in-memory inference calls on the shared model; only one live stream is allowed at a time.
+_audio_lock = threading.Lock()
+_stream_lock = threading.Lock()
+
 
 @router.post("/transcribe-line")
 async def api_transcribe_line(
@@ -42,25 +63,159 @@ async def api_transcribe_line(
         return error_response(str(exc))
 
 
+@router.post("/transcribe-line-direct")
+async def api_transcribe_line_direct(
+    file: UploadFile = File(...),
+    language: str = Form(...),
+    encoding: str = Form("auto"),
+    sample_rate: int = Form(SAMPLE_RATE),
+):
+    """Decode a short clip in memory (raw PCM, WAV or a compressed container) and return its transcript in the response, without temp files or polling."""
+    if task_orchestrator.is_running() or model_manager.is_audio_running():
+        return error_response("Transcription is already running")
+    if not model_manager.is_audio_ready():
+        return error_response("Audio model not loaded")
+    if encoding not in AUDIO_ENCODINGS:
+        return error_response(f"encoding must be one of: {', '.join(AUDIO_ENCODINGS)}")
+
+    try:
+        data = await read_upload(file, MAX_DIRECT_CLIP_BYTES)
+        started = time.perf_counter()
+        audio = await run_in_threadpool(decode_audio_bytes, data, encoding, sample_rate)
+        decode_ms = (time.perf_counter() - started) * 1000
+        duration_seconds = len(audio) / SAMPLE_RATE
+        if duration_seconds > MAX_DIRECT_CLIP_SECONDS:
+            return error_response(f"Clip is {duration_seconds:.0f}s long; use transcribe-file for audio over {MAX_DIRECT_CLIP_SECONDS}s")
+
+        started = time.perf_counter()
+        text = await run_in_threadpool(_transcribe_clip, audio, language)
+        inference_ms = (time.perf_counter() - started) * 1000
+        return success_response({
+            "text": text,
+            "duration_seconds": round(duration_seconds, 3),
+            "decode_ms": round(decode_ms, 1),
+            "inference_ms": round(inference_ms, 1),
+        })
+    except Exception as exc:
+        return error_response(str(exc))
+
+
+def _transcribe_clip(audio, language: str, join_segments: bool = False) -> str:
+    """Run the warm audio model on in-memory samples, one call at a time, holding the client's running flag for the duration."""
+    with _audio_lock:
+        audio_client = model_manager.get_audio_client()
+        audio_client.set_running(True)
+        try:
+            return model_manager.audio_transcribe_samples(audio, language, join_segments=join_segments)
+        finally:
+            audio_client.set_running(False)
+
+
+@router.websocket("/stream")
+async def ws_transcribe_stream(websocket: WebSocket):
+    """Live transcription: after a JSON config message, receive raw PCM frames and push partial/final transcripts.
+
+    Protocol: the client first sends {"language", "encoding" ("pcm_s16le" | "pcm_f32le"), "sample_rate"}, then binary
+    mono PCM frames, then {"type": "stop"}. The server sends {"type": "ready"}, any number of {"type": "partial", "text"}
+    and {"type": "final", "text", "start", "end"}, then {"type": "done"}; {"type": "error", "message"} ends the session.
+    """
+    await websocket.accept()
+    if task_orchestrator.is_running() or not model_manager.is_audio_ready():
+        await websocket.send_json({"type": "error", "message": "Audio model not loaded" if not model_manager.is_audio_ready() else "Transcription is already running"})
+        await websocket.close()
+        return
+    if not _stream_lock.acquire(blocking=False):
+        await websocket.send_json({"type": "error", "message": "Another live transcription is already running"})
+        await websocket.close()
+        return
+
+    step_task: asyncio.Task | None = None
+    try:
+        config = await websocket.receive_json()
+        language = str(config.get("language", "ja"))
+        encoding = str(config.get("encoding", "pcm_f32le"))
+        sample_rate = int(config.get("sample_rate", SAMPLE_RATE))
+        if encoding not in STREAM_ENCODINGS:
+            raise ValueError(f"encoding must be one of: {', '.join(STREAM_ENCODINGS)}")
+        session = StreamingTranscriber(lambda audio: _transcribe_clip(audio, language, join_segments=True))
+        await websocket.send_json({"type": "ready"})
+
+        async def run_step():
+            """Decode the window in a worker thread and send the resulting events."""
+            for event in await run_in_threadpool(session.step):
+                await websocket.send_json(event)
+
+        # Frames that arrive while a step is decoding wait here, so the session buffer is only touched between steps
+        incoming = []
+        while True:
+            message = await websocket.receive()
+            if message["type"] == "websocket.disconnect":
+                return
+            if message.get("bytes"):
+                incoming.append(decode_audio_bytes(message["bytes"], encoding, sample_rate))
+            elif message.get("text") and json.loads(message["text"]).get("type") == "stop":
+                break
+            if step_task is not None and step_task.done():
+                step_task.result()
+                step_task = None
+            if step_task is None and incoming:
+                for samples in incoming:
+                    session.add(samples)
+                incoming.clear()
+                if session.ready():
+                    step_task = asyncio.create_task(run_step())
+
+        if step_task is not None:
+            await step_task
+            step_task = None
+        for samples in incoming:
+            session.add(samples)
+        for event in await run_in_threadpool(session.flush):
+            await websocket.send_json(event)
+        await websocket.send_json({"type": "done"})
+        await websocket.close()
+    except WebSocketDisconnect:
+        pass
+    except Exception as exc:
+        try:
+            await websocket.send_json({"type": "error", "message": str(exc)})
+            await websocket.close()
+        except Exception:
+            pass
+    finally:
+        if step_task is not None:
+            try:
+                await step_task
+            except Exception:
+                pass
+        _stream_lock.release()
+
+
 @router.post("/transcribe-file")
 async def api_transcribe_file(
     background_tasks: BackgroundTasks,
-    file: UploadFile = File(...),
+    file: UploadFile | None = File(None),
     language: str = Form(...),
+    server_path: str = Form(""),
+    audio_track: int = Form(-1),
 ):
-    """Upload an audio file and start a full-file transcription task in the background."""
+    """Start a full-file transcription task in the background for an uploaded audio/video file or a server-side media path; video containers have their audio track (chosen by language tag or audio_track) demuxed on the server."""
     if task_orchestrator.is_running():
         return error_response("Transcription is already running")
     if not model_manager.is_audio_ready():
         return error_response("Audio model not loaded")
+    if (file is None) == (not server_path):
+        return error_response("Provide either an uploaded file or server_path")
 
     try:
-        tmp_file_path = await save_upload_to_temp(file)
-        background_tasks.add_task(
-            run_single_task,
-            TaskTranscribeFile(),
-            {"file_path": tmp_file_path, "language": language, "original_filename": file.filename},
-        )
+        data = {"language": language, "audio_track": audio_track if audio_track >= 0 else None}
+        if server_path:
+            data["source_path"] = resolve_media_path(server_path)
+            data["original_filename"] = os.path.basename(data["source_path"])
+        else:
+            data["file_path"], data["content_hash"] = await save_upload_with_hash(file)
+            data["original_filename"] = file.filename
+        background_tasks.add_task(run_single_task, TaskTranscribeFile(), data)
         return processing_response({"task_type": TaskTranscribeFile.TASK_TYPE}, "File transcription started")
     except Exception as exc:
         return error_response(str(exc))
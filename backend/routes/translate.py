@@ -6,9 +6,13 @@ from datetime import datetime
 import os
 
 from fastapi import APIRouter, BackgroundTasks, File, Form, UploadFile
+from fastapi.concurrency import run_in_threadpool
+from pydantic import BaseModel
+
+from orchestrator.job_estimator import estimate_job, load_pricing, save_pricing
 
 from orchestrator.translate_file.task_plan_translation_batches import TaskPlanTranslationBatches
-from orchestrator.translate_file.task_select_library_context import TaskSelectLibraryContext
+from orchestrator.translate_file.task_select_library_context import SELECTION_MODES, TaskSelectLibraryContext
 from orchestrator.review_file.task_plan_translation_review_batches import TaskPlanTranslationReviewBatches
 from orchestrator.review_file.task_retranslate_reviewed_lines import TaskRetranslateReviewedLines
 from orchestrator.review_file.task_review_translated_batches import TaskReviewTranslatedBatches
@@ -16,14 +20,16 @@ from orchestrator.review_file.task_select_library_context_for_review import Task
 from orchestrator.translate_file.task_split_oversized_batches import TaskSplitOversizedBatches
 from orchestrator.translate_file.task_translate_file import TaskTranslateFile
 from orchestrator.tasks.task_translate_line import TaskTranslateLine
-from utils.api_response import error_response, processing_response
+from utils.api_response import error_response, processing_response, success_response
 
+from utils.event_filter import resolve_event_filter
 from utils.library import load_series
 
 from .shared import (
     OUTPUTS_DIR,
     model_manager,
     parse_json_form,
+    remove_temp_files,
     result_handler,
     run_single_task,
     save_upload_to_temp,
@@ -33,6 +39,11 @@ from .shared import (
 router = APIRouter(prefix="/translate")
 
 
+class UpdatePricingRequest(BaseModel):
+    """Request body for saving the estimator's per-provider pricing table (USD per million input/output tokens)."""
+    pricing: dict[str, dict]
+
+
 def _safe_log_filename(filename: str) -> str:
     """Sanitize a filename for use in a log directory name by replacing non-alphanumeric characters."""
     original_filename = os.path.basename(str(filename or "subtitles")).strip() or "subtitles"
@@ -132,14 +143,20 @@ async def api_translate_file(
     output_lang: str = Form("en"),
     batch_size: int = Form(3),
     series_id: str = Form(""),
+    event_filter: str = Form("{}"),
+    reuse_plan: bool = Form(True),
+    library_context_mode: str = Form("hybrid"),
 ):
     """Upload a subtitle file and start the file translation chain in the background."""
     if task_orchestrator.is_running():
         return error_response("Translation is already running")
     if not model_manager.is_llm_ready():
         return error_response("LLM not loaded")
+    if library_context_mode not in SELECTION_MODES:
+        return error_response(f"library_context_mode must be one of: {', '.join(SELECTION_MODES)}")
 
     try:
+        event_filter_rules = resolve_event_filter(parse_json_form(event_filter))
         tmp_file_path = await save_upload_to_temp(file)
         series = None
         if series_id:
@@ -157,6 +174,9 @@ async def api_translate_file(
                 "output_lang": output_lang,
                 "batch_size": batch_size,
                 "series": series,
+                "event_filter": event_filter_rules,
+                "reuse_plan": reuse_plan,
+                "library_context_mode": library_context_mode,
             },
         )
         return processing_response({"task_type": TaskTranslateFile.TASK_TYPE}, "Translation started")
@@ -173,6 +193,11 @@ async def api_review_translated_file(
     output_lang: str = Form("en"),
     batch_size: int = Form(50),
     series_id: str = Form(""),
+    event_filter: str = Form("{}"),
+    concurrency: int = Form(4),
+    review_mode: str = Form("flagged"),
+    reuse_plan: bool = Form(True),
+    library_context_mode: str = Form("hybrid"),
 ):
     """Upload original and translated subtitle files and start the review chain in the background."""
     if task_orchestrator.is_running():
@@ -180,9 +205,18 @@ async def api_review_translated_file(
     if not model_manager.is_llm_ready():
         return error_response("LLM not loaded")
 
+    if review_mode not in ("flagged", "full"):
+        return error_response("review_mode must be 'flagged' or 'full'")
+    if library_context_mode not in SELECTION_MODES:
+        return error_response(f"library_context_mode must be one of: {', '.join(SELECTION_MODES)}")
+
+    temp_paths = []
     try:
+        event_filter_rules = resolve_event_filter(parse_json_form(event_filter))
         tmp_file_path = await save_upload_to_temp(file)
+        temp_paths.append(tmp_file_path)
         tmp_translated_file_path = await save_upload_to_temp(translated_file)
+        temp_paths.append(tmp_translated_file_path)
         series = None
         if series_id:
             try:
@@ -201,8 +235,86 @@ async def api_review_translated_file(
                 "output_lang": output_lang,
                 "batch_size": batch_size,
                 "series": series,
+                "event_filter": event_filter_rules,
+                "concurrency": max(1, concurrency),
+                "review_mode": review_mode,
+                "reuse_plan": reuse_plan,
+                "library_context_mode": library_context_mode,
             },
         )
         return processing_response({"task_type": TaskRetranslateReviewedLines.TASK_TYPE}, "Translation review started")
+    except Exception as exc:
+        # The translated upload can fail (e.g. over the size limit) after the original was saved
+        remove_temp_files(temp_paths)
+        return error_response(str(exc))
+
+
+@router.post("/estimate")
+async def api_estimate_job(
+    file: UploadFile = File(...),
+    translated_file: UploadFile | None = File(None),
+    mode: str = Form("translate"),
+    input_lang: str = Form("ja"),
+    output_lang: str = Form("en"),
+    batch_size: int = Form(3),
+    series_id: str = Form(""),
+    event_filter: str = Form("{}"),
+    concurrency: int = Form(1),
+    library_context_mode: str = Form("hybrid"),
+    review_mode: str = Form("flagged"),
+):
+    """Estimate LLM calls, tokens, per-provider cost and wall-clock time for a translate or review job without calling the LLM."""
+    if review_mode not in ("flagged", "full"):
+        return error_response("review_mode must be 'flagged' or 'full'")
+    if library_context_mode not in SELECTION_MODES:
+        return error_response(f"library_context_mode must be one of: {', '.join(SELECTION_MODES)}")
+
+    temp_paths = []
+    try:
+        event_filter_rules = resolve_event_filter(parse_json_form(event_filter))
+        tmp_file_path = await save_upload_to_temp(file, default_suffix=".ass")
+        temp_paths.append(tmp_file_path)
+        tmp_translated_file_path = ""
+        if translated_file is not None:
+            tmp_translated_file_path = await save_upload_to_temp(translated_file, default_suffix=".ass")
+            temp_paths.append(tmp_translated_file_path)
+        series = None
+        if series_id:
+            try:
+                series = load_series(series_id)
+            except Exception:
+                pass
+        estimate = await run_in_threadpool(
+            estimate_job,
+            tmp_file_path,
+            mode=mode,
+            translated_file_path=tmp_translated_file_path,
+            input_lang=input_lang,
+            output_lang=output_lang,
+            batch_size=batch_size,
+            series=series,
+            event_filter=event_filter_rules,
+            concurrency=concurrency,
+            library_context_mode=library_context_mode,
+            review_mode=review_mode,
+        )
+        return success_response(estimate)
+    except Exception as exc:
+        return error_response(str(exc))
+    finally:
+        remove_temp_files(temp_paths)
+
+
+@router.get("/pricing")
+async def api_get_pricing():
+    """Return the per-provider pricing table used by /estimate."""
+    return success_response({"pricing": load_pricing()})
+
+
+@router.post("/pricing")
+async def api_save_pricing(request: UpdatePricingRequest):
+    """Save the per-provider pricing table used by /estimate to data/llm_pricing.json."""
+    try:
+        return success_response({"pricing": save_pricing(request.pricing)})
     except Exception as exc:
         return error_response(str(exc))
@@ -0,0 +1,165 @@
+# Run from backend/:
+# python tests\run_job_estimator.py --file-path ..\data\sample\sample_sub_gakumas_tokimeki.ass --pretty
+# python tests\run_job_estimator.py --file-path ..\data\sample\sample_sub_gakumas_tokimeki.ass --mode translate --batch-size 3 --pretty
+
+import argparse
+import json
+import math
+import sys
+import tempfile
+from pathlib import Path
+
+
+BACKEND_DIR = Path(__file__).resolve().parents[1]
+if str(BACKEND_DIR) not in sys.path:
+    sys.path.insert(0, str(BACKEND_DIR))
+
+# Lines per batch of the synthetic plan the review check caches for the file.
+CHECK_PLAN_BATCH_LINES = 20
+
+
+def _parse_args() -> argparse.Namespace:
+    parser = argparse.ArgumentParser(
+        description="Run the dry-run job estimator; in review mode, check the review stage against a cached plan's length."
+    )
+    parser.add_argument(
+        "--file-path",
+        required=True,
+        help="Path to the original subtitle file.",
+    )
+    parser.add_argument(
+        "--translated-file-path",
+        default="",
+        help="Path to the translated subtitle file (review mode; enables the pre-screen).",
+    )
+    parser.add_argument(
+        "--mode",
+        default="review",
+        choices=["translate", "review"],
+        help="Chain to estimate.",
+    )
+    parser.add_argument(
+        "--input-lang",
+        default="ja",
+        help="Source language code.",
+    )
+    parser.add_argument(
+        "--output-lang",
+        default="en",
+        help="Target language code.",
+    )
+    parser.add_argument(
+        "--batch-size",
+        type=int,
+        default=3,
+        help="Batch size passed to the estimator (only the translate chain splits batches down to it).",
+    )
+    parser.add_argument(
+        "--pretty",
+        action="store_true",
+        help="Pretty-print the JSON result.",
+    )
+    return parser.parse_args()
+
+
+def _review_stage(estimate: dict) -> dict:
+    return next(stage for stage in estimate["stages"] if stage["task_type"] == "TaskReviewTranslatedBatches")
+
+
+def main() -> int:
+    args = _parse_args()
+
+    try:
+        import utils.plan_cache as plan_cache
+        from orchestrator.job_estimator import estimate_job
+        from utils.event_filter import filter_event_indices, resolve_event_filter
+        from utils.subtitle_document import SubtitleDocument
+    except Exception as exc:
+        print(json.dumps({"status": "error", "message": f"Failed to import backend estimator dependencies: {exc}"}))
+        return 1
+
+    source_file = Path(args.file_path).expanduser().resolve()
+    if not source_file.is_file():
+        print(json.dumps({"status": "error", "message": f"File not found: {source_file}"}))
+        return 1
+
+    settings = {
+        "mode": args.mode,
+        "translated_file_path": args.translated_file_path,
+        "input_lang": args.input_lang,
+        "output_lang": args.output_lang,
+    }
+    response = {"status": "complete", "checks": []}
+    with tempfile.TemporaryDirectory() as temp_dir:
+        # Keep the synthetic plan out of the shared plan cache.
+        plan_cache.PLAN_CACHE_DIR = Path(temp_dir) / "batch-plans"
+        try:
+            response["estimate"] = estimate_job(str(source_file), batch_size=args.batch_size, **settings)
+            if args.mode == "review":
+                uncached_small = _review_stage(estimate_job(str(source_file), batch_size=3, review_mode="full", **settings))
+                uncached_large = _review_stage(estimate_job(str(source_file), batch_size=50, review_mode="full", **settings))
+                response["checks"].append({
+                    "name": "review calls do not depend on batch_size",
+                    "passed": uncached_small["llm_calls"] == uncached_large["llm_calls"],
+                    "actual": [uncached_small["llm_calls"], uncached_large["llm_calls"]],
+                })
+
+                subs = SubtitleDocument.load(str(source_file))
+                included_count = len(filter_event_indices(subs, None))
+                plan = [
+                    {"start_index": start, "end_index": min(start + CHECK_PLAN_BATCH_LINES - 1, included_count)}
+                    for start in range(1, included_count + 1, CHECK_PLAN_BATCH_LINES)
+                ]
+                plan_cache.save_cached_plan(
+                    plan_cache.plan_cache_key(
+                        subs.content_hash,
+                        {"input_lang": args.input_lang, "output_lang": args.output_lang, "event_filter": resolve_event_filter(None), "context": {}},
+                    ),
+                    plan,
+                )
+                cached = estimate_job(str(source_file), batch_size=3, review_mode="full", **settings)
+                response["checks"].append({
+                    "name": "review calls match the cached plan length",
+                    "passed": cached["plan_cached"] and _review_stage(cached)["llm_calls"] == len(plan),
+                    "expected": len(plan),
+                    "actual": _review_stage(cached)["llm_calls"],
+                })
+                if cached["review_prescreen"]["applied"]:
+                    response["checks"].append({
+                        "name": "pre-screen runs over the cached plan's batches",
+                        "passed": cached["review_prescreen"]["batches"] == len(plan),
+                        "expected": len(plan),
+                        "actual": cached["review_prescreen"]["batches"],
+                    })
+                flagged = estimate_job(str(source_file), batch_size=3, review_mode="flagged", **settings)
+                response["checks"].append({
+                    "name": "flagged review calls stay within the plan length",
+                    "passed": _review_stage(flagged)["llm_calls"] <= len(plan),
+                    "expected": f"<= {len(plan)}",
+                    "actual": _review_stage(flagged)["llm_calls"],
+                })
+            else:
+                stage = next(stage for stage in response["estimate"]["stages"] if stage["task_type"] == "TaskTranslateFile")
+                minimum = math.ceil(response["estimate"]["included_lines"] / max(1, args.batch_size))
+                response["checks"].append({
+                    "name": "translate calls cover every line at batch_size",
+                    "passed": stage["llm_calls"] >= minimum,
+                    "expected": f">= {minimum}",
+                    "actual": stage["llm_calls"],
+                })
+        except Exception as exc:
+            print(json.dumps({"status": "error", "message": str(exc)}))
+            return 1
+
+    if not all(check["passed"] for check in response["checks"]):
+        response["status"] = "error"
+
+    if args.pretty:
+        print(json.dumps(response, indent=2, ensure_ascii=False))
+    else:
+        print(json.dumps(response, ensure_ascii=False))
+    return 0 if response["status"] == "complete" else 1
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
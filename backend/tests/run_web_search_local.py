@@ -0,0 +1,133 @@
+# Run from backend/:
+# python tests\run_web_search_local.py --pretty
+# python tests\run_web_search_local.py --fixture-file path\to\search-fixture.json --query "Kai character profile" --pretty
+
+import argparse
+import json
+import sys
+import tempfile
+from pathlib import Path
+
+
+BACKEND_DIR = Path(__file__).resolve().parents[1]
+if str(BACKEND_DIR) not in sys.path:
+    sys.path.insert(0, str(BACKEND_DIR))
+
+# Used when no --fixture-file is given; the second query only matches through fixture-query containment.
+DEFAULT_FIXTURE = {
+    "Kai character profile": ["Kai is the lead singer of the idol unit.", "Kai is Rin's older brother."],
+    "tokimeki": ["Tokimeki is the unit's debut single."],
+}
+DEFAULT_QUERIES = [
+    {"subject": "Kai", "query": "Kai character profile"},
+    {"subject": "Tokimeki", "query": "Tokimeki song meaning"},
+]
+EXPECTED_RESULTS = [
+    {"subject": "Kai", "results": DEFAULT_FIXTURE["Kai character profile"]},
+    {"subject": "Tokimeki", "results": DEFAULT_FIXTURE["tokimeki"]},
+]
+
+
+def _parse_args() -> argparse.Namespace:
+    parser = argparse.ArgumentParser(
+        description="Run the web search task end to end against the offline SearchLocal client."
+    )
+    parser.add_argument(
+        "--fixture-file",
+        help="Path to a JSON object mapping query text to a list of snippets (default: a built-in fixture).",
+    )
+    parser.add_argument(
+        "--query",
+        action="append",
+        help="Search query to run; repeat for several (default: queries matching the built-in fixture).",
+    )
+    parser.add_argument(
+        "--pretty",
+        action="store_true",
+        help="Pretty-print the JSON result.",
+    )
+    return parser.parse_args()
+
+
+def _write_default_fixture(directory: Path) -> str:
+    fixture_path = directory / "search-fixture.json"
+    fixture_path.write_text(json.dumps(DEFAULT_FIXTURE, ensure_ascii=False), encoding="utf-8")
+    return str(fixture_path)
+
+
+def main() -> int:
+    args = _parse_args()
+
+    with tempfile.TemporaryDirectory() as temp_dir:
+        temp_path = Path(temp_dir)
+        try:
+            # Give the shared logger its file handler in the temp dir before any backend module sets up the real one,
+            # so this run's FINISHED lines do not feed the estimator's calibration.
+            from utils.logger import setup_logger
+            run_logger = setup_logger(log_dir=temp_path)
+            import orchestrator.throughput_model as throughput_model
+            import utils.search_cache as search_cache
+            from models.model_manager import ModelManager
+            from models.search_local import SearchLocal
+            from orchestrator.library.task_web_search import TaskWebSearch
+            from orchestrator.result_handler import ResultHandler
+            from orchestrator.task_orchestrator import TaskOrchestrator
+        except Exception as exc:
+            print(json.dumps({"status": "error", "message": f"Failed to import backend task dependencies: {exc}"}))
+            return 1
+
+        # Keep the run out of the shared search cache and the learned throughput model, so every query reaches
+        # SearchLocal and no samples are recorded in data/throughput_model.json.
+        search_cache.SEARCH_CACHE_DIR = temp_path / "search-cache"
+        throughput_model.MODEL_FILE = temp_path / "throughput_model.json"
+        fixture_file = args.fixture_file or _write_default_fixture(temp_path)
+        if args.query:
+            queries = [{"subject": query, "query": query} for query in args.query]
+        else:
+            queries = DEFAULT_QUERIES
+
+        model_manager = ModelManager.get_instance()
+        model_manager.set_search_client(SearchLocal(fixture_file))
+        if not model_manager.load_search_model() or not model_manager.is_search_ready():
+            message = model_manager.search_loading_error or "Local search not loaded."
+            print(json.dumps({"status": "error", "message": message}))
+            return 1
+
+        log_dir = temp_path / "logs"
+        log_dir.mkdir()
+        task_orchestrator = TaskOrchestrator.get_instance()
+        search_task = TaskWebSearch()
+        task_orchestrator.clear_tasks()
+        task_orchestrator.add_task(search_task)
+        try:
+            payload = task_orchestrator.run_tasks(initial_data={"search_queries": queries, "log_dir": str(log_dir)})
+        except Exception as exc:
+            print(json.dumps({"status": "error", "message": str(exc)}))
+            return 1
+        finally:
+            for handler in run_logger.handlers:
+                handler.close()
+        search_log = json.loads((log_dir / "04-web-search.json").read_text(encoding="utf-8"))
+
+    record = ResultHandler.get_instance().get(search_task.task_type)
+    response = {
+        "status": "complete" if record and record.get("status") == "complete" else "error",
+        "task_type": search_task.task_type,
+        "result": payload.get("search_results"),
+        "cached_count": search_log["cached_count"],
+        "failed": search_log["failed"],
+    }
+    if response["status"] == "complete" and not args.fixture_file and not args.query:
+        if response["result"] != EXPECTED_RESULTS or response["cached_count"] or response["failed"]:
+            response["status"] = "error"
+            response["message"] = f"Search results do not match the fixture; expected {EXPECTED_RESULTS}"
+
+    if args.pretty:
+        print(json.dumps(response, indent=2, ensure_ascii=False))
+    else:
+        print(json.dumps(response, ensure_ascii=False))
+    return 0 if response["status"] == "complete" else 1
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
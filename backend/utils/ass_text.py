@@ -0,0 +1,96 @@
+"""
+Helpers for separating ASS markup from the translatable text of a subtitle event.
+
+ASS event text mixes dialogue with override blocks ({\\pos(...)}, {\\fad(...)}, {\\k20}),
+inline comments ({like this}) and vector drawings ({\\p1}m 0 0 l 100 0 ...{\\p0}).
+None of that should reach the LLM: it burns tokens and rarely survives translation intact.
+split_ass_text() pulls the markup out and remembers where it sat; restore_ass_text()
+puts it back into the translated line by relative position.
+"""
+
+import re
+
+OVERRIDE_BLOCK_PATTERN = re.compile(r"\{[^{}]*\}")
+DRAWING_MODE_PATTERN = re.compile(r"\\p(\d+)")
+
+
+def split_ass_text(text: str) -> tuple[str, list[tuple[int, str]]]:
+    """Return (plain_text, markup) where markup is a list of (offset, raw_markup) pairs relative to the stripped plain text."""
+    text = text or ""
+    plain_parts: list[str] = []
+    markup: list[tuple[int, str]] = []
+    plain_length = 0
+    drawing = False
+    cursor = 0
+
+    def add_markup(raw: str):
+        if markup and markup[-1][0] == plain_length:
+            markup[-1] = (plain_length, markup[-1][1] + raw)
+        else:
+            markup.append((plain_length, raw))
+
+    def add_text(raw: str):
+        nonlocal plain_length
+        if not raw:
+            return
+        if drawing:
+            add_markup(raw)
+            return
+        plain_parts.append(raw)
+        plain_length += len(raw)
+
+    for match in OVERRIDE_BLOCK_PATTERN.finditer(text):
+        add_text(text[cursor:match.start()])
+        block = match.group(0)
+        add_markup(block)
+        drawing_modes = DRAWING_MODE_PATTERN.findall(block)
+        if drawing_modes:
+            drawing = int(drawing_modes[-1]) > 0
+        cursor = match.end()
+    add_text(text[cursor:])
+
+    plain = "".join(plain_parts)
+    stripped = plain.strip()
+    leading = len(plain) - len(plain.lstrip())
+    normalized_markup = [
+        (min(max(offset - leading, 0), len(stripped)), raw)
+        for offset, raw in markup
+    ]
+    return stripped, normalized_markup
+
+
+def restore_ass_text(translated: str, plain: str, markup: list[tuple[int, str]]) -> str:
+    """Reinsert markup captured by split_ass_text() into a translated line, mapping inner offsets proportionally onto word boundaries."""
+    if not markup:
+        return translated
+
+    source_length = len(plain)
+    target_length = len(translated)
+    placements: list[tuple[int, str]] = []
+    for offset, raw in markup:
+        if offset <= 0 or source_length == 0:
+            position = 0
+        elif offset >= source_length:
+            position = target_length
+        else:
+            position = _nearest_boundary(translated, round(offset / source_length * target_length))
+        placements.append((position, raw))
+
+    pieces: list[str] = []
+    cursor = 0
+    for position, raw in placements:
+        position = max(position, cursor)
+        pieces.append(translated[cursor:position])
+        pieces.append(raw)
+        cursor = position
+    pieces.append(translated[cursor:])
+    return "".join(pieces)
+
+
+def _nearest_boundary(text: str, position: int) -> int:
+    """Snap a character position to the closest word boundary (the index just after a space), or return it unchanged if there is none."""
+    position = min(max(position, 0), len(text))
+    boundaries = [index + 1 for index, char in enumerate(text) if char == " "]
+    if not boundaries:
+        return position
+    return min(boundaries, key=lambda boundary: abs(boundary - position))
@@ -0,0 +1,137 @@
+"""
+On-disk cache of decoded audio, so re-transcribing or re-aligning a file skips the ffmpeg decode.
+
+Decoded 16 kHz mono float32 samples are stored as outputs/audio-cache/<key>.npy, where the key is the SHA-256 of
+the source file's content hash and the decode settings. Entries are opened with np.load(mmap_mode="r"), so chunks
+handed to transcription and alignment are read-only views into the page cache rather than copies. Entries are
+written while the first decode streams (header placeholder, raw samples, then the real header) and renamed into
+place only when complete. The cache is pruned to AUDIO_CACHE_MAX_BYTES, least recently used first; a hit refreshes
+the entry's mtime.
+"""
+
+import hashlib
+import io
+import json
+import os
+from pathlib import Path
+
+import numpy as np
+
+from utils.audio_stream import SAMPLE_RATE
+from utils.config import OUTPUTS_DIR
+
+AUDIO_CACHE_DIR = OUTPUTS_DIR / "audio-cache"
+AUDIO_CACHE_MAX_BYTES = 8 * 2**30
+HASH_BLOCK_BYTES = 1 << 20
+
+
+def file_sha256(path: str) -> str:
+    """Return the SHA-256 hex digest of a file, read in blocks."""
+    digest = hashlib.sha256()
+    with open(path, "rb") as f:
+        for block in iter(lambda: f.read(HASH_BLOCK_BYTES), b""):
+            digest.update(block)
+    return digest.hexdigest()
+
+
+def audio_cache_key(content_hash: str) -> str:
+    """Return the cache key for a source file content hash and the decode settings."""
+    payload = json.dumps({"content_hash": content_hash, "sample_rate": SAMPLE_RATE, "channels": 1, "dtype": "float32"}, sort_keys=True)
+    return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+
+def load_cached_audio(key: str) -> np.ndarray | None:
+    """Return the cached samples for key as a read-only memory map, or None if there is no readable entry."""
+    path = AUDIO_CACHE_DIR / f"{key}.npy"
+    try:
+        samples = np.load(path, mmap_mode="r")
+        os.utime(path)
+    except (OSError, ValueError):
+        return None
+    return samples if samples.dtype == np.float32 and samples.ndim == 1 else None
+
+
+def prune_audio_cache(max_bytes: int = AUDIO_CACHE_MAX_BYTES):
+    """Delete the least recently used entries until the cache fits in max_bytes."""
+    try:
+        entries = [(entry.stat().st_mtime, entry.stat().st_size, entry) for entry in AUDIO_CACHE_DIR.glob("*.npy")]
+    except OSError:
+        return
+    total = sum(size for _, size, _ in entries)
+    for _, size, entry in sorted(entries, key=lambda e: e[0]):
+        if total <= max_bytes:
+            break
+        try:
+            entry.unlink()
+            total -= size
+        except OSError:
+            pass
+
+
+def _npy_header(length: int) -> bytes:
+    """Return the .npy v1.0 header for a 1-D little-endian float32 array of length samples."""
+    header = io.BytesIO()
+    np.lib.format.write_array_header_1_0(header, {"descr": "<f4", "fortran_order": False, "shape": (length,)})
+    return header.getvalue()
+
+
+class DecodedAudioWriter:
+    """Write decoded chunks to a cache entry as they stream; commit() publishes it, discard() drops it. Disk errors only disable caching, never the decode."""
+
+    # Widest shape the placeholder header has to leave room for (~2 years of audio)
+    _MAX_LENGTH = 10**12
+
+    def __init__(self, key: str):
+        """Open a temp file for the entry and reserve space for its header."""
+        self._path = AUDIO_CACHE_DIR / f"{key}.npy"
+        self._tmp_path = AUDIO_CACHE_DIR / f"{key}.npy.tmp"
+        self._header_size = len(_npy_header(self._MAX_LENGTH))
+        self._length = 0
+        self._file = None
+        try:
+            AUDIO_CACHE_DIR.mkdir(parents=True, exist_ok=True)
+            self._file = open(self._tmp_path, "wb")
+            self._file.write(b"\0" * self._header_size)
+        except OSError:
+            self.discard()
+
+    def write(self, samples: np.ndarray):
+        """Append float32 samples to the entry."""
+        if self._file is None:
+            return
+        try:
+            self._file.write(np.ascontiguousarray(samples, dtype="<f4").tobytes())
+            self._length += len(samples)
+        except OSError:
+            self.discard()
+
+    def commit(self) -> Path | None:
+        """Write the final header, move the entry into place and prune the cache; returns the entry path, or None if nothing was cached."""
+        header = _npy_header(self._length)
+        if self._file is None or len(header) != self._header_size:
+            self.discard()
+            return None
+        try:
+            self._file.seek(0)
+            self._file.write(header)
+            self._file.close()
+            self._file = None
+            os.replace(self._tmp_path, self._path)
+        except OSError:
+            self.discard()
+            return None
+        prune_audio_cache()
+        return self._path
+
+    def discard(self):
+        """Close and delete the unfinished entry."""
+        if self._file is not None:
+            try:
+                self._file.close()
+            except OSError:
+                pass
+            self._file = None
+        try:
+            os.remove(self._tmp_path)
+        except OSError:
+            pass
@@ -0,0 +1,163 @@
+"""
+Streaming audio decode for long transcriptions.
+
+whisperx.load_audio() decodes a whole file into one float32 array (about 230 MB per hour at 16 kHz), so a
+multi-hour input is held in memory several times over while it is transcribed and aligned. Here ffmpeg's PCM
+output is read incrementally and cut into chunks of roughly CHUNK_SECONDS. Each cut is placed at the quietest
+short frame in the last SPLIT_SEARCH_SECONDS of the window (a light energy-based VAD), so chunk boundaries fall
+in pauses rather than mid-word. The ffmpeg invocation matches whisperx.load_audio, so chunk samples are identical
+to the monolithic decode.
+
+decode_audio_bytes() is the in-memory counterpart for short clips (transcribe-line), avoiding temp files.
+"""
+
+import io
+import subprocess
+import wave
+from typing import BinaryIO, Iterator
+
+import numpy as np
+
+SAMPLE_RATE = 16000
+CHUNK_SECONDS = 300
+SPLIT_SEARCH_SECONDS = 20
+SPLIT_FRAME_SECONDS = 0.03
+READ_BLOCK_BYTES = 1 << 20
+
+
+def probe_duration(path: str) -> float:
+    """Return the media duration in seconds according to ffprobe, or 0.0 if it cannot be determined."""
+    try:
+        output = subprocess.run(
+            ["ffprobe", "-v", "error", "-show_entries", "format=duration", "-of", "default=noprint_wrappers=1:nokey=1", path],
+            capture_output=True, check=True, text=True,
+        ).stdout
+        return max(0.0, float(output.strip()))
+    except Exception:
+        return 0.0
+
+
+def quietest_split(samples: np.ndarray, search_seconds: float = SPLIT_SEARCH_SECONDS) -> int:
+    """Return the sample index at the centre of the lowest-energy frame within the last search_seconds of samples."""
+    frame = max(1, int(SPLIT_FRAME_SECONDS * SAMPLE_RATE))
+    search = min(len(samples), int(search_seconds * SAMPLE_RATE))
+    start = len(samples) - search
+    frame_count = search // frame
+    if frame_count < 2:
+        return len(samples)
+    tail = samples[start:start + frame_count * frame].reshape(frame_count, frame)
+    energy = np.einsum("ij,ij->i", tail, tail)
+    return start + int(np.argmin(energy)) * frame + frame // 2
+
+
+def split_pcm_stream(
+    stream: BinaryIO,
+    chunk_seconds: float = CHUNK_SECONDS,
+    search_seconds: float = SPLIT_SEARCH_SECONDS,
+) -> Iterator[tuple[float, np.ndarray]]:
+    """Yield (offset_seconds, float32 samples) chunks cut at quiet points from a 16 kHz mono s16le byte stream."""
+    target = int(chunk_seconds * SAMPLE_RATE)
+    pending = np.zeros(0, dtype=np.float32)
+    offset = 0
+    leftover = b""
+    while True:
+        block = stream.read(READ_BLOCK_BYTES)
+        if block:
+            block = leftover + block
+            usable = len(block) - len(block) % 2
+            leftover = block[usable:]
+            pending = np.concatenate([pending, np.frombuffer(block[:usable], np.int16).astype(np.float32) / 32768.0])
+        while len(pending) >= target + int(search_seconds * SAMPLE_RATE) or (not block and len(pending) > target):
+            cut = quietest_split(pending[:target], search_seconds)
+            yield offset / SAMPLE_RATE, pending[:cut]
+            offset += cut
+            pending = pending[cut:]
+        if not block:
+            break
+    if len(pending):
+        yield offset / SAMPLE_RATE, pending
+
+
+def iter_array_chunks(
+    samples: np.ndarray,
+    chunk_seconds: float = CHUNK_SECONDS,
+    search_seconds: float = SPLIT_SEARCH_SECONDS,
+) -> Iterator[tuple[float, np.ndarray]]:
+    """Yield (offset_seconds, view) chunks of already-decoded samples cut at quiet points, without copying."""
+    target = int(chunk_seconds * SAMPLE_RATE)
+    offset = 0
+    while len(samples) - offset > target:
+        cut = quietest_split(samples[offset:offset + target], search_seconds)
+        yield offset / SAMPLE_RATE, samples[offset:offset + cut]
+        offset += cut
+    if len(samples) > offset:
+        yield offset / SAMPLE_RATE, samples[offset:]
+
+
+def iter_audio_chunks(
+    path: str,
+    chunk_seconds: float = CHUNK_SECONDS,
+    search_seconds: float = SPLIT_SEARCH_SECONDS,
+) -> Iterator[tuple[float, np.ndarray]]:
+    """Decode path with ffmpeg to 16 kHz mono and yield (offset_seconds, float32 samples) chunks cut at quiet points."""
+    cmd = [
+        "ffmpeg", "-nostdin", "-threads", "0", "-i", path,
+        "-f", "s16le", "-ac", "1", "-acodec", "pcm_s16le", "-ar", str(SAMPLE_RATE), "-",
+    ]
+    process = subprocess.Popen(cmd, stdout=subprocess.PIPE, stderr=subprocess.DEVNULL)
+    try:
+        yield from split_pcm_stream(process.stdout, chunk_seconds, search_seconds)
+        returncode = process.wait()
+    finally:
+        process.stdout.close()
+        if process.poll() is None:
+            process.kill()
+            process.wait()
+    if returncode != 0:
+        raise RuntimeError(f"ffmpeg failed to decode audio: {path}")
+
+
+def decode_audio_bytes(data: bytes, encoding: str = "auto", sample_rate: int = SAMPLE_RATE) -> np.ndarray:
+    """Decode an in-memory clip to 16 kHz mono float32 without temp files.
+
+    encoding is "pcm_s16le" or "pcm_f32le" for raw mono PCM at sample_rate, or "auto" for a container: PCM WAV
+    is parsed directly, anything else (webm/ogg/mp4/mp3...) is piped through ffmpeg's stdin.
+    """
+    if encoding == "pcm_s16le":
+        return _resample(np.frombuffer(data[:len(data) - len(data) % 2], np.int16).astype(np.float32) / 32768.0, sample_rate)
+    if encoding == "pcm_f32le":
+        return _resample(np.frombuffer(data[:len(data) - len(data) % 4], np.float32).copy(), sample_rate)
+    if encoding != "auto":
+        raise ValueError(f"Unsupported audio encoding: {encoding}")
+
+    if data[:4] == b"RIFF" and data[8:12] == b"WAVE":
+        try:
+            with wave.open(io.BytesIO(data)) as wav:
+                if wav.getsampwidth() == 2 and wav.getcomptype() == "NONE":
+                    frames = np.frombuffer(wav.readframes(wav.getnframes()), np.int16).astype(np.float32) / 32768.0
+                    channels = wav.getnchannels()
+                    if channels > 1:
+                        frames = frames[:len(frames) - len(frames) % channels].reshape(-1, channels).mean(axis=1)
+                    return _resample(frames, wav.getframerate())
+        except wave.Error:
+            pass
+
+    cmd = [
+        "ffmpeg", "-nostdin", "-threads", "0", "-i", "pipe:0",
+        "-f", "s16le", "-ac", "1", "-acodec", "pcm_s16le", "-ar", str(SAMPLE_RATE), "-",
+    ]
+    result = subprocess.run(cmd, input=data, capture_output=True)
+    if result.returncode != 0:
+        raise RuntimeError(f"ffmpeg failed to decode audio: {result.stderr.decode('utf-8', 'replace').strip()[-300:]}")
+    return np.frombuffer(result.stdout[:len(result.stdout) - len(result.stdout) % 2], np.int16).astype(np.float32) / 32768.0
+
+
+def _resample(samples: np.ndarray, sample_rate: int) -> np.ndarray:
+    """Linearly resample mono samples from sample_rate to SAMPLE_RATE (adequate for speech recognition input)."""
+    if sample_rate == SAMPLE_RATE or len(samples) == 0:
+        return samples
+    if sample_rate <= 0:
+        raise ValueError("sample_rate must be positive")
+    target_length = int(round(len(samples) * SAMPLE_RATE / sample_rate))
+    positions = np.arange(target_length) * (sample_rate / SAMPLE_RATE)
+    return np.interp(positions, np.arange(len(samples)), samples).astype(np.float32)
@@ -1,4 +1,9 @@
+import os
 from pathlib import Path
 
 BACKEND_DIR = Path(__file__).resolve().parent.parent
 OUTPUTS_DIR = BACKEND_DIR / "outputs"
+# Directories whose files may be transcribed by server-side path instead of upload (os.pathsep-separated)
+MEDIA_DIRS = [Path(p) for p in os.environ.get("TRANSLATOR_HELPER_MEDIA_DIRS", "").split(os.pathsep) if p.strip()]
+# Largest accepted upload, in MB (uploads are streamed to disk, so this bounds disk use, not memory)
+MAX_UPLOAD_BYTES = int(float(os.environ.get("TRANSLATOR_HELPER_MAX_UPLOAD_MB", "8192")) * 2**20)
@@ -0,0 +1,117 @@
+"""
+Include/exclude rules that decide which subtitle events go through the dialogue translation chain.
+
+Rules are a plain dict so they can travel through the task data dict and be posted as a JSON form field:
+
+  exclude_comments  — skip events whose type is Comment (default True)
+  exclude_karaoke   — skip events containing \\k/\\kf/\\ko karaoke timing tags (default False)
+  include_styles    — if non-empty, only events whose style matches one of these patterns are kept
+  exclude_styles    — events whose style matches any of these patterns are skipped
+  include_actors    — if non-empty, only events whose actor/name matches one of these patterns are kept
+  exclude_actors    — events whose actor/name matches any of these patterns are skipped
+  include_layers    — if non-empty, only events on these layers are kept
+  exclude_layers    — events on these layers are skipped
+
+Style and actor patterns are case-insensitive fnmatch globs (e.g. "OP*", "*Sign*").
+Excluded events keep their position in the file and are saved untouched, so indices stay aligned.
+"""
+
+import re
+from fnmatch import fnmatchcase
+
+KARAOKE_TAG_PATTERN = re.compile(r"\{[^{}]*\\(?:k|K|kf|ko)\d", re.IGNORECASE)
+
+DEFAULT_EVENT_FILTER = {
+    "exclude_comments": True,
+    "exclude_karaoke": False,
+    "include_styles": [],
+    "exclude_styles": [],
+    "include_actors": [],
+    "exclude_actors": [],
+    "include_layers": [],
+    "exclude_layers": [],
+}
+
+
+def resolve_event_filter(rules: dict | None) -> dict:
+    """Merge user-supplied rules over the defaults and validate their types; raises ValueError on unknown keys or bad values."""
+    resolved = {key: (list(value) if isinstance(value, list) else value) for key, value in DEFAULT_EVENT_FILTER.items()}
+    for key, value in (rules or {}).items():
+        if key not in DEFAULT_EVENT_FILTER:
+            raise ValueError(f"Unknown event filter rule '{key}'.")
+        if isinstance(DEFAULT_EVENT_FILTER[key], bool):
+            if not isinstance(value, bool):
+                raise ValueError(f"Event filter rule '{key}' must be true or false.")
+            resolved[key] = value
+        elif key.endswith("_layers"):
+            if not isinstance(value, list) or not all(isinstance(layer, int) for layer in value):
+                raise ValueError(f"Event filter rule '{key}' must be a list of integers.")
+            resolved[key] = list(value)
+        else:
+            if not isinstance(value, list) or not all(isinstance(pattern, str) for pattern in value):
+                raise ValueError(f"Event filter rule '{key}' must be a list of strings.")
+            resolved[key] = [pattern.strip().lower() for pattern in value if pattern.strip()]
+    return resolved
+
+
+def is_event_included(event, rules: dict) -> bool:
+    """Return True if a pysubs2 event passes the resolved include/exclude rules."""
+    if rules["exclude_comments"] and getattr(event, "is_comment", False):
+        return False
+    if rules["exclude_karaoke"] and KARAOKE_TAG_PATTERN.search(event.text or ""):
+        return False
+
+    style = (event.style or "").lower()
+    if rules["include_styles"] and not _matches_any(style, rules["include_styles"]):
+        return False
+    if _matches_any(style, rules["exclude_styles"]):
+        return False
+
+    actor = (event.name or "").lower()
+    if rules["include_actors"] and not _matches_any(actor, rules["include_actors"]):
+        return False
+    if _matches_any(actor, rules["exclude_actors"]):
+        return False
+
+    layer = int(getattr(event, "layer", 0) or 0)
+    if rules["include_layers"] and layer not in rules["include_layers"]:
+        return False
+    if layer in rules["exclude_layers"]:
+        return False
+    return True
+
+
+def filter_event_indices(subs, rules: dict | None) -> list[int]:
+    """Return the 0-based indices of the events in `subs` that pass the (unresolved) rules."""
+    resolved = resolve_event_filter(rules)
+    return [index for index, event in enumerate(subs) if is_event_included(event, resolved)]
+
+
+def to_compact_batches(batches: list[dict], included_indices: list[int]) -> list[dict]:
+    """Renumber file-index batches (1-based, covering every event) onto the 1-based positions of the included events only; drops batches with no included events."""
+    compact_batches: list[dict] = []
+    position = 0
+    for batch in batches:
+        start = position
+        end_index = int(batch["end_index"])
+        while position < len(included_indices) and included_indices[position] < end_index:
+            position += 1
+        if position > start:
+            compact_batches.append({**batch, "start_index": start + 1, "end_index": position})
+    return compact_batches
+
+
+def to_file_batches(batches: list[dict], included_indices: list[int], total_lines: int) -> list[dict]:
+    """Map compact batches back onto file indices, absorbing excluded events into the neighbouring batch so the plan still covers 1..total_lines."""
+    file_batches: list[dict] = []
+    current_start = 1
+    for number, batch in enumerate(batches, start=1):
+        end_index = total_lines if number == len(batches) else included_indices[int(batch["end_index"]) - 1] + 1
+        file_batches.append({**batch, "start_index": current_start, "end_index": end_index})
+        current_start = end_index + 1
+    return file_batches
+
+
+def _matches_any(value: str, patterns: list[str]) -> bool:
+    """Return True if the lowercased value matches any of the lowercased fnmatch patterns."""
+    return any(fnmatchcase(value, pattern) for pattern in patterns)
@@ -1,14 +1,33 @@
 """
 Utility helpers for the series library.
 
-Storage layout per series:
-  library/<series_id>/series.json      — series metadata (id, name, langs, notes)
-  library/<series_id>/characters.json  — list of character objects
-  library/<series_id>/glossary.json    — list of glossary term objects
+Storage: a single SQLite database, library/library.sqlite3, with one row per series, character and glossary
+term. Characters and glossary terms keep their full JSON object in a data column next to indexed lookup
+columns (ids, names, aliases, terms), so load_series()/save_series() still exchange the same dicts:
+
+  series            — id, name, input_lang, output_lang, notes, metadata JSON
+  characters        — series_id, id, position, name, data JSON
+  character_aliases — series_id, character_id, alias
+  glossary          — series_id, id, position, term, translation, data JSON
+
+save_series() writes in one transaction and only touches rows that changed. Single-entry edits go through
+get_character()/insert_character()/replace_character()/remove_character() (and the glossary equivalents), which
+look the entry up by primary key and write only its row. Libraries stored in the earlier
+per-series JSON layout (library/<series_id>/series.json, characters.json, glossary.json) are imported on first
+use and their directories moved to library/json-backup/.
+
+Every save bumps the series' version column. Parsed series and their list summaries are cached per process
+and keyed by that version, so load_series() and list_series_summaries() only read rows for series that
+changed since they were last cached (including writes from another process).
 """
 
+import copy
 import json
 import re
+import shutil
+import sqlite3
+import threading
+from contextlib import closing
 from pathlib import Path
 from typing import Optional
 
@@ -16,6 +35,56 @@ from fastapi import HTTPException
 
 OUTPUTS_DIR = Path(__file__).resolve().parent.parent / "outputs"
 LIBRARY_DIR = OUTPUTS_DIR / "library"
+LIBRARY_DB = LIBRARY_DIR / "library.sqlite3"
+JSON_BACKUP_DIR = LIBRARY_DIR / "json-backup"
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS series (
+    id TEXT PRIMARY KEY,
+    name TEXT NOT NULL,
+    input_lang TEXT NOT NULL DEFAULT 'ja',
+    output_lang TEXT NOT NULL DEFAULT 'en',
+    notes TEXT NOT NULL DEFAULT '',
+    meta TEXT NOT NULL DEFAULT '{}',
+    version INTEGER NOT NULL DEFAULT 0
+);
+CREATE TABLE IF NOT EXISTS characters (
+    series_id TEXT NOT NULL REFERENCES series(id) ON DELETE CASCADE,
+    id TEXT NOT NULL,
+    position INTEGER NOT NULL,
+    name TEXT NOT NULL,
+    data TEXT NOT NULL,
+    PRIMARY KEY (series_id, id)
+);
+CREATE TABLE IF NOT EXISTS character_aliases (
+    series_id TEXT NOT NULL,
+    character_id TEXT NOT NULL,
+    alias TEXT NOT NULL,
+    FOREIGN KEY (series_id, character_id) REFERENCES characters(series_id, id) ON DELETE CASCADE
+);
+CREATE TABLE IF NOT EXISTS glossary (
+    series_id TEXT NOT NULL REFERENCES series(id) ON DELETE CASCADE,
+    id TEXT NOT NULL,
+    position INTEGER NOT NULL,
+    term TEXT NOT NULL,
+    translation TEXT NOT NULL DEFAULT '',
+    data TEXT NOT NULL,
+    PRIMARY KEY (series_id, id)
+);
+CREATE INDEX IF NOT EXISTS idx_characters_name ON characters(series_id, name COLLATE NOCASE);
+CREATE INDEX IF NOT EXISTS idx_character_aliases_alias ON character_aliases(series_id, alias COLLATE NOCASE);
+CREATE INDEX IF NOT EXISTS idx_character_aliases_character ON character_aliases(series_id, character_id);
+CREATE INDEX IF NOT EXISTS idx_glossary_term ON glossary(series_id, term COLLATE NOCASE);
+"""
+SERIES_COLUMNS = ("id", "name", "input_lang", "output_lang", "notes")
+
+_schema_lock = threading.Lock()
+_schema_ready = False
+
+# Per-process caches keyed by series id: (version, parsed series) and (version, list summary).
+_cache_lock = threading.Lock()
+_series_cache: dict[str, tuple[int, dict]] = {}
+_summary_cache: dict[str, tuple[int, dict]] = {}
 
 
 def get_library_dir() -> Path:
@@ -52,48 +121,201 @@ def unique_slug(base: str, existing: set[str]) -> str:
 
 
 def list_series_ids() -> list[str]:
-    """Return all series IDs (subdirectory names) that have a series.json file."""
-    lib_dir = get_library_dir()
-    return [
-        d.name for d in lib_dir.iterdir()
-        if d.is_dir() and (d / "series.json").exists()
-    ]
+    """Return all series IDs in the library."""
+    with _connect() as conn:
+        return [row["id"] for row in conn.execute("SELECT id FROM series ORDER BY id")]
+
+
+def list_series_summaries() -> list[dict]:
+    """Return id, name, languages and character/glossary counts for every series, re-counting only series whose version changed."""
+    with _connect() as conn:
+        versions = {row["id"]: row["version"] for row in conn.execute("SELECT id, version FROM series")}
+        with _cache_lock:
+            stale = [series_id for series_id, version in versions.items() if _summary_cache.get(series_id, (None,))[0] != version]
+        rows = []
+        if stale:
+            placeholders = ", ".join("?" for _ in stale)
+            rows = conn.execute(
+                f"""
+                SELECT s.id, s.name, s.input_lang, s.output_lang, s.version,
+                       (SELECT COUNT(*) FROM characters c WHERE c.series_id = s.id) AS character_count,
+                       (SELECT COUNT(*) FROM glossary g WHERE g.series_id = s.id) AS glossary_count
+                FROM series s WHERE s.id IN ({placeholders})
+                """,
+                stale,
+            ).fetchall()
+    with _cache_lock:
+        for row in rows:
+            summary = dict(row)
+            _summary_cache[summary["id"]] = (summary.pop("version"), summary)
+        for series_id in set(_summary_cache) - set(versions):
+            del _summary_cache[series_id]
+        return [dict(_summary_cache[series_id][1]) for series_id in sorted(versions) if series_id in _summary_cache]
 
 
 def load_series(series_id: str) -> dict:
-    """Load and merge series.json, characters.json, and glossary.json into a single dict; raises 404 if not found."""
-    series_dir = get_series_dir(series_id)
-    meta_path = series_dir / "series.json"
-    if not meta_path.exists():
-        raise HTTPException(status_code=404, detail=f"Series '{series_id}' not found")
+    """Load a series with its characters and glossary (in saved order) as a single dict, served from the cache when unchanged; raises 404 if not found."""
+    _validate_series_id(series_id)
+    with _connect() as conn:
+        version_row = conn.execute("SELECT version FROM series WHERE id = ?", (series_id,)).fetchone()
+        if version_row is None:
+            _forget_series(series_id)
+            raise HTTPException(status_code=404, detail=f"Series '{series_id}' not found")
+        with _cache_lock:
+            cached = _series_cache.get(series_id)
+            if cached is not None and cached[0] == version_row["version"]:
+                return copy.deepcopy(cached[1])
+
+        row = conn.execute("SELECT * FROM series WHERE id = ?", (series_id,)).fetchone()
+        characters = [
+            json.loads(char_row["data"])
+            for char_row in conn.execute("SELECT data FROM characters WHERE series_id = ? ORDER BY position", (series_id,))
+        ]
+        glossary = [
+            json.loads(term_row["data"])
+            for term_row in conn.execute("SELECT data FROM glossary WHERE series_id = ? ORDER BY position", (series_id,))
+        ]
+    meta = {**json.loads(row["meta"]), **{column: row[column] for column in SERIES_COLUMNS}}
+    series = {**meta, "characters": characters, "glossary": glossary}
+    with _cache_lock:
+        _series_cache[series_id] = (row["version"], copy.deepcopy(series))
+    return series
+
 
-    with open(meta_path, "r", encoding="utf-8") as f:
-        meta = json.load(f)
+def save_series(series: dict) -> None:
+    """Write series metadata, characters and glossary in one transaction, updating only the rows that changed and bumping the series version."""
+    series_id = series["id"]
+    _validate_series_id(series_id)
+    characters = series.get("characters", [])
+    glossary = series.get("glossary", [])
+    extra_meta = {key: value for key, value in series.items() if key not in SERIES_COLUMNS and key not in ("characters", "glossary")}
+
+    with _connect() as conn, conn:
+        conn.execute(
+            """
+            INSERT INTO series (id, name, input_lang, output_lang, notes, meta) VALUES (?, ?, ?, ?, ?, ?)
+            ON CONFLICT(id) DO UPDATE SET name = excluded.name, input_lang = excluded.input_lang,
+                output_lang = excluded.output_lang, notes = excluded.notes, meta = excluded.meta,
+                version = series.version + 1
+            """,
+            (
+                series_id,
+                series.get("name", series_id),
+                series.get("input_lang", "ja"),
+                series.get("output_lang", "en"),
+                series.get("notes", ""),
+                json.dumps(extra_meta, ensure_ascii=False),
+            ),
+        )
+        _sync_characters(conn, series_id, characters)
+        _sync_glossary(conn, series_id, glossary)
+        version = conn.execute("SELECT version FROM series WHERE id = ?", (series_id,)).fetchone()["version"]
+
+    saved = {
+        **extra_meta,
+        **{column: series.get(column, default) for column, default in zip(SERIES_COLUMNS, (series_id, series_id, "ja", "en", ""))},
+        "characters": copy.deepcopy(characters),
+        "glossary": copy.deepcopy(glossary),
+    }
+    with _cache_lock:
+        _series_cache[series_id] = (version, saved)
+        _summary_cache[series_id] = (
+            version,
+            {
+                "id": series_id,
+                "name": saved["name"],
+                "input_lang": saved["input_lang"],
+                "output_lang": saved["output_lang"],
+                "character_count": len(characters),
+                "glossary_count": len(glossary),
+            },
+        )
+
+
+def remove_series(series_id: str) -> bool:
+    """Delete a series with all its characters and glossary terms; returns False if it did not exist."""
+    _validate_series_id(series_id)
+    with _connect() as conn, conn:
+        deleted = conn.execute("DELETE FROM series WHERE id = ?", (series_id,)).rowcount
+    _forget_series(series_id)
+    series_dir = get_library_dir() / series_id
+    if series_dir.is_dir():
+        shutil.rmtree(series_dir)
+    return bool(deleted)
 
-    chars_path = series_dir / "characters.json"
-    glossary_path = series_dir / "glossary.json"
-    characters = json.loads(chars_path.read_text(encoding="utf-8")) if chars_path.exists() else []
-    glossary = json.loads(glossary_path.read_text(encoding="utf-8")) if glossary_path.exists() else []
 
-    return {**meta, "characters": characters, "glossary": glossary}
+def get_character(series_id: str, character_id: str) -> Optional[dict]:
+    """Return one character of a series by id via the primary key, or None if not found."""
+    _validate_series_id(series_id)
+    with _connect() as conn:
+        row = conn.execute("SELECT data FROM characters WHERE series_id = ? AND id = ?", (series_id, character_id)).fetchone()
+    return json.loads(row["data"]) if row else None
 
 
-def save_series(series: dict) -> None:
-    """Atomically write series metadata, characters, and glossary to their respective JSON files, then restore the lists on the caller's dict."""
-    series_id = series["id"]
-    series_dir = get_series_dir(series_id)
-    series_dir.mkdir(parents=True, exist_ok=True)
+def get_glossary_term(series_id: str, term_id: str) -> Optional[dict]:
+    """Return one glossary term of a series by id via the primary key, or None if not found."""
+    _validate_series_id(series_id)
+    with _connect() as conn:
+        row = conn.execute("SELECT data FROM glossary WHERE series_id = ? AND id = ?", (series_id, term_id)).fetchone()
+    return json.loads(row["data"]) if row else None
 
-    characters = series.pop("characters", [])
-    glossary = series.pop("glossary", [])
 
-    _write_json(series_dir / "series.json", series)
-    _write_json(series_dir / "characters.json", characters)
-    _write_json(series_dir / "glossary.json", glossary)
+def insert_character(series_id: str, character: dict) -> dict:
+    """Append a character to a series, giving it an id slugified from its name that is unique in the series; returns the stored character."""
+    def write(conn: sqlite3.Connection) -> dict:
+        existing = {row["id"] for row in conn.execute("SELECT id FROM characters WHERE series_id = ?", (series_id,))}
+        stored = {"id": unique_slug(character.get("name", ""), existing), **{k: v for k, v in character.items() if k != "id"}}
+        return _upsert_character(conn, series_id, stored)
 
-    # Restore the lists so the caller's dict is unaffected
-    series["characters"] = characters
-    series["glossary"] = glossary
+    return _write_series_rows(series_id, write, lambda series, stored: series["characters"].append(stored))
+
+
+def replace_character(series_id: str, character: dict) -> None:
+    """Overwrite one character row (matched by its id) and its aliases, keeping its position."""
+    _write_series_rows(
+        series_id,
+        lambda conn: _upsert_character(conn, series_id, character),
+        lambda series, stored: series.__setitem__("characters", [stored if c["id"] == stored["id"] else c for c in series["characters"]]),
+    )
+
+
+def remove_character(series_id: str, character_id: str) -> bool:
+    """Delete one character row (its aliases cascade); returns False if it did not exist."""
+    deleted = _write_series_rows(
+        series_id,
+        lambda conn: conn.execute("DELETE FROM characters WHERE series_id = ? AND id = ?", (series_id, character_id)).rowcount,
+        lambda series, _: series.__setitem__("characters", [c for c in series["characters"] if c["id"] != character_id]),
+    )
+    return bool(deleted)
+
+
+def insert_glossary_term(series_id: str, term: dict) -> dict:
+    """Append a glossary term to a series, giving it an id slugified from the term that is unique in the series; returns the stored term."""
+    def write(conn: sqlite3.Connection) -> dict:
+        existing = {row["id"] for row in conn.execute("SELECT id FROM glossary WHERE series_id = ?", (series_id,))}
+        stored = {"id": unique_slug(term.get("term", ""), existing), **{k: v for k, v in term.items() if k != "id"}}
+        return _upsert_glossary_term(conn, series_id, stored)
+
+    return _write_series_rows(series_id, write, lambda series, stored: series["glossary"].append(stored))
+
+
+def replace_glossary_term(series_id: str, term: dict) -> None:
+    """Overwrite one glossary term row (matched by its id), keeping its position."""
+    _write_series_rows(
+        series_id,
+        lambda conn: _upsert_glossary_term(conn, series_id, term),
+        lambda series, stored: series.__setitem__("glossary", [stored if t["id"] == stored["id"] else t for t in series["glossary"]]),
+    )
+
+
+def remove_glossary_term(series_id: str, term_id: str) -> bool:
+    """Delete one glossary term row; returns False if it did not exist."""
+    deleted = _write_series_rows(
+        series_id,
+        lambda conn: conn.execute("DELETE FROM glossary WHERE series_id = ? AND id = ?", (series_id, term_id)).rowcount,
+        lambda series, _: series.__setitem__("glossary", [t for t in series["glossary"] if t["id"] != term_id]),
+    )
+    return bool(deleted)
 
 
 def find_character(series: dict, character_id: str) -> Optional[dict]:
@@ -112,10 +334,186 @@ def find_glossary_term(series: dict, term_id: str) -> Optional[dict]:
     return None
 
 
-def _write_json(path: Path, data) -> None:
-    """Write `data` as indented UTF-8 JSON to `path`."""
-    with open(path, "w", encoding="utf-8") as f:
-        json.dump(data, f, ensure_ascii=False, indent=2)
+def _connect() -> "closing[sqlite3.Connection]":
+    """Open a connection to the library database, creating the schema and importing JSON-layout series on first use."""
+    global _schema_ready
+    get_library_dir()
+    conn = sqlite3.connect(LIBRARY_DB, timeout=30)
+    conn.row_factory = sqlite3.Row
+    conn.execute("PRAGMA foreign_keys = ON")
+    if not _schema_ready:
+        with _schema_lock:
+            if not _schema_ready:
+                conn.execute("PRAGMA journal_mode = WAL")
+                conn.executescript(SCHEMA)
+                series_columns = {row["name"] for row in conn.execute("PRAGMA table_info(series)")}
+                if "version" not in series_columns:
+                    conn.execute("ALTER TABLE series ADD COLUMN version INTEGER NOT NULL DEFAULT 0")
+                _migrate_json_library(conn)
+                _schema_ready = True
+    return closing(conn)
+
+
+def _forget_series(series_id: str) -> None:
+    """Drop a series from the per-process caches."""
+    with _cache_lock:
+        _series_cache.pop(series_id, None)
+        _summary_cache.pop(series_id, None)
+
+
+def _write_series_rows(series_id: str, write, patch):
+    """Run write(conn) and bump the series version in one transaction, returning write's result; raises 404 if the series does not exist.
+
+    If the cached series was at the version just before this write, patch(series, result) applies the same change to
+    it so the next load_series() stays a cache hit; otherwise the cache entry is dropped.
+    """
+    _validate_series_id(series_id)
+    with _connect() as conn, conn:
+        if conn.execute("UPDATE series SET version = version + 1 WHERE id = ?", (series_id,)).rowcount == 0:
+            raise HTTPException(status_code=404, detail=f"Series '{series_id}' not found")
+        result = write(conn)
+        version = conn.execute("SELECT version FROM series WHERE id = ?", (series_id,)).fetchone()["version"]
+
+    with _cache_lock:
+        cached = _series_cache.pop(series_id, None)
+        _summary_cache.pop(series_id, None)
+        if cached is not None and cached[0] == version - 1:
+            series = cached[1]
+            patch(series, copy.deepcopy(result))
+            _series_cache[series_id] = (version, series)
+    return result
+
+
+def _upsert_character(conn: sqlite3.Connection, series_id: str, character: dict) -> dict:
+    """Insert a character at the end of the series or update it in place, rewriting its aliases, inside the caller's transaction; returns the character."""
+    conn.execute(
+        """
+        INSERT INTO characters (series_id, id, position, name, data)
+        VALUES (?, ?, (SELECT COALESCE(MAX(position), -1) + 1 FROM characters WHERE series_id = ?), ?, ?)
+        ON CONFLICT(series_id, id) DO UPDATE SET name = excluded.name, data = excluded.data
+        """,
+        (series_id, character["id"], series_id, character.get("name", ""), json.dumps(character, ensure_ascii=False)),
+    )
+    conn.execute("DELETE FROM character_aliases WHERE series_id = ? AND character_id = ?", (series_id, character["id"]))
+    conn.executemany(
+        "INSERT INTO character_aliases (series_id, character_id, alias) VALUES (?, ?, ?)",
+        [(series_id, character["id"], alias) for alias in character.get("aliases") or [] if alias],
+    )
+    return character
+
+
+def _upsert_glossary_term(conn: sqlite3.Connection, series_id: str, term: dict) -> dict:
+    """Insert a glossary term at the end of the series or update it in place, inside the caller's transaction; returns the term."""
+    conn.execute(
+        """
+        INSERT INTO glossary (series_id, id, position, term, translation, data)
+        VALUES (?, ?, (SELECT COALESCE(MAX(position), -1) + 1 FROM glossary WHERE series_id = ?), ?, ?, ?)
+        ON CONFLICT(series_id, id) DO UPDATE SET term = excluded.term, translation = excluded.translation, data = excluded.data
+        """,
+        (series_id, term["id"], series_id, term.get("term", ""), term.get("translation", ""), json.dumps(term, ensure_ascii=False)),
+    )
+    return term
+
+
+def _sync_characters(conn: sqlite3.Connection, series_id: str, characters: list[dict]) -> None:
+    """Upsert changed characters (and their aliases) and delete removed ones, inside the caller's transaction."""
+    existing = {
+        row["id"]: (row["position"], row["data"])
+        for row in conn.execute("SELECT id, position, data FROM characters WHERE series_id = ?", (series_id,))
+    }
+    wanted = {}
+    for position, char in enumerate(characters):
+        wanted[char["id"]] = (position, json.dumps(char, ensure_ascii=False), char)
+
+    removed = [(series_id, char_id) for char_id in existing if char_id not in wanted]
+    conn.executemany("DELETE FROM characters WHERE series_id = ? AND id = ?", removed)
+    changed = [
+        (char_id, position, data, char)
+        for char_id, (position, data, char) in wanted.items()
+        if existing.get(char_id) != (position, data)
+    ]
+    conn.executemany(
+        """
+        INSERT INTO characters (series_id, id, position, name, data) VALUES (?, ?, ?, ?, ?)
+        ON CONFLICT(series_id, id) DO UPDATE SET position = excluded.position, name = excluded.name, data = excluded.data
+        """,
+        [(series_id, char_id, position, char.get("name", ""), data) for char_id, position, data, char in changed],
+    )
+    conn.executemany(
+        "DELETE FROM character_aliases WHERE series_id = ? AND character_id = ?",
+        [(series_id, char_id) for char_id, _, _, _ in changed],
+    )
+    conn.executemany(
+        "INSERT INTO character_aliases (series_id, character_id, alias) VALUES (?, ?, ?)",
+        [
+            (series_id, char_id, alias)
+            for char_id, _, _, char in changed
+            for alias in char.get("aliases") or []
+            if alias
+        ],
+    )
+
+
+def _sync_glossary(conn: sqlite3.Connection, series_id: str, glossary: list[dict]) -> None:
+    """Upsert changed glossary terms and delete removed ones, inside the caller's transaction."""
+    existing = {
+        row["id"]: (row["position"], row["data"])
+        for row in conn.execute("SELECT id, position, data FROM glossary WHERE series_id = ?", (series_id,))
+    }
+    wanted = {}
+    for position, term in enumerate(glossary):
+        wanted[term["id"]] = (position, json.dumps(term, ensure_ascii=False), term)
+
+    conn.executemany(
+        "DELETE FROM glossary WHERE series_id = ? AND id = ?",
+        [(series_id, term_id) for term_id in existing if term_id not in wanted],
+    )
+    conn.executemany(
+        """
+        INSERT INTO glossary (series_id, id, position, term, translation, data) VALUES (?, ?, ?, ?, ?, ?)
+        ON CONFLICT(series_id, id) DO UPDATE SET position = excluded.position, term = excluded.term,
+            translation = excluded.translation, data = excluded.data
+        """,
+        [
+            (series_id, term_id, position, term.get("term", ""), term.get("translation", ""), data)
+            for term_id, (position, data, term) in wanted.items()
+            if existing.get(term_id) != (position, data)
+        ],
+    )
+
+
+def _migrate_json_library(conn: sqlite3.Connection) -> None:
+    """Import every library/<series_id>/series.json series not yet in the database, then move its directory to json-backup/."""
+    for series_dir in sorted(LIBRARY_DIR.iterdir()):
+        meta_path = series_dir / "series.json"
+        if not series_dir.is_dir() or series_dir == JSON_BACKUP_DIR or not meta_path.is_file():
+            continue
+        with open(meta_path, "r", encoding="utf-8") as f:
+            meta = json.load(f)
+        chars_path = series_dir / "characters.json"
+        glossary_path = series_dir / "glossary.json"
+        characters = json.loads(chars_path.read_text(encoding="utf-8")) if chars_path.exists() else []
+        glossary = json.loads(glossary_path.read_text(encoding="utf-8")) if glossary_path.exists() else []
+        series_id = meta.get("id") or series_dir.name
+
+        exists = conn.execute("SELECT 1 FROM series WHERE id = ?", (series_id,)).fetchone()
+        if not exists:
+            with conn:
+                conn.execute(
+                    "INSERT INTO series (id, name, input_lang, output_lang, notes, meta) VALUES (?, ?, ?, ?, ?, ?)",
+                    (
+                        series_id,
+                        meta.get("name", series_id),
+                        meta.get("input_lang", "ja"),
+                        meta.get("output_lang", "en"),
+                        meta.get("notes", ""),
+                        json.dumps({k: v for k, v in meta.items() if k not in SERIES_COLUMNS}, ensure_ascii=False),
+                    ),
+                )
+                _sync_characters(conn, series_id, characters)
+                _sync_glossary(conn, series_id, glossary)
+        JSON_BACKUP_DIR.mkdir(parents=True, exist_ok=True)
+        shutil.move(str(series_dir), str(JSON_BACKUP_DIR / series_dir.name))
 
 
 def _validate_series_id(series_id: str) -> None:
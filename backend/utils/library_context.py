@@ -0,0 +1,40 @@
+"""
+Text blocks for the characters and glossary entries passed to translation and review prompts as context.
+
+Used by TaskSelectLibraryContext for the file-level selection, by TaskTranslateFile for the per-batch subset,
+and by the job estimator to size the library context.
+"""
+
+
+def format_characters(characters: list[dict]) -> str:
+    """Format character entries as a readable text block."""
+    blocks = []
+    for char in characters:
+        lines = [f"{char['name']}"]
+        aliases = char.get("aliases") or []
+        if aliases:
+            lines.append(f"  Aliases: {', '.join(aliases)}")
+        personality = char.get("personality") or []
+        if personality:
+            lines.append(f"  Personality: {'; '.join(personality)}")
+        history = char.get("history") or []
+        if history:
+            lines.append(f"  History: {'; '.join(history)}")
+        relationships = char.get("relationships") or {}
+        for other, descs in relationships.items():
+            if descs:
+                lines.append(f"  Relationship with {other}: {'; '.join(descs)}")
+        blocks.append("\n".join(lines))
+    return "\n\n".join(blocks)
+
+
+def format_glossary(glossary: list[dict]) -> str:
+    """Format glossary entries as a readable text block."""
+    lines = []
+    for term in glossary:
+        entry = f"{term['term']} → {term['translation']}"
+        notes = term.get("notes", "").strip()
+        if notes:
+            entry += f" ({notes})"
+        lines.append(entry)
+    return "\n".join(lines)
@@ -0,0 +1,352 @@
+"""
+Local retrieval index that matches series library entries against an episode transcript without an LLM call.
+
+Every character name and alias and every glossary term becomes one or more search keys. Transcript and keys
+are normalized the same way: NFKC, lowercase, katakana folded to hiragana, with a Hepburn romanization of the
+kana alongside, so "アリス", "ありす" and "Arisu" all meet as "arisu". Each entry gets the strongest match
+found:
+
+  exact    — a full name, alias or term occurs in the transcript (kana/kanji or romanized form)
+  partial  — only one part of a multi-word name occurs (e.g. a given name), or a key that is ambiguous on its
+             own matched: a romanized form of a kana/kanji key, a key of SHORT_KEY_LENGTH characters or fewer,
+             or a Latin key found only inside a longer romanized word
+  fuzzy    — at least FUZZY_THRESHOLD of a long key's character bigrams occur within one transcript line
+
+Latin keys only match on word boundaries ("cat" does not match "communicate"), except that keys longer than
+SHORT_KEY_LENGTH may also match inside romanized Japanese, which has no spaces, as a partial match.
+
+Exact matches are taken as selected. Partial and fuzzy matches are candidates an LLM can confirm from the
+few transcript lines that contain them.
+
+LibraryMatcher compiles the same keys into one Aho–Corasick automaton so a short text (a translation batch)
+can be scanned for every selected entry in a single pass, independent of the library size.
+"""
+
+import bisect
+import re
+import unicodedata
+from collections import Counter, deque
+
+MATCH_STRENGTHS = {"exact": 3, "partial": 2, "fuzzy": 1}
+MIN_CJK_KEY_LENGTH = 2
+MIN_LATIN_KEY_LENGTH = 3
+SHORT_KEY_LENGTH = 3
+FUZZY_MIN_KEY_LENGTH = 4
+FUZZY_THRESHOLD = 0.75
+MAX_MATCH_LINES = 5
+
+NAME_PART_SEPARATORS = re.compile(r"[\s・･=＝·]+")
+NON_ALNUM = re.compile(r"[^0-9a-z\n]+")
+LONG_VOWELS = re.compile(r"ou|oo|uu|ii")
+
+# Hepburn romanization of hiragana; digraphs are looked up before single kana.
+KANA_DIGRAPHS = {
+    "きゃ": "kya", "きゅ": "kyu", "きょ": "kyo", "しゃ": "sha", "しゅ": "shu", "しょ": "sho",
+    "ちゃ": "cha", "ちゅ": "chu", "ちょ": "cho", "にゃ": "nya", "にゅ": "nyu", "にょ": "nyo",
+    "ひゃ": "hya", "ひゅ": "hyu", "ひょ": "hyo", "みゃ": "mya", "みゅ": "myu", "みょ": "myo",
+    "りゃ": "rya", "りゅ": "ryu", "りょ": "ryo", "ぎゃ": "gya", "ぎゅ": "gyu", "ぎょ": "gyo",
+    "じゃ": "ja", "じゅ": "ju", "じょ": "jo", "びゃ": "bya", "びゅ": "byu", "びょ": "byo",
+    "ぴゃ": "pya", "ぴゅ": "pyu", "ぴょ": "pyo", "しぇ": "she", "ちぇ": "che", "じぇ": "je",
+    "てぃ": "ti", "でぃ": "di", "ふぁ": "fa", "ふぃ": "fi", "ふぇ": "fe", "ふぉ": "fo",
+    "うぃ": "wi", "うぇ": "we", "うぉ": "wo", "ゔぁ": "va", "ゔぃ": "vi", "ゔぇ": "ve", "ゔぉ": "vo",
+}
+KANA_SINGLE = {
+    "あ": "a", "い": "i", "う": "u", "え": "e", "お": "o",
+    "か": "ka", "き": "ki", "く": "ku", "け": "ke", "こ": "ko",
+    "さ": "sa", "し": "shi", "す": "su", "せ": "se", "そ": "so",
+    "た": "ta", "ち": "chi", "つ": "tsu", "て": "te", "と": "to",
+    "な": "na", "に": "ni", "ぬ": "nu", "ね": "ne", "の": "no",
+    "は": "ha", "ひ": "hi", "ふ": "fu", "へ": "he", "ほ": "ho",
+    "ま": "ma", "み": "mi", "む": "mu", "め": "me", "も": "mo",
+    "や": "ya", "ゆ": "yu", "よ": "yo",
+    "ら": "ra", "り": "ri", "る": "ru", "れ": "re", "ろ": "ro",
+    "わ": "wa", "ゐ": "i", "ゑ": "e", "を": "o", "ん": "n",
+    "が": "ga", "ぎ": "gi", "ぐ": "gu", "げ": "ge", "ご": "go",
+    "ざ": "za", "じ": "ji", "ず": "zu", "ぜ": "ze", "ぞ": "zo",
+    "だ": "da", "ぢ": "ji", "づ": "zu", "で": "de", "ど": "do",
+    "ば": "ba", "び": "bi", "ぶ": "bu", "べ": "be", "ぼ": "bo",
+    "ぱ": "pa", "ぴ": "pi", "ぷ": "pu", "ぺ": "pe", "ぽ": "po",
+    "ゔ": "vu", "ぁ": "a", "ぃ": "i", "ぅ": "u", "ぇ": "e", "ぉ": "o",
+    "ゃ": "ya", "ゅ": "yu", "ょ": "yo", "ゎ": "wa",
+}
+
+
+def normalize_text(text: str) -> str:
+    """Return text NFKC-normalized, lowercased, with Latin diacritics removed and katakana folded to hiragana."""
+    text = unicodedata.normalize("NFKC", text).lower()
+    return "".join(_fold_char(char) for char in text)
+
+
+def _fold_char(char: str) -> str:
+    """Fold one character: katakana to hiragana, accented Latin letters (ō, é) to their base letter."""
+    if "ァ" <= char <= "ヶ":
+        return chr(ord(char) - 0x60)
+    if "\u00c0" <= char <= "\u024f":
+        return "".join(part for part in unicodedata.normalize("NFKD", char) if not unicodedata.combining(part))
+    return char
+
+
+def compact_romaji(text: str) -> str:
+    """Return romanized text reduced to letters and digits with long vowels collapsed (ou, oo, uu, ii), so Kyōsuke, Kyousuke and Kyosuke agree."""
+    compact = NON_ALNUM.sub("", romanize(text))
+    return LONG_VOWELS.sub(lambda match: match.group(0)[0], compact)
+
+
+def romanize(text: str) -> str:
+    """Return normalized text with its hiragana replaced by Hepburn romaji (long-vowel marks dropped, っ doubling the next consonant)."""
+    result = []
+    index = 0
+    double_next = False
+    while index < len(text):
+        pair = text[index:index + 2]
+        if pair in KANA_DIGRAPHS:
+            romaji = KANA_DIGRAPHS[pair]
+            index += 2
+        elif text[index] == "っ":
+            double_next = True
+            index += 1
+            continue
+        elif text[index] == "ー":
+            index += 1
+            continue
+        else:
+            romaji = KANA_SINGLE.get(text[index], text[index])
+            index += 1
+        if double_next and romaji[:1].isalpha() and romaji[0] not in "aeiou":
+            romaji = ("t" if romaji.startswith("ch") else romaji[0]) + romaji
+        double_next = False
+        result.append(romaji)
+    return "".join(result)
+
+
+def build_library_index(characters: list[dict], glossary: list[dict]) -> list[dict]:
+    """Return one index entry per character and glossary term with its normalized search keys."""
+    index = []
+    for kind, entries in (("character", characters), ("glossary", glossary)):
+        for entry in entries:
+            surfaces = [entry.get("name", "")] + list(entry.get("aliases") or []) if kind == "character" else [entry.get("term", "")]
+            keys: dict[str, str] = {}
+            for surface in surfaces:
+                normalized = normalize_text(str(surface)).strip()
+                if not normalized:
+                    continue
+                _add_key(keys, NAME_PART_SEPARATORS.sub("", normalized), "exact")
+                parts = [part for part in NAME_PART_SEPARATORS.split(normalized) if part]
+                if kind == "character" and len(parts) > 1:
+                    for part in parts:
+                        _add_key(keys, part, "partial")
+            if keys:
+                index.append({"kind": kind, "id": str(entry["id"]), "keys": keys})
+    return index
+
+
+def match_library_index(index: list[dict], lines: list[str]) -> dict[str, dict[str, dict]]:
+    """Match index entries against transcript lines; returns {"characters": {id: match}, "glossary": {id: match}} with match strength and 0-based line numbers."""
+    normalized_lines = [normalize_text(line) for line in lines]
+    native = "\n".join(normalized_lines)
+    romaji_compact, romaji_boundaries = _compact_romaji_lines(normalized_lines)
+    native_offsets = _line_offsets(normalized_lines)
+    romaji_offsets = _line_offsets(romaji_compact.split("\n"))
+    native_postings = _bigram_postings(normalized_lines)
+    romaji_postings = _bigram_postings(romaji_compact.split("\n"))
+
+    matches: dict[str, dict[str, dict]] = {"characters": {}, "glossary": {}}
+    for entry in index:
+        best: dict | None = None
+        for key, strength in entry["keys"].items():
+            if key.isascii():
+                postings = romaji_postings
+                found_lines = _find_lines(romaji_compact, romaji_offsets, key, romaji_boundaries)
+                if not found_lines and len(key) > SHORT_KEY_LENGTH:
+                    # Romanized Japanese has no word boundaries, so an unbounded hit is only a candidate
+                    found_lines = _find_lines(romaji_compact, romaji_offsets, key)
+                    strength = "partial" if found_lines else strength
+            else:
+                postings = native_postings
+                found_lines = _find_lines(native, native_offsets, key)
+            if found_lines:
+                candidate = {"match": strength, "key": key, "score": 1.0, "lines": found_lines}
+            elif len(key) >= FUZZY_MIN_KEY_LENGTH:
+                candidate = _fuzzy_match(key, postings)
+                if candidate is None:
+                    continue
+            else:
+                continue
+            if best is None or (MATCH_STRENGTHS[candidate["match"]], candidate["score"]) > (MATCH_STRENGTHS[best["match"]], best["score"]):
+                best = candidate
+        if best is not None:
+            matches["characters" if entry["kind"] == "character" else "glossary"][entry["id"]] = best
+    return matches
+
+
+class KeywordAutomaton:
+    """Aho–Corasick automaton over string keys; find() returns the payloads of every key occurring in a text."""
+
+    def __init__(self, patterns: dict[str, set[tuple[str, str]]]):
+        """Build the trie, failure links and merged outputs for patterns mapping key -> payloads."""
+        self._goto: list[dict[str, int]] = [{}]
+        self._fail: list[int] = [0]
+        # Per state: (key length, payload) for every key ending there
+        self._outputs: list[set[tuple[int, tuple[str, str]]]] = [set()]
+        for key, payloads in patterns.items():
+            state = 0
+            for char in key:
+                next_state = self._goto[state].get(char)
+                if next_state is None:
+                    next_state = len(self._goto)
+                    self._goto[state][char] = next_state
+                    self._goto.append({})
+                    self._fail.append(0)
+                    self._outputs.append(set())
+                state = next_state
+            self._outputs[state] |= {(len(key), payload) for payload in payloads}
+
+        # Breadth-first so every failure link points at an already finished, shorter state; root children fail to the root.
+        queue = deque(self._goto[0].values())
+        while queue:
+            state = queue.popleft()
+            for char, next_state in self._goto[state].items():
+                queue.append(next_state)
+                fallback = self._fail[state]
+                while fallback and char not in self._goto[fallback]:
+                    fallback = self._fail[fallback]
+                self._fail[next_state] = self._goto[fallback].get(char, 0)
+                self._outputs[next_state] |= self._outputs[self._fail[next_state]]
+
+    def find(self, text: str, boundaries: set[int] | None = None) -> set[tuple[str, str]]:
+        """Return the payloads of all keys that occur in text; with boundaries, only occurrences starting and ending on one of those offsets count."""
+        found: set[tuple[str, str]] = set()
+        state = 0
+        goto = self._goto
+        fail = self._fail
+        for position, char in enumerate(text, start=1):
+            while state and char not in goto[state]:
+                state = fail[state]
+            state = goto[state].get(char, 0)
+            for length, payload in self._outputs[state]:
+                if boundaries is None or (position in boundaries and position - length in boundaries):
+                    found.add(payload)
+        return found
+
+
+class LibraryMatcher:
+    """Finds which library entries (by exact or partial key) are mentioned in a text, built once per job."""
+
+    def __init__(self, characters: list[dict], glossary: list[dict]):
+        """Compile the search keys of the given characters and glossary terms into automatons: short Latin keys need word boundaries, the rest match anywhere."""
+        patterns: dict[str, set[tuple[str, str]]] = {}
+        bounded_patterns: dict[str, set[tuple[str, str]]] = {}
+        for entry in build_library_index(characters, glossary):
+            for key in entry["keys"]:
+                target = bounded_patterns if key.isascii() and len(key) <= SHORT_KEY_LENGTH else patterns
+                target.setdefault(key, set()).add((entry["kind"], entry["id"]))
+        self._automaton = KeywordAutomaton(patterns)
+        self._bounded_automaton = KeywordAutomaton(bounded_patterns)
+
+    def match(self, texts: list[str]) -> tuple[set[str], set[str]]:
+        """Return the character ids and glossary ids mentioned in any of texts (native or romanized form)."""
+        normalized_lines = [normalize_text(text) for text in texts]
+        normalized = "\n".join(normalized_lines)
+        romaji, boundaries = _compact_romaji_lines(normalized_lines)
+        found = (
+            self._automaton.find(normalized)
+            | self._automaton.find(romaji)
+            | self._bounded_automaton.find(romaji, boundaries)
+        )
+        character_ids = {entry_id for kind, entry_id in found if kind == "character"}
+        glossary_ids = {entry_id for kind, entry_id in found if kind == "glossary"}
+        return character_ids, glossary_ids
+
+
+def _add_key(keys: dict[str, str], key: str, strength: str) -> None:
+    """Add a native key and its romanized form, keeping the stronger strength and skipping keys too short to be specific.
+
+    Forms that are ambiguous on their own are capped at "partial": the romanization of a kana/kanji key, and short
+    Latin or kana keys, which commonly occur inside other words (りん in りんご).
+    """
+    for form in (key, compact_romaji(key)):
+        min_length = MIN_LATIN_KEY_LENGTH if form.isascii() else MIN_CJK_KEY_LENGTH
+        if len(form) < min_length:
+            continue
+        form_strength = strength
+        romaji_only = form.isascii() and not key.isascii()
+        short = len(form) <= SHORT_KEY_LENGTH and (form.isascii() or all("ぁ" <= char <= "ゖ" or char == "ー" for char in form))
+        if romaji_only or short:
+            form_strength = "partial" if strength == "exact" else strength
+        if form not in keys or MATCH_STRENGTHS[form_strength] > MATCH_STRENGTHS[keys[form]]:
+            keys[form] = form_strength
+
+
+def _line_offsets(lines: list[str]) -> list[int]:
+    """Return the start offset of each line in the newline-joined text."""
+    offsets = []
+    position = 0
+    for line in lines:
+        offsets.append(position)
+        position += len(line) + 1
+    return offsets
+
+
+def _compact_romaji_lines(lines: list[str]) -> tuple[str, set[int]]:
+    """Return the newline-joined compact_romaji() of normalized lines and the offsets in it where a word boundary fell."""
+    compact_lines = []
+    boundaries: set[int] = set()
+    offset = 0
+    for line in lines:
+        kept = []
+        line_boundaries = {0}
+        for char in romanize(line):
+            if "a" <= char <= "z" or "0" <= char <= "9":
+                kept.append(char)
+            else:
+                line_boundaries.add(len(kept))
+        compact = "".join(kept)
+        # Collapse long vowels as compact_romaji() does, shifting each boundary left past the characters removed before it
+        removed = [match.start() + 1 for match in LONG_VOWELS.finditer(compact)]
+        compact = LONG_VOWELS.sub(lambda match: match.group(0)[0], compact)
+        boundaries.update(offset + position - bisect.bisect_left(removed, position) for position in line_boundaries)
+        boundaries.add(offset + len(compact))
+        compact_lines.append(compact)
+        offset += len(compact) + 1
+    return "\n".join(compact_lines), boundaries
+
+
+def _find_lines(haystack: str, offsets: list[int], key: str, boundaries: set[int] | None = None) -> list[int]:
+    """Return the first MAX_MATCH_LINES 0-based line numbers where key occurs; with boundaries, only occurrences starting and ending on one of those offsets count."""
+    found: list[int] = []
+    position = haystack.find(key)
+    while position != -1 and len(found) < MAX_MATCH_LINES:
+        if boundaries is None or (position in boundaries and position + len(key) in boundaries):
+            line = bisect.bisect_right(offsets, position) - 1
+            if not found or found[-1] != line:
+                found.append(line)
+        position = haystack.find(key, position + 1)
+    return found
+
+
+def _bigrams(text: str) -> set[str]:
+    """Return the set of character bigrams in text."""
+    return {text[i:i + 2] for i in range(len(text) - 1)}
+
+
+def _bigram_postings(lines: list[str]) -> dict[str, list[int]]:
+    """Return, per character bigram, the 0-based numbers of the lines containing it."""
+    postings: dict[str, list[int]] = {}
+    for line_number, line in enumerate(lines):
+        for bigram in _bigrams(line):
+            postings.setdefault(bigram, []).append(line_number)
+    return postings
+
+
+def _fuzzy_match(key: str, postings: dict[str, list[int]]) -> dict | None:
+    """Return a fuzzy match for key from the lines sharing the largest fraction of its bigrams, or None below FUZZY_THRESHOLD."""
+    key_bigrams = _bigrams(key)
+    shared = Counter(line for bigram in key_bigrams for line in postings.get(bigram, ()))
+    if not shared:
+        return None
+    best_count = max(shared.values())
+    score = best_count / len(key_bigrams)
+    if score < FUZZY_THRESHOLD:
+        return None
+    lines = sorted(line for line, count in shared.items() if count == best_count)[:MAX_MATCH_LINES]
+    return {"match": "fuzzy", "key": key, "score": round(score, 3), "lines": lines}
@@ -0,0 +1,98 @@
+"""
+Audio track extraction from video containers (MKV/MP4/...) for transcription.
+
+Instead of having users extract a WAV themselves, the server demuxes just the audio track it needs: ffprobe lists
+the container's audio streams, one is picked by its language tag (or an explicit track index), and ffmpeg copies
+that stream without re-encoding into a small temporary Matroska audio file that the normal decode path reads.
+Files can also be referenced by a server-side path, as long as it resolves inside one of the directories listed in
+the TRANSLATOR_HELPER_MEDIA_DIRS environment variable (os.pathsep-separated), so nothing has to be uploaded.
+"""
+
+import json
+import os
+import subprocess
+import tempfile
+from pathlib import Path
+
+from utils.config import MEDIA_DIRS
+
+# Whisper language codes to the ISO 639-2 codes used in container language tags
+ISO_639_2 = {
+    "en": ("eng",), "ja": ("jpn",), "zh": ("zho", "chi"), "ko": ("kor",), "es": ("spa",), "fr": ("fra", "fre"),
+    "de": ("deu", "ger"), "it": ("ita",), "pt": ("por",), "ru": ("rus",), "ar": ("ara",), "hi": ("hin",),
+    "th": ("tha",), "vi": ("vie",), "id": ("ind",), "nl": ("nld", "dut"), "pl": ("pol",), "tr": ("tur",),
+}
+
+
+def resolve_media_path(path: str) -> str:
+    """Return the real path of a server-side media file, raising ValueError unless it is a file inside an allowed media directory."""
+    if not MEDIA_DIRS:
+        raise ValueError("Server-side media paths are disabled; set TRANSLATOR_HELPER_MEDIA_DIRS")
+    resolved = Path(path).expanduser().resolve()
+    if not any(resolved.is_relative_to(root.resolve()) for root in MEDIA_DIRS):
+        raise ValueError("Path is outside the allowed media directories")
+    if not resolved.is_file():
+        raise ValueError(f"File not found: {path}")
+    return str(resolved)
+
+
+def probe_streams(path: str) -> list[dict]:
+    """Return ffprobe's stream list (index, codec_type, codec_name, tags, disposition) for a media file."""
+    output = subprocess.run(
+        ["ffprobe", "-v", "error", "-show_entries", "stream=index,codec_type,codec_name:stream_tags=language,title:stream_disposition=default,attached_pic",
+         "-of", "json", path],
+        capture_output=True, check=True, text=True,
+    ).stdout
+    return json.loads(output or "{}").get("streams", [])
+
+
+def select_audio_stream(streams: list[dict], language: str, audio_track: int | None = None) -> dict | None:
+    """Pick the audio stream to transcribe: the explicit audio_track (0-based among audio streams), else the first tagged with language, else the default, else the first."""
+    audio_streams = [s for s in streams if s.get("codec_type") == "audio"]
+    if not audio_streams:
+        return None
+    if audio_track is not None and audio_track >= 0:
+        if audio_track >= len(audio_streams):
+            raise ValueError(f"Audio track {audio_track} does not exist; the file has {len(audio_streams)} audio tracks")
+        return audio_streams[audio_track]
+    wanted = {language.lower(), *ISO_639_2.get(language.lower(), ())}
+    for stream in audio_streams:
+        if str(stream.get("tags", {}).get("language", "")).lower() in wanted:
+            return stream
+    for stream in audio_streams:
+        if stream.get("disposition", {}).get("default"):
+            return stream
+    return audio_streams[0]
+
+
+def needs_extraction(streams: list[dict]) -> bool:
+    """Return True if the file is not a plain single-track audio file (it has video/subtitle streams or several audio tracks)."""
+    audio_count = sum(1 for s in streams if s.get("codec_type") == "audio")
+    # Cover art in MP3/M4A shows up as a video stream flagged attached_pic
+    other_streams = [s for s in streams if s.get("codec_type") != "audio" and not s.get("disposition", {}).get("attached_pic")]
+    return audio_count > 1 or bool(other_streams)
+
+
+def extract_audio_track(path: str, language: str, audio_track: int | None = None) -> tuple[str, dict] | None:
+    """Copy the selected audio stream of a container into a temporary .mka file and return (temp path, stream info), or None if path is already plain audio."""
+    streams = probe_streams(path)
+    if not needs_extraction(streams):
+        return None
+    stream = select_audio_stream(streams, language, audio_track)
+    if stream is None:
+        raise ValueError("The file has no audio track")
+    fd, output_path = tempfile.mkstemp(suffix=".mka")
+    os.close(fd)
+    result = subprocess.run(
+        ["ffmpeg", "-nostdin", "-y", "-v", "error", "-i", path, "-map", f"0:{stream['index']}", "-vn", "-sn", "-dn", "-c:a", "copy", output_path],
+        capture_output=True, text=True,
+    )
+    if result.returncode != 0:
+        os.remove(output_path)
+        raise RuntimeError(f"ffmpeg failed to extract the audio track: {result.stderr.strip()[-300:]}")
+    return output_path, {
+        "index": stream["index"],
+        "codec": stream.get("codec_name", ""),
+        "language": stream.get("tags", {}).get("language", ""),
+        "title": stream.get("tags", {}).get("title", ""),
+    }
@@ -0,0 +1,144 @@
+"""
+In-memory LRU cache for auxiliary models (e.g. WhisperX alignment models) that are costly to load but small
+enough to keep around between jobs.
+
+Entries are keyed by any hashable (for alignment: language code and device) and built on a miss by the loader
+passed to get(). The cache is bounded two ways: the estimated size of all entries must stay under a memory budget
+(least recently used entries are evicted first, but the entry just requested is always kept), and entries unused
+for longer than the idle timeout are dropped by a background timer. Evicted models are released with gc and, on
+CUDA, torch.cuda.empty_cache().
+"""
+
+import gc
+import threading
+import time
+from collections import OrderedDict
+from typing import Any, Callable, Hashable
+
+from utils.logger import setup_logger
+
+logger = setup_logger("translator-helper")
+
+
+def estimate_model_bytes(model: Any) -> int:
+    """Return the summed size of a torch module's parameters and buffers in bytes, or 0 if it is not a torch module."""
+    try:
+        tensors = list(model.parameters()) + list(model.buffers())
+        return sum(t.numel() * t.element_size() for t in tensors)
+    except Exception:
+        return 0
+
+
+def release_torch_memory():
+    """Run gc and return cached CUDA memory to the driver when torch with CUDA is available."""
+    gc.collect()
+    try:
+        import torch
+        if torch.cuda.is_available():
+            torch.cuda.empty_cache()
+    except Exception:
+        pass
+
+
+class LRUModelCache:
+    """Thread-safe LRU cache of loaded models with a memory budget and idle eviction."""
+
+    def __init__(self, memory_budget_mb: float = 4096, idle_seconds: float = 1800, name: str = "model"):
+        """Create an empty cache; a budget or idle timeout of 0 disables that bound."""
+        self._lock = threading.Lock()
+        # key -> (value, size_bytes, last_used)
+        self._entries: "OrderedDict[Hashable, tuple[Any, int, float]]" = OrderedDict()
+        self._timer: threading.Timer | None = None
+        self._name = name
+        self.memory_budget_mb = memory_budget_mb
+        self.idle_seconds = idle_seconds
+
+    def get(self, key: Hashable, loader: Callable[[], Any], size_of: Callable[[Any], int] = estimate_model_bytes) -> Any:
+        """Return the cached value for key, loading and inserting it with loader() on a miss."""
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None:
+                self._entries[key] = (entry[0], entry[1], time.monotonic())
+                self._entries.move_to_end(key)
+                logger.info("%s cache hit: %s", self._name, key)
+                return entry[0]
+
+        # Load outside the lock so other keys stay usable; a concurrent miss for the same key keeps the first insert.
+        started = time.monotonic()
+        value = loader()
+        size = size_of(value)
+        logger.info("%s cache miss: %s loaded in %.1fs (%.0f MB)", self._name, key, time.monotonic() - started, size / 2**20)
+
+        evicted = []
+        with self._lock:
+            if key in self._entries:
+                value = self._entries[key][0]
+            else:
+                self._entries[key] = (value, size, time.monotonic())
+            self._entries.move_to_end(key)
+            evicted = self._evict_over_budget()
+            self._schedule_idle_check()
+        if evicted:
+            self._release(evicted)
+        return value
+
+    def evict_idle(self):
+        """Drop every entry that has not been used within the idle timeout."""
+        with self._lock:
+            self._timer = None
+            evicted = []
+            if self.idle_seconds > 0:
+                cutoff = time.monotonic() - self.idle_seconds
+                for key in [k for k, (_, _, last_used) in self._entries.items() if last_used < cutoff]:
+                    evicted.append(key)
+                    del self._entries[key]
+            self._schedule_idle_check()
+        if evicted:
+            self._release(evicted)
+
+    def clear(self):
+        """Drop every cached entry and cancel the idle timer."""
+        with self._lock:
+            evicted = list(self._entries)
+            self._entries.clear()
+            if self._timer is not None:
+                self._timer.cancel()
+                self._timer = None
+        if evicted:
+            self._release(evicted)
+
+    def keys(self) -> list:
+        """Return the cached keys from least to most recently used."""
+        with self._lock:
+            return list(self._entries)
+
+    def total_bytes(self) -> int:
+        """Return the summed estimated size of all cached entries."""
+        with self._lock:
+            return sum(size for _, size, _ in self._entries.values())
+
+    def _evict_over_budget(self) -> list:
+        """Pop least recently used entries until the budget is met, always keeping the newest; caller holds the lock."""
+        if self.memory_budget_mb <= 0:
+            return []
+        budget = self.memory_budget_mb * 2**20
+        evicted = []
+        while len(self._entries) > 1 and sum(size for _, size, _ in self._entries.values()) > budget:
+            key, _ = self._entries.popitem(last=False)
+            evicted.append(key)
+        return evicted
+
+    def _schedule_idle_check(self):
+        """Start a daemon timer for the next idle expiry if entries remain and none is pending; caller holds the lock."""
+        if self.idle_seconds <= 0 or not self._entries or self._timer is not None:
+            return
+        oldest = min(last_used for _, _, last_used in self._entries.values())
+        delay = max(1.0, oldest + self.idle_seconds - time.monotonic())
+        self._timer = threading.Timer(delay, self.evict_idle)
+        self._timer.daemon = True
+        self._timer.start()
+
+    def _release(self, keys: list):
+        """Log the evicted keys and free the memory they held."""
+        logger.info("%s cache evicted: %s", self._name, ", ".join(str(k) for k in keys))
+        release_torch_memory()
@@ -0,0 +1,38 @@
+"""
+On-disk cache of LLM batch plans, so a review or re-translation of a file that was already planned reuses the plan.
+
+Plans are stored as outputs/batch-plans/<key>.json, where the key is the SHA-256 of the source file's content
+hash together with every planner setting that shapes the plan (languages, event filter, context). The cached
+batches are the planner's raw compact batches, validated again by the planner on reuse.
+"""
+
+import hashlib
+import json
+
+from utils.config import OUTPUTS_DIR
+
+PLAN_CACHE_DIR = OUTPUTS_DIR / "batch-plans"
+
+
+def plan_cache_key(content_hash: str, settings: dict) -> str:
+    """Return the cache key for a file content hash and the planner settings used on it."""
+    payload = json.dumps({"content_hash": content_hash, "settings": settings}, ensure_ascii=False, sort_keys=True)
+    return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+
+def load_cached_plan(key: str) -> list[dict] | None:
+    """Return the cached compact batches for key, or None if there is no readable entry."""
+    path = PLAN_CACHE_DIR / f"{key}.json"
+    try:
+        with open(path, "r", encoding="utf-8") as f:
+            batches = json.load(f).get("batches")
+    except (OSError, ValueError, AttributeError):
+        return None
+    return batches if isinstance(batches, list) and batches else None
+
+
+def save_cached_plan(key: str, batches: list[dict], metadata: dict | None = None):
+    """Store compact batches under key, along with descriptive metadata (filename, line counts)."""
+    PLAN_CACHE_DIR.mkdir(parents=True, exist_ok=True)
+    with open(PLAN_CACHE_DIR / f"{key}.json", "w", encoding="utf-8") as f:
+        json.dump({**(metadata or {}), "batches": batches}, f, ensure_ascii=False, indent=2)
@@ -0,0 +1,148 @@
+"""
+Local heuristic pre-screen for the review chain: decide which batches are worth sending to the LLM reviewer.
+
+Every signal is computed for all lines at once with numpy over the tag-stripped original/translated texts:
+
+  empty             — the original has text but the translation is empty
+  length_ratio      — translated/original length ratio is an outlier for this file (robust z-score on the log ratio)
+  source_script     — the translation still contains characters of the source language's script
+  glossary_missing  — the original contains a glossary term but the translation lacks its expected rendering
+  duplicate         — a translation repeats the previous line's translation although the originals differ
+
+A batch is flagged when any included line inside it raises a signal.
+"""
+
+import numpy as np
+
+# Unicode ranges per language, used to spot untranslated source text left in the output.
+SCRIPT_RANGES = {
+    "ja": [(0x3040, 0x30FF), (0x4E00, 0x9FFF), (0xFF66, 0xFF9F)],
+    "zh": [(0x4E00, 0x9FFF), (0x3400, 0x4DBF)],
+    "ko": [(0xAC00, 0xD7AF), (0x1100, 0x11FF), (0x3130, 0x318F)],
+    "ru": [(0x0400, 0x04FF)],
+    "uk": [(0x0400, 0x04FF)],
+    "ar": [(0x0600, 0x06FF)],
+    "th": [(0x0E00, 0x0E7F)],
+}
+SIGNALS = ("empty", "length_ratio", "source_script", "glossary_missing", "duplicate")
+LENGTH_RATIO_Z_THRESHOLD = 3.5
+MIN_RATIO_LENGTH = 4
+# Floor for the median absolute deviation of log length ratios, so files with very uniform lines do not flag small wobbles.
+MIN_LOG_RATIO_SPREAD = 0.15
+
+
+def score_lines(
+    original_texts: list[str],
+    translated_texts: list[str],
+    input_lang: str = "ja",
+    output_lang: str = "en",
+    glossary: list[dict] | None = None,
+) -> dict[str, np.ndarray]:
+    """Return a boolean array per signal (one entry per line) for tag-stripped original/translated text pairs of equal length."""
+    count = len(original_texts)
+    original_lengths = _lengths(original_texts)
+    translated_lengths = _lengths(translated_texts)
+    has_original = original_lengths > 0
+
+    signals = {name: np.zeros(count, dtype=bool) for name in SIGNALS}
+    if count == 0:
+        return signals
+
+    signals["empty"] = has_original & (translated_lengths == 0)
+
+    measurable = (original_lengths >= MIN_RATIO_LENGTH) & (translated_lengths > 0)
+    if measurable.sum() >= 3:
+        log_ratio = np.zeros(count)
+        log_ratio[measurable] = np.log(translated_lengths[measurable] / original_lengths[measurable])
+        median = np.median(log_ratio[measurable])
+        mad = max(float(np.median(np.abs(log_ratio[measurable] - median))), MIN_LOG_RATIO_SPREAD)
+        robust_z = 0.6745 * (log_ratio - median) / mad
+        signals["length_ratio"] = measurable & (np.abs(robust_z) > LENGTH_RATIO_Z_THRESHOLD)
+
+    source_ranges = SCRIPT_RANGES.get(input_lang.split("-")[0].lower(), [])
+    target_ranges = SCRIPT_RANGES.get(output_lang.split("-")[0].lower(), [])
+    if source_ranges and not _ranges_overlap(source_ranges, target_ranges):
+        signals["source_script"] = has_original & (_count_in_ranges(translated_texts, source_ranges) > 0)
+
+    if glossary:
+        original_array = np.array([text.lower() for text in original_texts], dtype=str)
+        translated_array = np.array([text.lower() for text in translated_texts], dtype=str)
+        for entry in glossary:
+            term = str(entry.get("term", "")).strip().lower()
+            rendering = str(entry.get("translation", "")).strip().lower()
+            if not term or not rendering:
+                continue
+            uses_term = np.char.find(original_array, term) >= 0
+            if not uses_term.any():
+                continue
+            signals["glossary_missing"] |= uses_term & (np.char.find(translated_array, rendering) < 0)
+
+    if count > 1:
+        original_array = np.array(original_texts, dtype=object)
+        translated_array = np.array(translated_texts, dtype=object)
+        repeated = (translated_array[1:] == translated_array[:-1]) & (original_array[1:] != original_array[:-1])
+        signals["duplicate"][1:] = repeated & (translated_lengths[1:] > 0)
+
+    return signals
+
+
+def screen_batches(
+    original_texts: list[str],
+    translated_texts: list[str],
+    batches: list[dict],
+    included_indices: list[int] | None = None,
+    input_lang: str = "ja",
+    output_lang: str = "en",
+    glossary: list[dict] | None = None,
+) -> list[dict]:
+    """Score every line and return, per 1-based inclusive batch, whether it is flagged plus its signal counts and flagged line indices."""
+    signals = score_lines(original_texts, translated_texts, input_lang, output_lang, glossary)
+    flagged_lines = np.zeros(len(original_texts), dtype=bool)
+    for mask in signals.values():
+        flagged_lines |= mask
+    if included_indices is not None:
+        included_mask = np.zeros(len(original_texts), dtype=bool)
+        included_mask[np.asarray(included_indices, dtype=int)] = True
+        flagged_lines &= included_mask
+
+    results = []
+    for batch in batches:
+        start = int(batch["start_index"]) - 1
+        end = int(batch["end_index"])
+        flagged_indices = (np.flatnonzero(flagged_lines[start:end]) + start + 1).tolist()
+        results.append(
+            {
+                "flagged": bool(flagged_indices),
+                "flagged_indices": flagged_indices,
+                "signals": {
+                    name: int((mask[start:end] & flagged_lines[start:end]).sum())
+                    for name, mask in signals.items()
+                },
+            }
+        )
+    return results
+
+
+def _lengths(texts: list[str]) -> np.ndarray:
+    """Return the character length of each text as a float array."""
+    return np.fromiter((len(text) for text in texts), dtype=float, count=len(texts))
+
+
+def _count_in_ranges(texts: list[str], ranges: list[tuple[int, int]]) -> np.ndarray:
+    """Count, per text, the characters whose code point falls in any of the ranges, using one pass over all code points."""
+    lengths = np.fromiter((len(text) for text in texts), dtype=np.int64, count=len(texts))
+    code_points = np.frombuffer("".join(texts).encode("utf-32-le"), dtype=np.uint32)
+    if code_points.size == 0:
+        return np.zeros(len(texts), dtype=np.int64)
+    in_range = np.zeros(code_points.size, dtype=np.int64)
+    for low, high in ranges:
+        in_range |= (code_points >= low) & (code_points <= high)
+    # Prefix sums give per-text counts without a Python loop over characters.
+    totals = np.concatenate(([0], np.cumsum(in_range)))
+    ends = np.cumsum(lengths)
+    return totals[ends] - totals[ends - lengths]
+
+
+def _ranges_overlap(first: list[tuple[int, int]], second: list[tuple[int, int]]) -> bool:
+    """Return True if any range in first overlaps any range in second."""
+    return any(low <= other_high and other_low <= high for low, high in first for other_low, other_high in second)
@@ -0,0 +1,53 @@
+"""
+On-disk cache of web search results, so queries that recur across episodes of a series are not searched again.
+
+Entries are stored as outputs/search-cache/<key>.json, where the key is the SHA-256 of the search provider,
+the normalized query (NFKC, case-folded, whitespace collapsed) and the result limit. Each entry records when it
+was fetched; readers pass a TTL and treat older entries as misses.
+"""
+
+import hashlib
+import json
+import os
+import time
+import unicodedata
+
+from utils.config import OUTPUTS_DIR
+
+SEARCH_CACHE_DIR = OUTPUTS_DIR / "search-cache"
+
+
+def normalize_query(query: str) -> str:
+    """Return query NFKC-normalized, case-folded and with whitespace collapsed."""
+    return " ".join(unicodedata.normalize("NFKC", query).casefold().split())
+
+
+def search_cache_key(provider: str, query: str, max_results: int) -> str:
+    """Return the cache key for a query sent to provider with a result limit."""
+    payload = json.dumps({"provider": provider, "query": normalize_query(query), "max_results": max_results}, ensure_ascii=False, sort_keys=True)
+    return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+
+def load_cached_results(key: str, ttl_seconds: float) -> list[str] | None:
+    """Return the cached snippets for key if the entry is younger than ttl_seconds, else None."""
+    if ttl_seconds <= 0:
+        return None
+    try:
+        with open(SEARCH_CACHE_DIR / f"{key}.json", "r", encoding="utf-8") as f:
+            entry = json.load(f)
+        if time.time() - float(entry["fetched_at"]) > ttl_seconds:
+            return None
+        results = entry["results"]
+    except (OSError, ValueError, KeyError, TypeError):
+        return None
+    return results if isinstance(results, list) else None
+
+
+def save_cached_results(key: str, query: str, results: list[str]):
+    """Store the snippets for key with the current time; written via a temp file so concurrent readers never see partial JSON."""
+    SEARCH_CACHE_DIR.mkdir(parents=True, exist_ok=True)
+    path = SEARCH_CACHE_DIR / f"{key}.json"
+    tmp_path = path.with_suffix(f".{os.getpid()}.{time.monotonic_ns()}.tmp")
+    with open(tmp_path, "w", encoding="utf-8") as f:
+        json.dump({"query": query, "fetched_at": time.time(), "results": results}, f, ensure_ascii=False, indent=2)
+    os.replace(tmp_path, path)
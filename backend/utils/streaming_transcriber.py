@@ -0,0 +1,112 @@
+"""
+Incremental transcription of a live microphone stream over a sliding window.
+
+Audio arrives as small frames and is appended to the uncommitted buffer. Each time STEP_SECONDS of new audio has
+arrived, the whole buffer (at most WINDOW_SECONDS) is decoded again and its text pushed as a partial transcript,
+so later context can revise earlier words. The buffer is committed as a final transcript when the speaker pauses
+(SILENCE_SECONDS of trailing low-energy audio) or when it reaches WINDOW_SECONDS, in which case it is cut at the
+quietest point and the remainder carried into the next window. Buffers with no speech are dropped without running
+the model.
+
+The class is transport-agnostic: routes/transcribe.py feeds it WebSocket frames and sends back the events it
+returns, running step() in a worker thread.
+"""
+
+from typing import Callable
+
+import numpy as np
+
+from utils.audio_stream import SAMPLE_RATE, SPLIT_FRAME_SECONDS, quietest_split
+
+STEP_SECONDS = 1.0
+WINDOW_SECONDS = 15.0
+SILENCE_SECONDS = 0.6
+# Frame RMS (of float samples in [-1, 1]) below which a frame counts as silence
+SILENCE_RMS = 0.01
+
+
+class StreamingTranscriber:
+    """Buffer live audio and turn it into partial and final transcript events using a transcribe(samples) -> text callable."""
+
+    def __init__(
+        self,
+        transcribe: Callable[[np.ndarray], str],
+        step_seconds: float = STEP_SECONDS,
+        window_seconds: float = WINDOW_SECONDS,
+        silence_seconds: float = SILENCE_SECONDS,
+        silence_rms: float = SILENCE_RMS,
+    ):
+        """Create an empty session; transcribe is called with 16 kHz mono float32 samples."""
+        self._transcribe = transcribe
+        self._step = int(step_seconds * SAMPLE_RATE)
+        self._window = int(window_seconds * SAMPLE_RATE)
+        self._silence = int(silence_seconds * SAMPLE_RATE)
+        self._silence_rms = silence_rms
+        self._buffer = np.zeros(0, dtype=np.float32)
+        self._pending = 0
+        self._last_partial = ""
+        # Seconds of stream time at the start of the buffer, reported with each final
+        self._offset = 0
+
+    def add(self, samples: np.ndarray):
+        """Append 16 kHz mono float32 samples to the uncommitted buffer."""
+        if len(samples):
+            self._buffer = np.concatenate([self._buffer, samples.astype(np.float32, copy=False)])
+            self._pending += len(samples)
+
+    def ready(self) -> bool:
+        """Return True once enough new audio has arrived since the last step to decode again."""
+        return self._pending >= self._step
+
+    def step(self) -> list[dict]:
+        """Decode the buffer and return the resulting events: a final when a pause or the window limit commits audio, else a partial if the text changed."""
+        self._pending = 0
+        if not self._has_speech(self._buffer):
+            # Keep a short tail so a word starting right at the frame edge is not clipped
+            self._drop(max(0, len(self._buffer) - self._silence))
+            return []
+
+        if len(self._buffer) >= self._window:
+            cut = quietest_split(self._buffer[:self._window])
+            return self._commit(cut)
+        if len(self._buffer) > self._silence and not self._has_speech(self._buffer[-self._silence:]):
+            return self._commit(len(self._buffer))
+
+        text = self._transcribe(self._buffer).strip()
+        if text == self._last_partial:
+            return []
+        self._last_partial = text
+        return [{"type": "partial", "text": text}]
+
+    def flush(self) -> list[dict]:
+        """Commit whatever is left in the buffer at the end of the stream."""
+        self._pending = 0
+        if not self._has_speech(self._buffer):
+            self._drop(len(self._buffer))
+            return []
+        return self._commit(len(self._buffer))
+
+    def _commit(self, length: int) -> list[dict]:
+        """Transcribe the first length samples as a final event and drop them from the buffer."""
+        start = self._offset / SAMPLE_RATE
+        text = self._transcribe(self._buffer[:length]).strip()
+        self._drop(length)
+        self._last_partial = ""
+        if not text:
+            return []
+        return [{"type": "final", "text": text, "start": round(start, 2), "end": round(self._offset / SAMPLE_RATE, 2)}]
+
+    def _drop(self, length: int):
+        """Remove the first length samples from the buffer, advancing the stream offset."""
+        self._buffer = self._buffer[length:]
+        self._offset += length
+
+    def _has_speech(self, samples: np.ndarray) -> bool:
+        """Return True if any short frame of samples has RMS energy above the silence threshold."""
+        frame = max(1, int(SPLIT_FRAME_SECONDS * SAMPLE_RATE))
+        count = len(samples) // frame
+        if count == 0:
+            return False
+        frames = samples[:count * frame].reshape(count, frame)
+        rms = np.sqrt(np.einsum("ij,ij->i", frames, frames) / frame)
+        return bool((rms > self._silence_rms).any())
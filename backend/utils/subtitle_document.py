@@ -0,0 +1,227 @@
+"""
+A subtitle file parsed once per job and shared by every task of the chain through the data dict.
+
+pysubs2 builds one SSAEvent object (with a dozen attributes) per line. SubtitleDocument keeps the file
+header (script info, styles) and moves the events into column arrays instead:
+
+  start, end, layer  — array("i")
+  comment flags      — bytearray
+  name, style        — array("I") indices into an interned string table
+  text               — list[str]
+  margins, effect    — sparse dict, only for events that set them
+
+Tasks read lines through lightweight SubtitleEventView rows that expose the SSAEvent attributes the chain
+uses (start, end, name, style, text, layer, is_comment), so existing code can index the document like an
+SSAFile. The tag-stripped text of each line (split_ass_text) is cached alongside it, and content_hash
+holds the SHA-256 of the source file so results derived from it (e.g. batch plans) can be reused.
+"""
+
+import copy
+import hashlib
+from array import array
+from typing import Any, Iterator
+
+import pysubs2
+
+from utils.ass_text import split_ass_text
+
+
+class SubtitleEventView:
+    """A row of a SubtitleDocument exposing the SSAEvent attributes used by the chain; setting text writes through."""
+
+    __slots__ = ("_document", "_index")
+
+    def __init__(self, document: "SubtitleDocument", index: int):
+        self._document = document
+        self._index = index
+
+    @property
+    def start(self) -> int:
+        return self._document._starts[self._index]
+
+    @property
+    def end(self) -> int:
+        return self._document._ends[self._index]
+
+    @property
+    def name(self) -> str:
+        return self._document._strings[self._document._names[self._index]]
+
+    @property
+    def style(self) -> str:
+        return self._document._strings[self._document._styles[self._index]]
+
+    @property
+    def layer(self) -> int:
+        return self._document._layers[self._index]
+
+    @property
+    def is_comment(self) -> bool:
+        return bool(self._document._comments[self._index])
+
+    @property
+    def text(self) -> str:
+        return self._document._texts[self._index]
+
+    @text.setter
+    def text(self, value: str):
+        self._document.set_text(self._index, value)
+
+
+class SubtitleDocument:
+    """Parsed subtitle file with an array-backed event store; create with load() and share via get_document()."""
+
+    def __init__(self, header: pysubs2.SSAFile):
+        """Build an empty document around a pysubs2 header (script info and styles, events ignored)."""
+        self._header = header
+        self.content_hash = ""
+        self._strings: list[str] = []
+        self._string_ids: dict[str, int] = {}
+        self._starts = array("i")
+        self._ends = array("i")
+        self._layers = array("i")
+        self._comments = bytearray()
+        self._names = array("I")
+        self._styles = array("I")
+        self._texts: list[str] = []
+        self._extras: dict[int, dict[str, Any]] = {}
+        self._split_cache: dict[int, tuple[str, list[tuple[int, str]]]] = {}
+
+    @classmethod
+    def load(cls, file_path: str) -> "SubtitleDocument":
+        """Parse a subtitle file with pysubs2 and move its events into the column store."""
+        subs = pysubs2.load(file_path)
+        document = cls(subs)
+        with open(file_path, "rb") as f:
+            document.content_hash = hashlib.sha256(f.read()).hexdigest()
+        for event in subs.events:
+            document._append(event)
+        subs.events = []
+        return document
+
+    def __len__(self) -> int:
+        return len(self._texts)
+
+    def __getitem__(self, index: int) -> SubtitleEventView:
+        if index < 0:
+            index += len(self._texts)
+        if not 0 <= index < len(self._texts):
+            raise IndexError("subtitle event index out of range")
+        return SubtitleEventView(self, index)
+
+    def __iter__(self) -> Iterator[SubtitleEventView]:
+        return (SubtitleEventView(self, index) for index in range(len(self._texts)))
+
+    def texts(self) -> list[str]:
+        """Return a copy of the raw event texts in file order."""
+        return list(self._texts)
+
+    def transcript_lines(self, include_speaker: bool = True) -> list[str]:
+        """Return each line as a raw string, optionally prefixed with the speaker name (same shape as utils.load_sub_data)."""
+        if not include_speaker:
+            return self.texts()
+        return [f"{self._strings[name]}: {text}" for name, text in zip(self._names, self._texts)]
+
+    def set_text(self, index: int, text: str):
+        """Replace the raw text of one event."""
+        self._texts[index] = text
+        self._split_cache.pop(index, None)
+
+    def split(self, index: int) -> tuple[str, list[tuple[int, str]]]:
+        """Return split_ass_text() of an event's current text, computed once per text."""
+        cached = self._split_cache.get(index)
+        if cached is None:
+            cached = split_ass_text(self._texts[index])
+            self._split_cache[index] = cached
+        return cached
+
+    def plain_text(self, index: int) -> str:
+        """Return an event's text with ASS markup stripped."""
+        return self.split(index)[0]
+
+    def copy(self) -> "SubtitleDocument":
+        """Return an independent copy whose texts can be rewritten without touching this document."""
+        document = SubtitleDocument(self._header)
+        document.content_hash = self.content_hash
+        document._strings = list(self._strings)
+        document._string_ids = dict(self._string_ids)
+        document._starts = array("i", self._starts)
+        document._ends = array("i", self._ends)
+        document._layers = array("i", self._layers)
+        document._comments = bytearray(self._comments)
+        document._names = array("I", self._names)
+        document._styles = array("I", self._styles)
+        document._texts = list(self._texts)
+        document._extras = {index: dict(extra) for index, extra in self._extras.items()}
+        document._split_cache = dict(self._split_cache)
+        return document
+
+    def to_ssafile(self) -> pysubs2.SSAFile:
+        """Rebuild a pysubs2 SSAFile (sharing this document's header) with one SSAEvent per stored event."""
+        subs = copy.copy(self._header)
+        subs.events = [
+            pysubs2.SSAEvent(
+                start=self._starts[index],
+                end=self._ends[index],
+                text=self._texts[index],
+                layer=self._layers[index],
+                style=self._strings[self._styles[index]],
+                name=self._strings[self._names[index]],
+                type="Comment" if self._comments[index] else "Dialogue",
+                **self._extras.get(index, {}),
+            )
+            for index in range(len(self._texts))
+        ]
+        return subs
+
+    def save(self, file_path, **kwargs):
+        """Write the document to file_path; the format follows the extension as with pysubs2.SSAFile.save()."""
+        self.to_ssafile().save(str(file_path), **kwargs)
+
+    def _append(self, event: pysubs2.SSAEvent):
+        """Move one parsed SSAEvent into the column store."""
+        index = len(self._texts)
+        self._starts.append(int(event.start))
+        self._ends.append(int(event.end))
+        self._layers.append(int(getattr(event, "layer", 0) or 0))
+        self._comments.append(1 if getattr(event, "is_comment", False) else 0)
+        self._names.append(self._intern(event.name or ""))
+        self._styles.append(self._intern(event.style or "Default"))
+        self._texts.append(event.text or "")
+        extra = {
+            field: getattr(event, field)
+            for field, default in (("marginl", 0), ("marginr", 0), ("marginv", 0), ("effect", ""))
+            if getattr(event, field, default) != default
+        }
+        if extra:
+            self._extras[index] = extra
+
+    def _intern(self, value: str) -> int:
+        """Return the string-table index of value, adding it on first use."""
+        string_id = self._string_ids.get(value)
+        if string_id is None:
+            string_id = len(self._strings)
+            self._strings.append(value)
+            self._string_ids[value] = string_id
+        return string_id
+
+
+def get_document(data: dict[str, Any], path_key: str = "file_path", document_key: str = "document") -> SubtitleDocument:
+    """Return the job's parsed document from data[document_key], parsing data[path_key] and storing it there on first use."""
+    document = data.get(document_key)
+    if document is None:
+        document = SubtitleDocument.load(str(data.get(path_key, "")))
+        data[document_key] = document
+    return document
+
+
+def episode_transcripts(data: dict[str, Any], include_speaker: bool = True) -> list[tuple[str, list[str]]]:
+    """Return (label, transcript lines) per episode of a library update: every entry of data["episodes"] for a season, else the job's single file."""
+    episodes = data.get("episodes") or []
+    if not episodes:
+        return [(str(data.get("original_filename", "")), get_document(data).transcript_lines(include_speaker=include_speaker))]
+    # Each episode dict caches its own parsed document, so later tasks of the chain do not re-parse the files.
+    return [
+        (str(episode.get("filename") or f"episode {number}"), get_document(episode).transcript_lines(include_speaker=include_speaker))
+        for number, episode in enumerate(episodes, start=1)
+    ]
@@ -0,0 +1,58 @@
+"""
+Cheap local text similarity used to drop near-identical library facts before asking the LLM.
+
+Texts are normalized (NFKC, case-folded, punctuation removed, whitespace collapsed) and turned into a token set:
+words for space-separated scripts, character bigrams for runs of CJK/kana text, which has no spaces. Similarity is
+the Jaccard index of the two token sets. Because one negator or qualifier barely moves the index ("is X's sister"
+vs "is not X's sister"), qualifiers_differ() flags pairs whose differing tokens carry one, so callers keep both.
+"""
+
+import re
+import unicodedata
+
+WORD_PATTERN = re.compile(r"[^\W_]+")
+# "isn't" would otherwise split into "isn" and "t"; rewrite the contraction so it yields a plain "not" token.
+CONTRACTION_PATTERN = re.compile(r"n['\u2019]t\b")
+NEGATION_WORDS = frozenset({
+    "not", "no", "never", "nor", "neither", "none", "nobody", "nothing", "without", "cannot",
+})
+QUALIFIER_WORDS = frozenset({
+    "former", "formerly", "ex", "late", "once", "used", "step", "half", "adoptive", "adopted", "fake", "secretly",
+    "pretends", "pretending", "supposedly", "allegedly", "only", "almost", "partly",
+})
+# Negation markers inside CJK bigrams (Japanese ない/ません, Chinese 不/没/非/未).
+CJK_NEGATION_MARKERS = ("ない", "ませ", "不", "没", "沒", "非", "未")
+
+
+def normalize_fact(text: str) -> str:
+    """Return text NFKC-normalized, case-folded, with punctuation dropped and whitespace collapsed."""
+    normalized = CONTRACTION_PATTERN.sub(" not", unicodedata.normalize("NFKC", str(text)).casefold())
+    return " ".join(WORD_PATTERN.findall(normalized))
+
+
+def token_set(text: str) -> frozenset[str]:
+    """Return the similarity tokens of text: ASCII words whole, other words as character bigrams."""
+    tokens: set[str] = set()
+    for word in normalize_fact(text).split():
+        if word.isascii() or len(word) < 2:
+            tokens.add(word)
+        else:
+            tokens.update(word[i:i + 2] for i in range(len(word) - 1))
+    return frozenset(tokens)
+
+
+def jaccard(first: frozenset[str], second: frozenset[str]) -> float:
+    """Return the Jaccard similarity of two token sets (1.0 for two empty sets)."""
+    if not first and not second:
+        return 1.0
+    return len(first & second) / len(first | second)
+
+
+def qualifiers_differ(first: frozenset[str], second: frozenset[str]) -> bool:
+    """Return True if a token present in only one of the sets is a negator or qualifier, so the texts state different facts."""
+    for token in first ^ second:
+        if token in NEGATION_WORDS or token in QUALIFIER_WORDS:
+            return True
+        if not token.isascii() and any(marker in token for marker in CJK_NEGATION_MARKERS):
+            return True
+    return False
@@ -0,0 +1,11 @@
+"""
+Rough token counting shared by the job estimator and the throughput model.
+"""
+
+import math
+
+
+def estimate_tokens(text: str) -> int:
+    """Approximate the token count of a string: ~4 ASCII characters per token, ~1 token per non-ASCII (e.g. CJK) character."""
+    ascii_count = sum(1 for char in text if ord(char) < 128)
+    return math.ceil(ascii_count / 4 + (len(text) - ascii_count))
@@ -449,8 +449,58 @@ export class LibraryDetailComponent implements OnInit, OnDestroy {
     return this.series?.glossary.find(t => t.id === id)?.term ?? id;
   }
 
+  hasPendingProposals(): boolean {
+    return !!this.proposals && (
+      this.proposals.new_characters.length + this.proposals.updated_characters.length
+      + this.proposals.new_glossary.length + this.proposals.updated_glossary.length
+    ) > 0;
+  }
+
+  acceptAllProposals(): void {
+    if (!this.proposals) return;
+    this.acceptProposals([
+      ...this.proposals.new_characters,
+      ...this.proposals.updated_characters,
+      ...this.proposals.new_glossary,
+      ...this.proposals.updated_glossary,
+    ]);
+  }
+
+  // Applies proposals server-side in one save; rejected proposals were only dropped locally, so the lists are filtered rather than replaced.
+  acceptProposals(items: {proposal_id?: string}[]): void {
+    if (!this.series || !items.length) return;
+    const proposalIds = items.map(item => item.proposal_id).filter((id): id is string => !!id);
+    if (proposalIds.length !== items.length) {
+      this.errorDialogService.show('These proposals are from an older scan and must be accepted one at a time.');
+      return;
+    }
+    this.apiService.applyProposals(this.series.id, proposalIds).subscribe({
+      next: (response) => {
+        if (response.status === 'error' || !response.data) {
+          this.errorDialogService.show(response.message || 'Failed to apply proposals.');
+          return;
+        }
+        const applied = new Set(response.data.applied);
+        if (this.proposals) {
+          this.proposals = {
+            new_characters: this.proposals.new_characters.filter(p => !applied.has(p.proposal_id ?? '')),
+            updated_characters: this.proposals.updated_characters.filter(p => !applied.has(p.proposal_id ?? '')),
+            new_glossary: this.proposals.new_glossary.filter(p => !applied.has(p.proposal_id ?? '')),
+            updated_glossary: this.proposals.updated_glossary.filter(p => !applied.has(p.proposal_id ?? '')),
+          };
+        }
+        this.loadSeries();
+      },
+      error: () => this.errorDialogService.show('Failed to apply proposals.')
+    });
+  }
+
   acceptNewCharacter(char: any): void {
     if (!this.series) return;
+    if (char.proposal_id) {
+      this.acceptProposals([char]);
+      return;
+    }
     this.apiService.addCharacter(this.series.id, char).subscribe({
       next: (response) => {
         this.series = response.data ?? this.series;
@@ -462,6 +512,10 @@ export class LibraryDetailComponent implements OnInit, OnDestroy {
 
   acceptNewGlossaryTerm(term: any): void {
     if (!this.series) return;
+    if (term.proposal_id) {
+      this.acceptProposals([term]);
+      return;
+    }
     this.apiService.addGlossaryTerm(this.series.id, term).subscribe({
       next: (response) => {
         this.series = response.data ?? this.series;
@@ -473,6 +527,10 @@ export class LibraryDetailComponent implements OnInit, OnDestroy {
 
   acceptCharacterUpdate(update: any): void {
     if (!this.series) return;
+    if (update.proposal_id) {
+      this.acceptProposals([update]);
+      return;
+    }
     const char = this.series.characters.find(c => c.id === update.id);
     if (!char) {
       this.errorDialogService.show(`Character "${update.id}" not found in library. It may have been deleted.`);
@@ -499,6 +557,10 @@ export class LibraryDetailComponent implements OnInit, OnDestroy {
 
   acceptGlossaryUpdate(update: any): void {
     if (!this.series) return;
+    if (update.proposal_id) {
+      this.acceptProposals([update]);
+      return;
+    }
     const term = this.series.glossary.find(t => t.id === update.id);
     if (!term) {
       this.errorDialogService.show(`Glossary term "${update.id}" not found in library. It may have been deleted.`);
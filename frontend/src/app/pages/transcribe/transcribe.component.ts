@@ -54,8 +54,10 @@ export class TranscribeComponent implements OnInit, OnDestroy {
   // --- Section-level (non-waveform) state ---
   transcript = '';
   isTranscribing = false;
+  liveTranscription = false;
   inputLanguage = 'ja';
   fileInputLanguage = 'ja';
+  fileServerPath = '';
   languageOptions = [
     { code: 'en', name: 'English' },
     { code: 'ja', name: 'Japanese' },
@@ -84,6 +86,10 @@ export class TranscribeComponent implements OnInit, OnDestroy {
   // --- Private implementation details ---
   private mediaRecorder?: MediaRecorder;
   private audioChunks: Blob[] = [];
+  private liveSocket?: WebSocket;
+  private liveAudioContext?: AudioContext;
+  private liveProcessor?: ScriptProcessorNode;
+  private liveFinalText = '';
   private pollingInterval?: any;
   private filePollingInterval?: any;
   private lastShownTaskError: Record<string, string> = {};
@@ -151,6 +157,9 @@ export class TranscribeComponent implements OnInit, OnDestroy {
 
       this.mediaRecorder.start();
       this.transcribeLineState.isRecording = true;
+      if (this.liveTranscription) {
+        this.startLiveTranscription(stream);
+      }
 
     } catch (error) {
       console.error('Error accessing microphone:', error);
@@ -164,6 +173,61 @@ export class TranscribeComponent implements OnInit, OnDestroy {
     if (this.mediaRecorder && this.mediaRecorder.state !== 'inactive') {
       this.mediaRecorder.stop();
     }
+    this.stopLiveTranscription();
+  }
+
+  private startLiveTranscription(stream: MediaStream): void {
+    const audioContext = new AudioContext();
+    const source = audioContext.createMediaStreamSource(stream);
+    const processor = audioContext.createScriptProcessor(4096, 1, 1);
+    const socket = new WebSocket(this.apiService.transcribeStreamUrl());
+    socket.binaryType = 'arraybuffer';
+    this.liveAudioContext = audioContext;
+    this.liveProcessor = processor;
+    this.liveSocket = socket;
+    this.liveFinalText = '';
+    this.transcript = '';
+
+    socket.onopen = () => {
+      socket.send(JSON.stringify({ language: this.inputLanguage, encoding: 'pcm_f32le', sample_rate: audioContext.sampleRate }));
+    };
+    processor.onaudioprocess = (event) => {
+      if (socket.readyState === WebSocket.OPEN) {
+        socket.send(new Float32Array(event.inputBuffer.getChannelData(0)).buffer);
+      }
+    };
+    source.connect(processor);
+    processor.connect(audioContext.destination);
+
+    socket.onmessage = (event) => {
+      const message = JSON.parse(event.data);
+      if (message.type === 'partial') {
+        this.transcript = this.liveFinalText + message.text;
+      } else if (message.type === 'final') {
+        this.liveFinalText += message.text + '\n';
+        this.transcript = this.liveFinalText;
+      } else if (message.type === 'done') {
+        socket.close();
+      } else if (message.type === 'error') {
+        this.errorDialogService.show(message.message || 'Live transcription failed.');
+        socket.close();
+      }
+      this.cdr.detectChanges();
+    };
+    socket.onerror = () => {
+      this.errorDialogService.show('Live transcription connection failed.');
+    };
+  }
+
+  private stopLiveTranscription(): void {
+    this.liveProcessor?.disconnect();
+    this.liveAudioContext?.close();
+    if (this.liveSocket?.readyState === WebSocket.OPEN) {
+      this.liveSocket.send(JSON.stringify({ type: 'stop' }));
+    }
+    this.liveProcessor = undefined;
+    this.liveAudioContext = undefined;
+    this.liveSocket = undefined;
   }
 
   async onAudioFileSelected(files: File[]): Promise<void> {
@@ -214,10 +278,18 @@ export class TranscribeComponent implements OnInit, OnDestroy {
         : (mimeType.includes('webm') ? 'webm' : 'mp4');
       const audioFile = new File([clippedBlob], `recording.${extension}`, { type: mimeType });
 
-      this.apiService.transcribeAudio(audioFile, this.inputLanguage).subscribe({
+      this.apiService.transcribeAudioDirect(audioFile, this.inputLanguage).subscribe({
         next: (response) => {
-          if (response.status === 'processing') {
-            this.startPolling();
+          if (response.status === 'success' && response.data) {
+            this.transcript = response.data.text ?? '';
+            this.isTranscribing = false;
+            this.stateService.setTaskState(TASK_TYPES.transcribeLine, {
+              status: 'complete',
+              result: { text: this.transcript },
+              message: null,
+              isPolling: false,
+            });
+            this.cdr.detectChanges();
           } else {
             const errorMessage = response.message || 'Failed to start transcription.';
             this.isTranscribing = false;
@@ -327,6 +399,13 @@ export class TranscribeComponent implements OnInit, OnDestroy {
 
     const audioFile = files[0];
     this.transcribeFileState.audioFile = audioFile;
+    if (audioFile.type.startsWith('video/') || /\.(mkv|mp4|webm|mov)$/i.test(audioFile.name)) {
+      // Skip the waveform preview for video so the whole container is not decoded in the browser
+      this.transcribeFileState.audioBlob = null;
+      this.fileWaveform.clearAudio();
+      this.cdr.detectChanges();
+      return;
+    }
 
     try {
       const arrayBuffer = await audioFile.arrayBuffer();
@@ -342,13 +421,16 @@ export class TranscribeComponent implements OnInit, OnDestroy {
       this.fileWaveform.audioBlob = this.transcribeFileState.audioBlob;
       this.cdr.detectChanges();
     } catch (error) {
-      console.error('Error loading audio file for transcription:', error);
-      this.errorDialogService.show('Failed to load audio file. Please ensure it is a valid audio file.');
+      // Video containers often cannot be decoded by the browser; they are still uploaded as-is and demuxed on the server
+      console.warn('No waveform preview for this file:', error);
+      this.transcribeFileState.audioBlob = null;
+      this.cdr.detectChanges();
     }
   }
 
   async transcribeFileAudio(): Promise<void> {
-    if (!this.transcribeFileState.audioBlob || this.isTranscribing || this.stateService.hasActiveTask()) return;
+    const serverPath = this.fileServerPath.trim();
+    if ((!this.transcribeFileState.audioFile && !serverPath) || this.isTranscribing || this.stateService.hasActiveTask()) return;
 
     try {
       this.isTranscribing = true;
@@ -359,10 +441,13 @@ export class TranscribeComponent implements OnInit, OnDestroy {
         progress: this.defaultProgress(TASK_TYPES.transcribeFile),
         isPolling: true,
       });
-      const filename = this.transcribeFileState.audioFile?.name || 'audio.wav';
-      const audioFile = new File([this.transcribeFileState.audioBlob], filename, { type: 'audio/wav' });
+      // Send the original file (or just a server path) rather than a browser-decoded WAV, which is many times larger
       const formData = new FormData();
-      formData.append('file', audioFile);
+      if (serverPath) {
+        formData.append('server_path', serverPath);
+      } else {
+        formData.append('file', this.transcribeFileState.audioFile!);
+      }
       formData.append('language', this.fileInputLanguage);
 
       this.apiService.transcribeFile(formData).subscribe({
@@ -586,6 +671,7 @@ export class TranscribeComponent implements OnInit, OnDestroy {
   }
 
   ngOnDestroy(): void {
+    this.stopLiveTranscription();
     this.stopPolling();
     this.stopFilePolling();
   }
@@ -408,6 +408,13 @@ export class TranslateComponent implements OnInit, OnDestroy {
             this.isReviewingTranslatedFile = false;
             this.stopReviewPolling();
             this.refreshDownloads();
+            const unreviewedBatchCount = taskData?.result?.unreviewed_batch_count ?? 0;
+            if (unreviewedBatchCount > 0) {
+              this.errorDialogService.show({
+                title: 'Review Incomplete',
+                message: `${unreviewedBatchCount} review batch(es) failed after all retries and were left unreviewed. The corrected file only covers the batches that were reviewed.`,
+              });
+            }
           } else if (response.status === 'error') {
             console.error('Translation review error:', response.message);
             this.showTaskError(TASK_TYPES.reviewTranslatedFile, response.message || 'Translation review failed.');
@@ -69,10 +69,23 @@ export interface SeriesListData {
 }
 
 export interface LibraryProposals {
-  new_characters: Omit<SeriesCharacter, 'id'>[];
-  updated_characters: {id: string; field: string; append: string}[];
-  new_glossary: Omit<SeriesGlossaryTerm, 'id'>[];
-  updated_glossary: {id: string; field: string; value: string}[];
+  new_characters: (Omit<SeriesCharacter, 'id'> & {proposal_id?: string})[];
+  updated_characters: {id: string; field: string; append: string; character?: string; proposal_id?: string}[];
+  new_glossary: (Omit<SeriesGlossaryTerm, 'id'> & {proposal_id?: string})[];
+  updated_glossary: {id: string; field: string; value: string; proposal_id?: string}[];
+}
+
+export interface ApplyProposalsData {
+  series: SeriesSummary;
+  applied: string[];
+  proposals: LibraryProposals;
+}
+
+export interface TranscribeLineDirectData {
+  text: string;
+  duration_seconds: number;
+  decode_ms: number;
+  inference_ms: number;
 }
 
 export interface SubtitleFileInfoData {
@@ -184,12 +197,27 @@ export class ApiService {
     return this.http.delete<ApiResponse<null>>(`${this.baseUrl}/library/${encodeURIComponent(seriesId)}/glossary/${encodeURIComponent(termId)}`);
   }
 
+  applyProposals(seriesId: string, proposalIds: string[]): Observable<ApiResponse<ApplyProposalsData>> {
+    return this.http.post<ApiResponse<ApplyProposalsData>>(`${this.baseUrl}/library/${encodeURIComponent(seriesId)}/proposals/apply`, {proposal_ids: proposalIds});
+  }
+
   startLibraryUpdate(seriesId: string, file: File): Observable<ApiResponse<TaskStartData>> {
     const formData = new FormData();
     formData.append('file', file);
     return this.http.post<ApiResponse<TaskStartData>>(`${this.baseUrl}/library/${encodeURIComponent(seriesId)}/update`, formData);
   }
 
+  transcribeStreamUrl(): string {
+    return `${this.baseUrl.replace(/^http/, 'ws')}/transcribe/stream`;
+  }
+
+  transcribeAudioDirect(audioFile: File, language: string): Observable<ApiResponse<TranscribeLineDirectData>> {
+    const formData = new FormData();
+    formData.append('file', audioFile);
+    formData.append('language', language);
+    return this.http.post<ApiResponse<TranscribeLineDirectData>>(`${this.baseUrl}/transcribe/transcribe-line-direct`, formData);
+  }
+
   transcribeAudio(audioFile: File, language: string): Observable<ApiResponse<TaskStartData>> {
     const formData = new FormData();
     formData.append('file', audioFile);
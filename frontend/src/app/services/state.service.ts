@@ -36,10 +36,12 @@ export interface TaskProgress {
   total: number;
   status: string;
   eta_seconds: number;
+  task_eta_seconds?: number;
 }
 
 export interface TaskResultPayload {
   text?: string;
+  unreviewed_batch_count?: number;
 }
 
 export interface StoredTaskState {